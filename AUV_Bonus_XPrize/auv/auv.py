@@ -23,7 +23,12 @@ from auv_bonus_xprize.settings import config
 from auv.auv_moos import AuvMOOS
 from auv.watchdog import Watchdog
 from auv.dye_sensor import DyeSensor
+from auv.position_estimator import PositionEstimator
+from auv.current_estimator import CurrentEstimator
 from searchspace.geometry import bearing_to_point, Point
+from searchspace.navigation import utm_position_from_config
+from searchspace.bathymetry import bathymetry_from_config
+from searchspace.geofence import geofence_from_config
 
 STROBE = {
     "ON": 1,
@@ -70,6 +75,11 @@ class Auv(object):
 
         self.watchdog = Watchdog()
         self.dye = DyeSensor()
+        self.last_sensor_value = None
+        self.bathymetry = bathymetry_from_config()
+        self.geofence = geofence_from_config()
+        self.position_estimator = PositionEstimator.construct_from_config()
+        self.current_estimator = CurrentEstimator.construct_from_config()
 
         self.auv_control = AuvMOOS(
             config['auv']['host'],
@@ -87,16 +97,76 @@ class Auv(object):
 
         return (time() - self._auv_data['DATA_TIMESTAMP']) > float(config['auv']['max_data_delay_secs'])
 
-    def _process_auv_data(self, moos_variable_name, moos_variable_value):
+    def _process_auv_data(self,
+                          moos_variable_name,
+                          moos_variable_value,
+                          moos_timestamp=None):
         """_process_auv_data()
 
         The function called by the underlying MOOS system each
-        time new data is received from the AUV.
+        time new data is received from the AUV. The position,
+        heading and speed also update the position estimator,
+        as of the time the message was sent. Each complete fix
+        updates the current estimator.
         """
 
         self._auv_data[moos_variable_name] = moos_variable_value
         self._auv_data['DATA_TIMESTAMP'] = time()
 
+        if moos_timestamp is None:
+            moos_timestamp = self._auv_data['DATA_TIMESTAMP']
+
+        variables = config['variables']
+        if moos_variable_name == variables['easting_x']:
+            self.position_estimator.update_x(moos_variable_value,
+                                             moos_timestamp)
+        elif moos_variable_name == variables['northing_y']:
+            self.position_estimator.update_y(moos_variable_value,
+                                             moos_timestamp)
+            if None not in (self._auv_data[variables['easting_x']],
+                            self._auv_data[variables['heading']],
+                            self._auv_data[variables['speed']]):
+                self.current_estimator.add_fix(
+                    self._auv_data[variables['easting_x']],
+                    moos_variable_value,
+                    self._auv_data[variables['heading']],
+                    self._auv_data[variables['speed']],
+                    moos_timestamp)
+        elif (moos_variable_name == variables['speed'] and
+              self._auv_data[variables['heading']] is not None):
+            self.position_estimator.update_heading_and_speed(
+                self._auv_data[variables['heading']],
+                moos_variable_value,
+                moos_timestamp)
+
+    def current_position(self):
+        """current_position()
+
+        Return the position of the AUV as a Point. With the
+        dead_reckoning option, it's the position predicted for
+        now by the position estimator, otherwise it's the last
+        NAV_X and NAV_Y received.
+        """
+
+        if config['auv'].getboolean('dead_reckoning', fallback=False):
+            position = self.position_estimator.position_at(time())
+            if position is not None:
+                return Point(*position)
+
+        return Point(self._auv_data[config['variables']['easting_x']],
+                     self._auv_data[config['variables']['northing_y']])
+
+    def geofence_status(self):
+        """geofence_status()
+
+        Return geofence.INSIDE, NEAR or OUTSIDE for the current
+        position of the AUV in the contest area.
+        """
+
+        position = self.current_position()
+
+        return self.geofence.check(position.x, position.y)
+
     def wait_to_start(self):
         """wait_to_start()
 
@@ -113,9 +183,9 @@ class Auv(object):
             sleep(start_delay_secs)
             return False
 
-        starting_position = config['starting']['auv_position_utm'].split(',')
-        self._current_waypoint['x'] = float(starting_position[0])
-        self._current_waypoint['y'] = float(starting_position[1])
+        starting_position = utm_position_from_config('auv_position')
+        self._current_waypoint['x'] = starting_position.x
+        self._current_waypoint['y'] = starting_position.y
         self._current_waypoint['depth'] = 0.0
 
         distance_to_start = self.distance_to_waypoint()
@@ -132,10 +202,12 @@ class Auv(object):
 
         Sample the dye sensor. If the measurement is above
         the noise level, record the measurement and return
-        True. Otherwise return False.
+        True. Otherwise return False. The measurement is kept
+        as last_sensor_value either way.
         """
 
         sensor_value = self.dye.sensor_value()
+        self.last_sensor_value = sensor_value
         logging.info('DATA,{0},{1},{2},{3},{4},{5},{6}'.format(
             time(),
             self._auv_data[config['variables']['easting_x']],
@@ -178,6 +250,19 @@ class Auv(object):
             logging.debug('altitude_safety() Adjusting altitude')
             return min_altitude - altitude
 
+        #
+        # Out of the altimeter's range, fall back to the charted
+        # depth, if there is one.
+        #
+        if altitude == 0.0 and self.bathymetry is not None:
+            charted_altitude = self.bathymetry.altitude_at(
+                self._auv_data[config['variables']['easting_x']],
+                self._auv_data[config['variables']['northing_y']],
+                self._auv_data[config['variables']['depth']])
+            if charted_altitude is not None and charted_altitude < min_altitude:
+                logging.debug('altitude_safety() Adjusting charted altitude')
+                return min_altitude - charted_altitude
+
         return 0.0
 
     def turn_toward_heading(
@@ -315,15 +400,25 @@ class Auv(object):
         self._current_waypoint['x'] = waypoint[0]
         self._current_waypoint['y'] = waypoint[1]
         self._current_waypoint['depth'] = waypoint[2]
-        # Ignore waypoint[3]
+        #
+        # waypoint[3] is the heading of the track to the waypoint.
+        # The optional waypoint[4] is the heading to steer on that
+        # track against the current. The difference is added to the
+        # bearing, so the AUV crabs toward the waypoint.
+        #
+        if len(waypoint) > 4 and waypoint[4] is not None:
+            crab_angle = (waypoint[4] - waypoint[3] + 180) % 360 - 180
+        else:
+            crab_angle = 0
 
         if self.distance_to_waypoint() > float(config['auv']['distance_tolerance']):
             logging.debug('move_toward_waypoint(): Moving toward the waypoint')
             bearing = bearing_to_point(
-                Point(self._auv_data[config['variables']['easting_x']],
-                      self._auv_data[config['variables']['northing_y']]),
+                self.current_position(),
                 Point(self._current_waypoint['x'],
                       self._current_waypoint['y']))
+            if crab_angle:
+                bearing = (bearing + crab_angle) % 360
             self.auv_control.publish_variable(
                 config['variables']['set_heading'],
                 bearing,
@@ -374,10 +469,9 @@ class Auv(object):
         current position and the given waypoint.
         """
 
-        x = config['variables']['easting_x']
-        y = config['variables']['northing_y']
+        position = self.current_position()
 
-        sum_of_squares = pow(self._auv_data[x] - self._current_waypoint['x'], 2)
-        sum_of_squares += pow(self._auv_data[y] - self._current_waypoint['y'], 2)
+        sum_of_squares = pow(position.x - self._current_waypoint['x'], 2)
+        sum_of_squares += pow(position.y - self._current_waypoint['y'], 2)
 
         return sqrt(sum_of_squares)
@@ -120,7 +120,9 @@ class AuvMOOS(pymoos.comms):
 
                 if self._data_callback:
                     try:
-                        self._data_callback(msg.key(), variable_value)
+                        self._data_callback(msg.key(),
+                                            variable_value,
+                                            msg.time())
 
                     except Exception as e:
                         logging.error('_on_new_mail() Exception: {0}'.format(
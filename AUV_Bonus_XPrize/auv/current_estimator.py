@@ -0,0 +1,205 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""CurrentEstimator class
+
+Estimate the set and drift of the current from the difference
+between the ground track of the AUV and its heading and speed.
+"""
+
+from math import atan2, degrees, hypot, radians, sin, cos
+import numpy as np
+from auv_bonus_xprize.settings import config
+from searchspace.navigation import KNOTS_TO_METERS_PER_SECOND
+
+#
+# The estimator defaults, when they aren't in the auv section of
+# the configuration file. Each observation is the ground velocity
+# over at least CURRENT_INTERVAL_SECS, and observations lose half
+# their weight after about 0.7 / (1 - CURRENT_FORGETTING_FACTOR)
+# more.
+#
+CURRENT_INTERVAL_SECS = 5.0
+CURRENT_FORGETTING_FACTOR = 0.98
+
+#
+# The covariance of the parameters before the first observation,
+# wide enough that the first observations set them.
+#
+INITIAL_PARAMETER_VARIANCE = 1000.0
+
+#
+# The confidence is zero until this many observations.
+#
+MIN_OBSERVATIONS = 5
+
+
+class CurrentEstimator(object):
+    """CurrentEstimator
+
+    Model the ground velocity of the AUV as its velocity through
+    the water, scaled by k, plus the velocity of the current
+    (cx, cy):
+
+        ground_vx = k * speed * sin(heading) + cx
+        ground_vy = k * speed * cos(heading) + cy
+
+    and estimate [k, cx, cy] by recursive least squares with a
+    forgetting factor, so the estimate follows a changing current.
+    The scale k absorbs any error in the reported speed.
+
+    The ground velocity comes from the fixes at least interval
+    seconds apart and the velocity through the water from the
+    mean of the heading and speed at the fixes in between.
+    """
+
+    def __init__(self,
+                 interval=CURRENT_INTERVAL_SECS,
+                 forgetting_factor=CURRENT_FORGETTING_FACTOR):
+        """__init__()
+        """
+
+        if not 0.0 < forgetting_factor <= 1.0:
+            raise Exception('The forgetting factor must be in (0, 1]')
+
+        self._interval = interval
+        self._forgetting_factor = forgetting_factor
+
+        self._parameters = np.array([1.0, 0.0, 0.0])
+        self._covariance = np.eye(3) * INITIAL_PARAMETER_VARIANCE
+        self._residual_sum = 0.0
+        self._residual_weight = 0.0
+        self._observations = 0
+
+        self._anchor = None
+        self._water_x = 0.0
+        self._water_y = 0.0
+        self._samples = 0
+
+    @classmethod
+    def construct_from_config(cls):
+        """construct_from_config()
+
+        Create the CurrentEstimator with the interval and
+        forgetting factor in the auv section of the
+        configuration file.
+        """
+
+        auv = config['auv']
+        return cls(auv.getfloat('current_interval_secs',
+                                fallback=CURRENT_INTERVAL_SECS),
+                   auv.getfloat('current_forgetting_factor',
+                                fallback=CURRENT_FORGETTING_FACTOR))
+
+    def add_fix(self, x, y, heading, speed, timestamp):
+        """add_fix()
+
+        Add a position fix of the AUV at x, y with its compass
+        heading and its speed in meters per second. Once interval
+        seconds have passed since the last observation, the ground
+        velocity since then updates the estimate.
+        """
+
+        angle = radians(heading)
+        self._water_x += speed * sin(angle)
+        self._water_y += speed * cos(angle)
+        self._samples += 1
+
+        if self._anchor is None:
+            self._anchor = (x, y, timestamp)
+            return
+
+        anchor_x, anchor_y, anchor_timestamp = self._anchor
+        elapsed = timestamp - anchor_timestamp
+        if elapsed < self._interval:
+            return
+
+        self._update((x - anchor_x) / elapsed,
+                     (y - anchor_y) / elapsed,
+                     self._water_x / self._samples,
+                     self._water_y / self._samples)
+
+        self._anchor = (x, y, timestamp)
+        self._water_x = speed * sin(angle)
+        self._water_y = speed * cos(angle)
+        self._samples = 1
+
+    def _update(self, ground_vx, ground_vy, water_vx, water_vy):
+        """_update()
+
+        Apply the recursive least squares update for the
+        observations of each axis in turn.
+        """
+
+        for regressor, observed in (((water_vx, 1.0, 0.0), ground_vx),
+                                    ((water_vy, 0.0, 1.0), ground_vy)):
+            regressor = np.array(regressor)
+            covariance_regressor = self._covariance @ regressor
+            gain = covariance_regressor / (self._forgetting_factor +
+                                           regressor @ covariance_regressor)
+            residual = observed - regressor @ self._parameters
+
+            self._parameters += gain * residual
+            self._covariance = (self._covariance -
+                                np.outer(gain, covariance_regressor)) / self._forgetting_factor
+            self._residual_sum = (self._forgetting_factor * self._residual_sum +
+                                  residual * residual)
+            self._residual_weight = self._forgetting_factor * self._residual_weight + 1.0
+
+        self._observations += 1
+
+    def estimate(self):
+        """estimate()
+
+        Return the set in integer compass degrees, the drift in
+        knots and the confidence in the estimate, from 0 to 1. The
+        confidence is the share of the squared drift which isn't
+        explained by the variance of the current velocity, so it's
+        low until the AUV has steered enough different headings to
+        separate the current from its own speed, and for a current
+        too weak to have a meaningful set.
+        """
+
+        k, current_x, current_y = self._parameters.tolist()
+        drift = hypot(current_x, current_y)
+        current_set = int(round(degrees(atan2(current_x, current_y)))) % 360
+
+        #
+        # The residual weight is the effective number of residuals,
+        # two for each observation when nothing is forgotten, and the
+        # residual variance is corrected for the three parameters
+        # fitted to them. A small forgetting factor may never keep
+        # enough residuals for that, so the confidence stays zero.
+        #
+        updates = self._residual_weight
+        if self._observations < MIN_OBSERVATIONS or updates <= 3.0:
+            confidence = 0.0
+        else:
+            residual_variance = self._residual_sum / (updates - 3.0)
+            variance = residual_variance * (self._covariance[1, 1] +
+                                            self._covariance[2, 2])
+            confidence = float(drift ** 2 / (drift ** 2 + variance)) if drift > 0.0 else 0.0
+
+        return (current_set,
+                drift / KNOTS_TO_METERS_PER_SECOND,
+                confidence)
+
+    @property
+    def speed_scale(self):
+        """speed_scale
+
+        The estimate of k, the ratio of the speed through the
+        water to the reported speed.
+        """
+
+        return float(self._parameters[0])
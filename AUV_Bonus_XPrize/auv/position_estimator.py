@@ -0,0 +1,226 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""PositionEstimator class
+
+Estimate the position of the AUV between the NAV_X and NAV_Y
+updates from MOOS.
+"""
+
+from math import radians, sin, cos
+from auv_bonus_xprize.settings import config
+
+#
+# The estimator defaults, when they aren't in the auv section of
+# the configuration file. The sigmas are the standard deviations
+# of the position fixes in meters, of the velocity from the heading
+# and speed in meters per second, and of the unmodeled acceleration
+# in meters per second squared.
+#
+POSITION_SIGMA_METERS = 1.0
+VELOCITY_SIGMA_METERS_PER_SEC = 0.5
+ACCELERATION_SIGMA = 0.1
+
+#
+# The variance of the velocity before it has been measured, wide
+# enough that the first measurement or pair of fixes sets it.
+#
+INITIAL_VELOCITY_VARIANCE = 100.0
+
+
+class AxisFilter(object):
+    """AxisFilter
+
+    A constant velocity Kalman filter along one axis. The state is
+    the position and the velocity at timestamp, with covariance
+    [[p_pp, p_pv], [p_pv, p_vv]]. Both kinds of measurement observe
+    one element of the state, so the updates are scalar.
+    """
+
+    def __init__(self, position_variance, velocity_variance, acceleration_variance):
+        """__init__()
+
+        Create a filter without a position.
+        """
+
+        self._position_variance = position_variance
+        self._velocity_variance = velocity_variance
+        self._acceleration_variance = acceleration_variance
+
+        self.position = None
+        self.velocity = 0.0
+        self.timestamp = None
+        self._p_pp = 0.0
+        self._p_pv = 0.0
+        self._p_vv = INITIAL_VELOCITY_VARIANCE
+
+    def _predict(self, timestamp):
+        """_predict()
+
+        Move the state forward to timestamp. A measurement older
+        than the state is treated as current, rather than moving
+        the state back in time.
+        """
+
+        dt = timestamp - self.timestamp
+        if dt <= 0.0:
+            return
+
+        q = self._acceleration_variance
+        self.position += self.velocity * dt
+        self._p_pp += (2.0 * self._p_pv + self._p_vv * dt) * dt + q * dt ** 3 / 3.0
+        self._p_pv += self._p_vv * dt + q * dt ** 2 / 2.0
+        self._p_vv += q * dt
+        self.timestamp = timestamp
+
+    def update_position(self, position, timestamp):
+        """update_position()
+
+        Correct the state with a position fix. The first fix
+        initializes the position.
+        """
+
+        if self.position is None:
+            self.position = position
+            self.timestamp = timestamp
+            self._p_pp = self._position_variance
+            return
+
+        self._predict(timestamp)
+
+        innovation_variance = self._p_pp + self._position_variance
+        gain_p = self._p_pp / innovation_variance
+        gain_v = self._p_pv / innovation_variance
+        innovation = position - self.position
+
+        self.position += gain_p * innovation
+        self.velocity += gain_v * innovation
+        self._p_vv -= gain_v * self._p_pv
+        self._p_pv -= gain_v * self._p_pp
+        self._p_pp -= gain_p * self._p_pp
+
+    def update_velocity(self, velocity, timestamp):
+        """update_velocity()
+
+        Correct the state with a velocity measurement, ignored
+        until the position is known.
+        """
+
+        if self.position is None:
+            return
+
+        self._predict(timestamp)
+
+        innovation_variance = self._p_vv + self._velocity_variance
+        gain_p = self._p_pv / innovation_variance
+        gain_v = self._p_vv / innovation_variance
+        innovation = velocity - self.velocity
+
+        self.position += gain_p * innovation
+        self.velocity += gain_v * innovation
+        self._p_pp -= gain_p * self._p_pv
+        self._p_pv -= gain_p * self._p_vv
+        self._p_vv -= gain_v * self._p_vv
+
+    def position_at(self, timestamp):
+        """position_at()
+
+        Return the predicted position at timestamp, without
+        changing the state.
+        """
+
+        return self.position + self.velocity * (timestamp - self.timestamp)
+
+
+class PositionEstimator(object):
+    """PositionEstimator
+
+    Track the easting and northing of the AUV with an AxisFilter
+    each. The filters are corrected by the NAV_X and NAV_Y fixes
+    and by the velocity from NAV_HEADING and NAV_SPEED, so the
+    position can be predicted at any time between the fixes.
+    """
+
+    def __init__(self,
+                 position_sigma=POSITION_SIGMA_METERS,
+                 velocity_sigma=VELOCITY_SIGMA_METERS_PER_SEC,
+                 acceleration_sigma=ACCELERATION_SIGMA):
+        """__init__()
+        """
+
+        self._x = AxisFilter(position_sigma ** 2,
+                             velocity_sigma ** 2,
+                             acceleration_sigma ** 2)
+        self._y = AxisFilter(position_sigma ** 2,
+                             velocity_sigma ** 2,
+                             acceleration_sigma ** 2)
+
+    @classmethod
+    def construct_from_config(cls):
+        """construct_from_config()
+
+        Create the PositionEstimator with the sigmas in the
+        auv section of the configuration file.
+        """
+
+        auv = config['auv']
+        return cls(auv.getfloat('estimator_position_sigma',
+                                fallback=POSITION_SIGMA_METERS),
+                   auv.getfloat('estimator_velocity_sigma',
+                                fallback=VELOCITY_SIGMA_METERS_PER_SEC),
+                   auv.getfloat('estimator_acceleration_sigma',
+                                fallback=ACCELERATION_SIGMA))
+
+    @property
+    def has_position(self):
+        """has_position
+
+        True once both the easting and the northing have been fixed.
+        """
+
+        return self._x.position is not None and self._y.position is not None
+
+    def update_x(self, x, timestamp):
+        """update_x()
+        """
+
+        self._x.update_position(x, timestamp)
+
+    def update_y(self, y, timestamp):
+        """update_y()
+        """
+
+        self._y.update_position(y, timestamp)
+
+    def update_heading_and_speed(self, heading, speed, timestamp):
+        """update_heading_and_speed()
+
+        Correct both filters with the velocity of the AUV moving
+        at speed meters per second along the compass heading.
+        """
+
+        angle = radians(heading)
+        self._x.update_velocity(speed * sin(angle), timestamp)
+        self._y.update_velocity(speed * cos(angle), timestamp)
+
+    def position_at(self, timestamp):
+        """position_at()
+
+        Return the predicted x, y at timestamp, or None before
+        the first fixes.
+        """
+
+        if not self.has_position:
+            return None
+
+        return self._x.position_at(timestamp), self._y.position_at(timestamp)
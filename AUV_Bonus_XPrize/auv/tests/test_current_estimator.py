@@ -0,0 +1,116 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+import pytest
+
+
+def test_current_estimator():
+    """test_current_estimator()
+
+    Run north and south tracks with noisy fixes, while a half knot
+    current sets toward 240 and the AUV makes 90% of its reported
+    speed. The estimate is unsure until the first turn and then
+    finds the current.
+    """
+
+    import numpy as np
+    from math import sin, cos, radians
+    from auv.current_estimator import CurrentEstimator
+    from auv.current_estimator import KNOTS_TO_METERS_PER_SECOND
+
+    current_x = 0.5 * KNOTS_TO_METERS_PER_SECOND * sin(radians(240.0))
+    current_y = 0.5 * KNOTS_TO_METERS_PER_SECOND * cos(radians(240.0))
+
+    estimator = CurrentEstimator(5.0, 0.98)
+    assert estimator.estimate()[2] == 0.0
+
+    rng = np.random.default_rng(2)
+    x = 0.0
+    y = 0.0
+    for second in range(1200):
+        heading = (0.0 if (second // 200) % 2 == 0 else 180.0) + rng.normal(0.0, 2.0)
+        x += 0.9 * 1.5 * sin(radians(heading)) + current_x
+        y += 0.9 * 1.5 * cos(radians(heading)) + current_y
+        fix_x, fix_y = rng.normal((x, y), 1.0).tolist()
+        estimator.add_fix(fix_x, fix_y, heading, 1.5, float(second))
+
+        if second == 20:
+            assert estimator.estimate()[2] == 0.0
+
+    current_set, current_drift, confidence = estimator.estimate()
+    assert current_set == pytest.approx(240, abs=3)
+    assert current_drift == pytest.approx(0.5, abs=0.05)
+    assert confidence > 0.8
+    assert estimator.speed_scale == pytest.approx(0.9, abs=0.02)
+
+    with pytest.raises(Exception):
+        CurrentEstimator(5.0, 0.0)
+
+
+def _run_tracks(estimator, seconds):
+    """_run_tracks()
+
+    Run north and south tracks, 200 seconds each, with noisy fixes
+    while a half knot current sets toward 240.
+    """
+
+    import numpy as np
+    from math import sin, cos, radians
+    from auv.current_estimator import KNOTS_TO_METERS_PER_SECOND
+
+    current_x = 0.5 * KNOTS_TO_METERS_PER_SECOND * sin(radians(240.0))
+    current_y = 0.5 * KNOTS_TO_METERS_PER_SECOND * cos(radians(240.0))
+
+    rng = np.random.default_rng(2)
+    x = 0.0
+    y = 0.0
+    for second in range(seconds):
+        heading = (0.0 if (second // 200) % 2 == 0 else 180.0) + rng.normal(0.0, 2.0)
+        x += 1.5 * sin(radians(heading)) + current_x
+        y += 1.5 * cos(radians(heading)) + current_y
+        fix_x, fix_y = rng.normal((x, y), 1.0).tolist()
+        estimator.add_fix(fix_x, fix_y, heading, 1.5, float(second))
+
+
+def test_no_forgetting():
+    """test_no_forgetting()
+
+    With a forgetting factor of 1, every observation counts
+    equally and the estimate still finds the current.
+    """
+
+    from auv.current_estimator import CurrentEstimator
+
+    estimator = CurrentEstimator(5.0, 1.0)
+    _run_tracks(estimator, 1200)
+
+    current_set, current_drift, confidence = estimator.estimate()
+    assert current_set == pytest.approx(240, abs=3)
+    assert current_drift == pytest.approx(0.5, abs=0.05)
+    assert 0.8 < confidence <= 1.0
+
+
+def test_small_forgetting_factor():
+    """test_small_forgetting_factor()
+
+    A small forgetting factor keeps too few residuals to judge the
+    estimate, so the confidence stays zero rather than going
+    negative or failing.
+    """
+
+    from auv.current_estimator import CurrentEstimator
+
+    estimator = CurrentEstimator(5.0, 0.5)
+    _run_tracks(estimator, 60)
+
+    assert estimator.estimate()[2] == 0.0
@@ -0,0 +1,92 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+import pytest
+
+
+def test_position_estimator():
+    """test_position_estimator()
+
+    Track an AUV moving east-northeast at 1.5 m/s with noisy fixes
+    once a second. Between the fixes, the predicted position is
+    closer to the truth than the last fix.
+    """
+
+    import numpy as np
+    from math import sin, cos, radians
+    from auv.position_estimator import PositionEstimator
+
+    heading = 70.0
+    speed = 1.5
+    velocity_x = speed * sin(radians(heading))
+    velocity_y = speed * cos(radians(heading))
+
+    estimator = PositionEstimator(0.5, 0.2, 0.05)
+    assert estimator.position_at(0.0) is None
+
+    rng = np.random.default_rng(3)
+    last_fix_errors = list()
+    predicted_errors = list()
+    for second in range(60):
+        true_x = 1000.0 + velocity_x * second
+        true_y = 2000.0 + velocity_y * second
+        fix_x, fix_y = rng.normal((true_x, true_y), 0.5).tolist()
+        estimator.update_x(fix_x, second)
+        estimator.update_y(fix_y, second + 0.01)
+        estimator.update_heading_and_speed(heading, speed, second + 0.02)
+
+        if second >= 10:
+            predicted_x, predicted_y = estimator.position_at(second + 0.9)
+            predicted_errors.append(np.hypot(predicted_x - (true_x + velocity_x * 0.9),
+                                             predicted_y - (true_y + velocity_y * 0.9)))
+            last_fix_errors.append(np.hypot(fix_x - (true_x + velocity_x * 0.9),
+                                            fix_y - (true_y + velocity_y * 0.9)))
+
+    assert np.mean(predicted_errors) < 0.5
+    assert np.mean(predicted_errors) < np.mean(last_fix_errors) / 3.0
+
+
+def test_current_position(monkeypatch):
+    """test_current_position()
+    """
+
+    from auv.auv import Auv, variables_list
+    from auv.position_estimator import PositionEstimator
+    from auv_bonus_xprize.settings import config
+
+    def new_Auv_init(self):
+        self._auv_data = dict()
+        for variable_name in variables_list():
+            self._auv_data[variable_name] = None
+
+        self.position_estimator = PositionEstimator()
+
+    monkeypatch.setattr(Auv,
+                        '__init__',
+                        new_Auv_init)
+    monkeypatch.setattr('auv.auv.time', lambda: 102.0)
+
+    auv = Auv()
+    auv._process_auv_data(config['variables']['heading'], 90.0, 99.0)
+    auv._process_auv_data(config['variables']['easting_x'], 10.0, 100.0)
+    auv._process_auv_data(config['variables']['northing_y'], 20.0, 100.0)
+    auv._process_auv_data(config['variables']['speed'], 2.0, 100.0)
+
+    monkeypatch.setitem(config['auv'], 'dead_reckoning', 'false')
+    position = auv.current_position()
+    assert (position.x, position.y) == (10.0, 20.0)
+
+    monkeypatch.setitem(config['auv'], 'dead_reckoning', 'true')
+    position = auv.current_position()
+    assert position.x == pytest.approx(14.0, abs=0.01)
+    assert position.y == pytest.approx(20.0)
@@ -73,3 +73,50 @@ def test_altitude_low(monkeypatch):
     auv = Auv()
 
     assert auv.altitude_safety() == 0.5
+
+
+def test_altitude_charted(monkeypatch):
+    """test_altitude_charted()
+
+    When the altimeter is out of range, use the charted depth.
+    """
+
+    import numpy as np
+    from searchspace.bathymetry import Bathymetry
+
+    def new_Auv_init(self):
+        class new_Auv_MOOS(object):
+            def publish_variable(self, variable, value, dummy):
+                pass
+
+        self._auv_data = dict()
+        self._auv_data['NAV_ALTITUDE'] = 0.0
+        self._auv_data['NAV_X'] = 10.0
+        self._auv_data['NAV_Y'] = 10.0
+        self._auv_data['NAV_DEPTH'] = 39.0
+
+        self.bathymetry = Bathymetry(np.full((3, 3), 40.0), 0.0, 0.0, 10.0)
+
+        self.auv_control = new_Auv_MOOS()
+
+    from auv.auv import Auv
+    monkeypatch.setattr(Auv,
+                        '__init__',
+                        new_Auv_init)
+
+    from auv_bonus_xprize.settings import config
+    config['auv']['min_altitude_meters'] = '2.5'
+    config['variables']['altitude'] = 'NAV_ALTITUDE'
+    config['variables']['easting_x'] = 'NAV_X'
+    config['variables']['northing_y'] = 'NAV_Y'
+    config['variables']['depth'] = 'NAV_DEPTH'
+
+    auv = Auv()
+
+    assert auv.altitude_safety() == 1.5
+
+    auv._auv_data['NAV_DEPTH'] = 30.0
+    assert auv.altitude_safety() == 0.0
+
+    auv._auv_data['NAV_X'] = 100.0
+    assert auv.altitude_safety() == 0.0
@@ -300,3 +300,53 @@ def test_depth_is_close(monkeypatch, mocker):
 
     waypoint = (10, 10, 5, 90)
     assert auv.move_toward_waypoint(waypoint) == 'DONE'
+
+
+def test_crab_toward_the_waypoint(monkeypatch, mocker):
+    """test_crab_toward_the_waypoint()
+    """
+
+    from auv_bonus_xprize.settings import config
+    config['auv']['distance_tolerance'] = '1.0'
+    config['variables']['easting_x'] = 'NAV_X'
+    config['variables']['northing_y'] = 'NAV_Y'
+    config['variables']['set_heading'] = 'DESIRED_HEADING'
+
+    from auv.auv import variables_list
+
+    published = dict()
+
+    def new_Auv_init(self):
+        class new_Auv_MOOS(object):
+            def publish_variable(self, variable, value, dummy):
+                published[variable] = value
+
+        self._auv_data = dict()
+        for variable_name in variables_list():
+            self._auv_data[variable_name] = None
+
+        self._current_waypoint = dict()
+        self.auv_control = new_Auv_MOOS()
+
+    from auv.auv import Auv
+    monkeypatch.setattr(Auv,
+                        '__init__',
+                        new_Auv_init)
+
+    auv = Auv()
+
+    monkeypatch.setattr(auv,
+                        '_auv_data',
+                        {'NAV_X': 10.0,
+                         'NAV_Y': 10.0,
+                         'NAV_DEPTH': 5.0})
+    mocker.patch.object(auv, 'altitude_safety', return_value=0.0)
+
+    assert auv.move_toward_waypoint((10, 100, 5, 0)) == 'MORE'
+    assert published['DESIRED_HEADING'] == 0
+
+    assert auv.move_toward_waypoint((10, 100, 5, 0, 345.0)) == 'MORE'
+    assert published['DESIRED_HEADING'] == pytest.approx(345.0)
+
+    assert auv.move_toward_waypoint((10, 100, 5, 0, None)) == 'MORE'
+    assert published['DESIRED_HEADING'] == 0
@@ -20,10 +20,14 @@ from time import time, sleep
 from enum import Enum, unique
 from auv_bonus_xprize.settings import config
 from auv.auv import Auv
+from auv.dye_sensor import ADC_GAIN
 from searchspace.searchspace import SearchSpace
 from searchspace.geometry import compass_heading_to_polar_angle
+from searchspace.geofence import INSIDE, NEAR, OUTSIDE
 
 quitting_time = time() + 10.0
+geofence_armed = False
+geofence_status = INSIDE
 
 
 @unique
@@ -41,8 +45,12 @@ def limit_reached(auv):
     """limit_reached()
 
     Check all of the limits. If at least one has been reached,
-    return True.
+    return True. Once the AUV has reached the starting position,
+    leaving the contest area is one of the limits. Coming near the
+    edge of the contest area is logged once, when it happens, not
+    on every check.
     """
+    global geofence_status
 
 #    logging.debug('data: {0}, voltage: {1}, min: {2}, quitting: {3}, time: {4}'.format(
 #        auv.data_not_updated(),
@@ -66,6 +74,18 @@ def limit_reached(auv):
         logging.error('Time limit reached')
         return True
 
+    if geofence_armed:
+        previous_status = geofence_status
+        geofence_status = auv.geofence_status()
+        if geofence_status == OUTSIDE:
+            logging.error('Outside the contest area geofence')
+            return True
+        if geofence_status != previous_status:
+            if geofence_status == NEAR:
+                logging.warning('Near the edge of the contest area geofence')
+            else:
+                logging.info('Away from the edge of the contest area geofence')
+
     return False
 
 
@@ -76,6 +96,7 @@ def waiting_to_start(auv, search_space):
     and then wait until the AUV is close to that position.
     """
     global quitting_time
+    global geofence_armed
 
     logging.debug('waiting_to_start()')
     auv.strobe('OFF')
@@ -94,6 +115,7 @@ def waiting_to_start(auv, search_space):
 
     time_limit = float(config['search']['time_limit_secs'])
     quitting_time = time() + time_limit
+    geofence_armed = True
     logging.debug('waiting_to_start(): time_limit is {0}, quitting_time is {1}'.format(
         time_limit,
         quitting_time))
@@ -109,14 +131,27 @@ def search_for_plume(auv, search_space):
     """search_for_plume()
 
     Calculate a search path and then follow that search path
-    until the end or the plume is found.
+    until the end or the plume is found. With the
+    stream_search_path option, each waypoint is planned as it's
+    reached instead.
     """
 
     logging.debug('search_for_plume()')
 
-    auv.watchdog.stop()
-    search_path = search_space.calculate_search_path()
-    auv.watchdog.reset()
+    estimated_current = auv.current_estimator.estimate()
+    logging.debug('search_for_plume(): Estimated set {0}, drift {1:.2f}, confidence {2:.2f}'.format(
+        *estimated_current))
+    search_space.set_estimated_current(*estimated_current)
+    if config['search'].getboolean('stream_search_path', fallback=False):
+        search_path = search_space.iter_search_path()
+    else:
+        auv.watchdog.stop()
+        search_path = search_space.calculate_search_path()
+        auv.watchdog.reset()
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug('search_for_plume(): {0} positions on the search path are not yet sampled'.format(
+                len(search_space.unsampled_positions(search_path))))
 
     for waypt in search_path:
         logging.debug('search_for_plume(): Moving to waypt {0}'.format(waypt))
@@ -127,7 +162,15 @@ def search_for_plume(auv, search_space):
             if limit_reached(auv):
                 return AUVState.AbortMission
 
-            if auv.plume_detected():
+            plume_detected = auv.plume_detected()
+            search_space.record_auv_path(
+                auv._auv_data[config['variables']['easting_x']],
+                auv._auv_data[config['variables']['northing_y']],
+                auv._auv_data[config['variables']['depth']],
+                auv.last_sensor_value,
+                ADC_GAIN)
+
+            if plume_detected:
                 current_depth = auv._auv_data[config['variables']['depth']]
                 above_the_bottom = float(config['search']['max_depth']) - current_depth
                 depth_tolerance = float(config['auv']['depth_tolerance'])
@@ -25,8 +25,8 @@ Test the methods:
 import logging
 from time import sleep
 
-from auv_bonus_xprize.settings import config
 from auv.auv import Auv
+from searchspace.navigation import utm_position_from_config
 
 auv = Auv()
 
@@ -35,7 +35,7 @@ while not auv.auv_control.connected:
     sleep(1.0)
 
 logging.debug('wait_to_start() {0}'.format(
-    config['starting']['auv_position_utm']))
+    utm_position_from_config('auv_position')))
 while auv.wait_to_start():
     auv.plume_detected()
     sleep(10)
@@ -0,0 +1,75 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+import pytest
+
+def test_geofence_limit(monkeypatch, caplog):
+    """test_geofence_limit()
+    """
+
+    from time import time
+    from auv.auv import Auv, variables_list
+    from auv_bonus_xprize import auv_main_loop
+    from auv_bonus_xprize.settings import config
+    from searchspace.geofence import Geofence
+    from searchspace.geometry import Point
+
+    def new_Auv_init(self):
+        self._auv_data = dict()
+        for variable_name in variables_list():
+            self._auv_data[variable_name] = None
+
+        self.geofence = Geofence.construct_from_vertices(
+            [Point(0.0, 0.0), Point(0.0, 1000.0),
+             Point(1000.0, 1000.0), Point(1000.0, 0.0)],
+            1.0,
+            10.0)
+
+    monkeypatch.setattr(Auv,
+                        '__init__',
+                        new_Auv_init)
+
+    auv = Auv()
+    auv._auv_data['DATA_TIMESTAMP'] = time()
+    auv._auv_data[config['variables']['battery']] = 100.0
+    auv._auv_data[config['variables']['easting_x']] = -50.0
+    auv._auv_data[config['variables']['northing_y']] = 500.0
+    monkeypatch.setitem(config['auv'], 'min_battery_voltage', '10.0')
+    monkeypatch.setattr(auv_main_loop, 'quitting_time', time() + 60.0)
+    monkeypatch.setattr(auv_main_loop, 'geofence_status', auv_main_loop.INSIDE)
+
+    monkeypatch.setattr(auv_main_loop, 'geofence_armed', False)
+    assert not auv_main_loop.limit_reached(auv)
+
+    monkeypatch.setattr(auv_main_loop, 'geofence_armed', True)
+    assert auv_main_loop.limit_reached(auv)
+
+    auv._auv_data[config['variables']['easting_x']] = 500.0
+    assert not auv_main_loop.limit_reached(auv)
+
+    #
+    # Near the edge, the warning is logged once.
+    #
+    caplog.clear()
+    auv._auv_data[config['variables']['easting_x']] = 5.0
+    assert not auv_main_loop.limit_reached(auv)
+    assert not auv_main_loop.limit_reached(auv)
+    assert [record.message for record in caplog.records].count(
+        'Near the edge of the contest area geofence') == 1
+
+    auv._auv_data[config['variables']['easting_x']] = 500.0
+    assert not auv_main_loop.limit_reached(auv)
+    auv._auv_data[config['variables']['easting_x']] = 5.0
+    assert not auv_main_loop.limit_reached(auv)
+    assert [record.message for record in caplog.records].count(
+        'Near the edge of the contest area geofence') == 2
@@ -0,0 +1,242 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Benchmark cases
+
+Each case is a function which prepares fixed inputs, sized like
+the competition area, and returns the callable to be timed. The
+inputs don't depend on the local configuration file, so results
+from different machines and runs can be compared: the cases are
+prepared and timed inside pinned_config().
+"""
+
+from contextlib import contextmanager
+
+from auv_bonus_xprize.settings import config
+from searchspace.geometry import Point, Line, GeneralLine, Polygon
+from searchspace.geometry import bearing_to_point
+from searchspace.navigation import NavConverter
+from searchspace.searchspace import SearchSpace
+from searchspace.coverage import boustrophedon_path
+
+NORTHWEST = Point(757001.19, 1979352.50)
+NORTHEAST = Point(758002.65, 1979365.56)
+SOUTHEAST = Point(758015.66, 1978369.11)
+SOUTHWEST = Point(757014.15, 1978356.06)
+START = Point(757500.0, 1979200.0)
+TRACK_HEADING = 0
+OBLIQUE_HEADING = 30
+
+CENTER_LAT = 17.88554
+CENTER_LON = -66.56976
+AREA_METERS = 1000.0
+GEO_POSITION = (17.88700, -66.57100)
+CARTESIAN_POSITION = (400.0, 600.0)
+
+#
+# Every option calculate_search_path() reads, as used for the
+# competition. An option set to None is removed, so its default
+# is used, such as keeping the plans only in memory.
+#
+SEARCH_CONFIG = {
+    'starting': {
+        'auv_position_utm': '757500.0,1979200.0',
+        'northwest_utm': '757001.19,1979352.50',
+        'northeast_utm': '758002.65,1979365.56',
+        'southeast_utm': '758015.66,1978369.11',
+        'southwest_utm': '757014.15,1978356.06',
+        'set': '270',
+        'drift': '0.0',
+    },
+    'search': {
+        'max_depth_meters': '45.0',
+        'min_depth_meters': '30.0',
+        'boundary_buffer_meters': '100.0',
+        'track_separation_meters': '5.0',
+        'planning_frame': 'utm',
+        'frame_snap_degrees': '5.0',
+        'search_pattern': 'curtain',
+        'follow_seafloor': 'false',
+        'drift_compensation': 'false',
+        'estimate_current': 'false',
+        'min_current_confidence': '0.8',
+        'voxel_cell_meters': '5.0',
+        'voxel_layer_meters': None,
+        'sample_radius_meters': None,
+        'plan_cache_size': '16',
+        'plan_cache_dir': None,
+    },
+    'auv': {
+        'max_speed': '1.5',
+        'min_altitude_meters': '5.0',
+    },
+}
+
+
+@contextmanager
+def pinned_config():
+    """pinned_config()
+
+    Set the options in SEARCH_CONFIG in the shared configuration,
+    and restore the options which were there before on the way out.
+    """
+
+    saved = list()
+    try:
+        for section, options in SEARCH_CONFIG.items():
+            for option, value in options.items():
+                if config.has_option(section, option):
+                    saved.append((section, option, config.get(section, option, raw=True)))
+                else:
+                    saved.append((section, option, None))
+
+                if value is None:
+                    config.remove_option(section, option)
+                else:
+                    config[section][option] = value
+
+        yield
+    finally:
+        for section, option, value in saved:
+            if value is None:
+                config.remove_option(section, option)
+            else:
+                config[section][option] = value
+
+
+def competition_polygon():
+    """competition_polygon()
+
+    Return the Polygon of the competition area.
+    """
+
+    return Polygon([NORTHWEST, NORTHEAST, SOUTHEAST, SOUTHWEST])
+
+
+def bench_bearing_to_point():
+    return lambda: bearing_to_point(START, NORTHEAST)
+
+
+def bench_line_find_intersection():
+    boundary = Line.construct_from_two_points(NORTHWEST, NORTHEAST)
+    track = Line.construct_from_heading(START, OBLIQUE_HEADING)
+
+    return lambda: boundary.find_intersection(track)
+
+
+def bench_general_line_find_intersection():
+    boundary = GeneralLine.construct_from_two_points(NORTHWEST, NORTHEAST)
+    track = GeneralLine.construct_from_heading(START, OBLIQUE_HEADING)
+
+    return lambda: boundary.find_intersection(track)
+
+
+def _line_operations(cls):
+    """_line_operations()
+
+    Return a dict of the operations of the line class cls, other
+    than the oblique find_intersection, by name, on the competition
+    boundaries, so Line and GeneralLine can be compared.
+    """
+
+    boundary = cls.construct_from_two_points(NORTHWEST, NORTHEAST)
+    track = cls.construct_from_heading(START, TRACK_HEADING)
+
+    return {
+        'construct_from_two_points': lambda: cls.construct_from_two_points(NORTHEAST,
+                                                                           SOUTHEAST),
+        'construct_from_heading': lambda: cls.construct_from_heading(START, TRACK_HEADING),
+        'find_intersection_vertical': lambda: boundary.find_intersection(track),
+        'find_perpendicular': lambda: boundary.find_perpendicular(START),
+        'distance_to_point': lambda: boundary.distance_to_point(START),
+    }
+
+
+def _line_cases(prefix, cls):
+    """_line_cases()
+
+    Return the (name, prepare) cases of _line_operations() for
+    the line class cls, named prefix_operation.
+    """
+
+    return [('{0}_{1}'.format(prefix, operation),
+             lambda operation=operation: _line_operations(cls)[operation])
+            for operation in _line_operations(cls)]
+
+
+def bench_polygon_point_is_inside():
+    polygon = competition_polygon()
+
+    return lambda: polygon.point_is_inside(START)
+
+
+def bench_polygon_exit_point():
+    polygon = competition_polygon()
+
+    return lambda: polygon.exit_point(START, OBLIQUE_HEADING)
+
+
+def bench_nav_geo_to_cartesian():
+    converter = NavConverter.construct_from_center(CENTER_LAT,
+                                                   CENTER_LON,
+                                                   AREA_METERS,
+                                                   AREA_METERS)
+
+    return lambda: converter.geo_to_cartesian(GEO_POSITION)
+
+
+def bench_nav_cartesian_to_geo():
+    converter = NavConverter.construct_from_center(CENTER_LAT,
+                                                   CENTER_LON,
+                                                   AREA_METERS,
+                                                   AREA_METERS)
+
+    return lambda: converter.cartesian_to_geo(CARTESIAN_POSITION)
+
+
+def bench_calculate_search_path():
+    search_space = SearchSpace()
+    search_space.set_search_boundaries()
+    search_space.set_current_velocity()
+
+    return search_space._plan
+
+
+def bench_cached_search_path():
+    search_space = SearchSpace()
+    search_space.set_search_boundaries()
+    search_space.calculate_search_path()
+
+    return search_space.calculate_search_path
+
+
+def bench_boustrophedon_path():
+    polygon = competition_polygon()
+
+    return lambda: boustrophedon_path(polygon, OBLIQUE_HEADING, 5.0, 30.0, start=START)
+
+
+CASES = [
+    ('bearing_to_point', bench_bearing_to_point),
+    ('line_find_intersection', bench_line_find_intersection),
+    ('general_line_find_intersection', bench_general_line_find_intersection),
+    ('polygon_point_is_inside', bench_polygon_point_is_inside),
+    ('polygon_exit_point', bench_polygon_exit_point),
+    ('nav_geo_to_cartesian', bench_nav_geo_to_cartesian),
+    ('nav_cartesian_to_geo', bench_nav_cartesian_to_geo),
+    ('calculate_search_path', bench_calculate_search_path),
+    ('cached_search_path', bench_cached_search_path),
+    ('boustrophedon_path', bench_boustrophedon_path),
+]
+
+CASES += _line_cases('line', Line) + _line_cases('general_line', GeneralLine)
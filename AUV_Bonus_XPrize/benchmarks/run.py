@@ -0,0 +1,180 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Benchmark runner
+
+Time each case in benchmarks.cases, report operations per
+second and the memory allocated by one operation, optionally
+save the results as JSON and compare them against a saved
+baseline.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json --threshold 10
+
+The exit status is 1 if any case is slower than the baseline
+by more than the threshold percentage.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.cases import CASES, pinned_config
+
+REPEAT = 5
+DEFAULT_THRESHOLD_PERCENT = 10.0
+
+
+def measure(operation, repeat=REPEAT):
+    """measure()
+
+    Return a dict with the operations per second of the fastest of
+    repeat timings of operation, and the peak and retained bytes
+    allocated by one call, as traced by tracemalloc.
+    """
+
+    operation()
+
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        tracemalloc.clear_traces()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        operation()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ops_per_sec': 1.0 / best,
+        'usec_per_op': best * 1e6,
+        'peak_bytes': peak - before,
+        'retained_bytes': after - before,
+    }
+
+
+def run_cases(selected=None, repeat=REPEAT):
+    """run_cases()
+
+    Measure every case, or only those whose names contain one of
+    the selected strings, with the configuration pinned by
+    pinned_config(). Return a dict of the results by name.
+    """
+
+    results = dict()
+    for name, prepare in CASES:
+        if selected and not any(part in name for part in selected):
+            continue
+
+        with pinned_config():
+            results[name] = measure(prepare(), repeat)
+
+    return results
+
+
+def compare(results, baseline, threshold_percent):
+    """compare()
+
+    Return a list of (name, baseline ops/sec, ops/sec, change percent)
+    for each case which is slower than in the baseline by more than
+    threshold_percent. Cases missing from either are ignored.
+    """
+
+    regressions = list()
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        baseline_ops = baseline[name]['ops_per_sec']
+        change = (result['ops_per_sec'] - baseline_ops) / baseline_ops * 100.0
+        if change < -threshold_percent:
+            regressions.append((name, baseline_ops, result['ops_per_sec'], change))
+
+    return regressions
+
+
+def main(argv=None):
+    """main()
+
+    Parse the command line, run the benchmarks, print a table and
+    return the exit status.
+    """
+
+    parser = argparse.ArgumentParser(description='Run the benchmarks')
+    parser.add_argument('--output',
+                        help='save the results as JSON to this file')
+    parser.add_argument('--baseline',
+                        help='compare against results saved by --output')
+    parser.add_argument('--threshold',
+                        type=float,
+                        default=DEFAULT_THRESHOLD_PERCENT,
+                        help='percent slower than the baseline which fails')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=REPEAT,
+                        help='timings per case, the fastest is used')
+    parser.add_argument('cases',
+                        nargs='*',
+                        help='run only the cases containing these strings')
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.cases, args.repeat)
+
+    baseline = dict()
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+    print('{0:40} {1:>12} {2:>10} {3:>10} {4:>9}'.format(
+        'case', 'ops/sec', 'usec/op', 'peak B', 'change'))
+    for name, result in results.items():
+        change = ''
+        if name in baseline:
+            change = '{0:+8.1f}%'.format(
+                (result['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1.0) * 100.0)
+        print('{0:40} {1:12.0f} {2:10.2f} {3:10d} {4:>9}'.format(
+            name,
+            result['ops_per_sec'],
+            result['usec_per_op'],
+            result['peak_bytes'],
+            change))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'python': platform.python_version(),
+                       'numpy': np.__version__,
+                       'machine': platform.machine(),
+                       'results': results},
+                      output_file,
+                      indent=2,
+                      sort_keys=True)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, baseline_ops, ops, change in regressions:
+        print('REGRESSION {0}: {1:.0f} -> {2:.0f} ops/sec ({3:+.1f}%)'.format(
+            name, baseline_ops, ops, change))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
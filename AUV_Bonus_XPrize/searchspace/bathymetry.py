@@ -0,0 +1,204 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Bathymetry
+
+The depth of the sea floor, from a grid of charted depths
+at UTM positions.
+"""
+
+import hashlib
+from math import isnan
+import numpy as np
+from auv_bonus_xprize.settings import config
+
+
+class Bathymetry(object):
+    """Bathymetry
+
+    A grid of sea floor depths in meters, positive down. The depth
+    in row r and column c is at UTM easting origin_x + c * cell_size
+    and northing origin_y + r * cell_size, so row 0 is the southern
+    edge of the grid. Depths between grid points are interpolated
+    bilinearly. Positions outside the grid, or next to a grid point
+    without a depth (NaN), have a NaN depth.
+    """
+
+    def __init__(self, depths, origin_x, origin_y, cell_size):
+        """__init__()
+
+        Use the 2-dimensional array depths, which may be a
+        memory-mapped array, without copying it.
+        """
+
+        if depths.ndim != 2 or depths.shape[0] < 2 or depths.shape[1] < 2:
+            raise Exception('The depths must be a grid of at least 2 by 2')
+        if cell_size <= 0.0:
+            raise Exception('The cell size must be greater than zero')
+
+        #
+        # A plain ndarray view of a memory-mapped array still reads
+        # from the file, without the overhead of numpy.memmap
+        # indexing.
+        #
+        self._depths = np.asarray(depths)
+        self._origin_x = float(origin_x)
+        self._origin_y = float(origin_y)
+        self._cell_size = float(cell_size)
+        self._last_row = depths.shape[0] - 1
+        self._last_column = depths.shape[1] - 1
+        self._digest = None
+
+    @classmethod
+    def construct_from_file(cls, filename, origin_x, origin_y, cell_size):
+        """construct_from_file()
+
+        Memory-map the depths saved by numpy.save() in filename,
+        so only the parts of the grid which are queried are read.
+        """
+
+        return cls(np.load(filename, mmap_mode='r'),
+                   origin_x,
+                   origin_y,
+                   cell_size)
+
+    @property
+    def cell_size(self):
+        """cell_size
+
+        The spacing of the grid in meters.
+        """
+
+        return self._cell_size
+
+    @property
+    def digest(self):
+        """digest
+
+        The SHA-256 hex digest of the grid, its origin and its cell
+        size, which identifies the charted depths. The whole grid is
+        read the first time.
+        """
+
+        if self._digest is None:
+            digest = hashlib.sha256(np.array([self._origin_x,
+                                              self._origin_y,
+                                              self._cell_size]).tobytes())
+            digest.update(np.array(self._depths.shape).tobytes())
+            digest.update(np.ascontiguousarray(self._depths, dtype=float).tobytes())
+            self._digest = digest.hexdigest()
+
+        return self._digest
+
+    def _grid_position(self, x, y):
+        """_grid_position()
+
+        Return the column and row of x, y as floats.
+        """
+
+        return ((x - self._origin_x) / self._cell_size,
+                (y - self._origin_y) / self._cell_size)
+
+    def depth_at(self, x, y):
+        """depth_at()
+
+        Return the sea floor depth at UTM x, y.
+        """
+
+        column_position, row_position = self._grid_position(x, y)
+        if not (0.0 <= column_position <= self._last_column and
+                0.0 <= row_position <= self._last_row):
+            return float('nan')
+
+        #
+        # A position on the northern or eastern edge uses the last
+        # cell, so its corners are all inside the grid.
+        #
+        column = min(int(column_position), self._last_column - 1)
+        row = min(int(row_position), self._last_row - 1)
+        column_fraction = column_position - column
+        row_fraction = row_position - row
+
+        corners = self._depths[row:row + 2, column:column + 2].tolist()
+        (south_west, south_east), (north_west, north_east) = corners
+        south = south_west * (1.0 - column_fraction) + south_east * column_fraction
+        north = north_west * (1.0 - column_fraction) + north_east * column_fraction
+
+        return south * (1.0 - row_fraction) + north * row_fraction
+
+    def depths_at(self, x, y):
+        """depths_at()
+
+        The array version of depth_at(). Return an array of the
+        sea floor depths at the arrays of UTM x and y.
+        """
+
+        column_position, row_position = self._grid_position(
+            np.asarray(x, dtype=float),
+            np.asarray(y, dtype=float))
+        outside = ~((0.0 <= column_position) & (column_position <= self._last_column) &
+                    (0.0 <= row_position) & (row_position <= self._last_row))
+
+        column = np.clip(np.floor(column_position), 0, self._last_column - 1).astype(int)
+        row = np.clip(np.floor(row_position), 0, self._last_row - 1).astype(int)
+        column_fraction = column_position - column
+        row_fraction = row_position - row
+
+        depths = self._depths
+        south = (depths[row, column] * (1.0 - column_fraction) +
+                 depths[row, column + 1] * column_fraction)
+        north = (depths[row + 1, column] * (1.0 - column_fraction) +
+                 depths[row + 1, column + 1] * column_fraction)
+
+        return np.where(outside,
+                        np.nan,
+                        south * (1.0 - row_fraction) + north * row_fraction)
+
+    def altitude_at(self, x, y, depth):
+        """altitude_at()
+
+        Return the height above the sea floor at UTM x, y when
+        at depth, or None if the sea floor depth isn't known.
+        """
+
+        floor_depth = self.depth_at(x, y)
+        if isnan(floor_depth):
+            return None
+
+        return floor_depth - depth
+
+
+def bathymetry_from_config():
+    """bathymetry_from_config()
+
+    Return the Bathymetry defined in the bathymetry section of the
+    configuration file, or None if there isn't one. The section
+    defines the depths file written by numpy.save(), the UTM
+    position of its first grid point and the spacing of the grid:
+
+        [bathymetry]
+        depths_file = /home/quest/depths.npy
+        origin_utm = 756900.0,1978250.0
+        cell_size_meters = 5.0
+    """
+
+    if not config.has_section('bathymetry'):
+        return None
+
+    bathymetry = config['bathymetry']
+    origin_x, origin_y = bathymetry['origin_utm'].split(',')[:2]
+
+    return Bathymetry.construct_from_file(bathymetry['depths_file'],
+                                          float(origin_x),
+                                          float(origin_y),
+                                          float(bathymetry['cell_size_meters']))
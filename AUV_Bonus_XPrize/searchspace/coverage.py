@@ -0,0 +1,234 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Coverage
+
+Boustrophedon (back and forth) coverage of a polygon, with
+optional holes, by parallel sweep lines.
+"""
+
+import numpy as np
+from searchspace.navigation import LocalFrame
+
+#
+# Sweep segments shorter than this, in meters, such as where a
+# sweep line only grazes a vertex, are left out.
+#
+MIN_SEGMENT_LENGTH = 1e-6
+
+
+def _ring_edges(polygons, frame):
+    """_ring_edges()
+
+    Return the x0, y0, x1, y1 arrays of the edges of all of the
+    polygons, in the frame.
+    """
+
+    starts = list()
+    for polygon in polygons:
+        starts.append(frame.to_local([vertex.as_tuple() for vertex in polygon.vertices]))
+
+    ends = [np.roll(ring, -1, axis=0) for ring in starts]
+    starts = np.concatenate(starts)
+    ends = np.concatenate(ends)
+
+    return starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]
+
+
+def sweep_segments(polygon, sweep_heading, spacing, holes=()):
+    """sweep_segments()
+
+    Return the frame used and the line, x, low y and high y arrays
+    of the segments of the sweep lines inside the polygon and
+    outside the holes. The sweep lines run along sweep_heading,
+    which is the +y axis of the frame, spacing meters apart and
+    centered across the polygon, so no part of it is more than half
+    a spacing from a line. The segments are ordered by line and
+    then by y.
+
+    Every sweep line is intersected with every edge in one pass,
+    as a (lines, edges) array.
+    """
+
+    if spacing <= 0.0:
+        raise Exception('The spacing must be greater than zero')
+
+    frame = LocalFrame(polygon.centroid, sweep_heading)
+    x0, y0, x1, y1 = _ring_edges([polygon] + list(holes), frame)
+
+    min_x = min(x0.min(), x1.min())
+    max_x = max(x0.max(), x1.max())
+    line_count = max(1, int(np.ceil((max_x - min_x) / spacing)))
+    first_x = (min_x + max_x) / 2.0 - (line_count - 1) * spacing / 2.0
+    line_x = first_x + np.arange(line_count) * spacing
+
+    #
+    # An edge crosses a line when its ends are on opposite sides,
+    # counting an end on the line as on its right, so a line through
+    # a vertex crosses one of the two edges meeting there.
+    #
+    x = line_x[:, np.newaxis]
+    crosses = (x0 <= x) != (x1 <= x)
+    dx = np.where(x1 != x0, x1 - x0, 1.0)
+    crossing_y = np.where(crosses, y0 + (x - x0) * (y1 - y0) / dx, np.nan)
+    crossing_y.sort(axis=1)
+
+    #
+    # Inside the polygon and outside the holes lies between the
+    # first and second crossings, the third and fourth, and so on.
+    #
+    low = crossing_y[:, 0::2]
+    high = crossing_y[:, 1::2][:, :low.shape[1]]
+    if high.shape[1] < low.shape[1]:
+        high = np.pad(high, ((0, 0), (0, 1)), constant_values=np.nan)
+    valid = ~np.isnan(low) & ~np.isnan(high) & (high - low > MIN_SEGMENT_LENGTH)
+
+    lines, pairs = np.nonzero(valid)
+
+    return (frame,
+            lines,
+            line_x[lines],
+            low[lines, pairs],
+            high[lines, pairs])
+
+
+def _cells(lines, low, high):
+    """_cells()
+
+    Group the segments into cells, each a run of segments on
+    consecutive lines which overlap only each other, so a cell can
+    be swept back and forth without crossing the boundary or a
+    hole. Return a list of the lists of segment indices in each
+    cell, in the order the cells start.
+    """
+
+    cells = list()
+    previous = list()
+    previous_line = None
+    segment = 0
+    for line in np.unique(lines).tolist():
+        if previous_line is None or line != previous_line + 1:
+            previous = list()
+        previous_line = line
+
+        current = list()
+        while segment < len(lines) and lines[segment] == line:
+            current.append(segment)
+            segment += 1
+
+        overlaps = dict()
+        for this in current:
+            overlaps[this] = [(cell, last) for cell, last in previous
+                              if low[this] <= high[last] and low[last] <= high[this]]
+        overlapped = dict()
+        for this in current:
+            for cell, last in overlaps[this]:
+                overlapped[last] = overlapped.get(last, 0) + 1
+
+        extended = list()
+        for this in current:
+            if len(overlaps[this]) == 1 and overlapped[overlaps[this][0][1]] == 1:
+                cell = overlaps[this][0][0]
+                cells[cell].append(this)
+            else:
+                cell = len(cells)
+                cells.append([this])
+            extended.append((cell, this))
+
+        previous = extended
+
+    return cells
+
+
+def boustrophedon_path(polygon, sweep_heading, spacing, depth, holes=(), start=None):
+    """boustrophedon_path()
+
+    Return the waypoints, as (x, y, depth, heading) tuples like
+    those of SearchSpace.calculate_search_path(), covering the
+    polygon outside the holes with sweeps along sweep_heading and
+    back, spacing meters apart, at depth. The polygon and the holes
+    are Polygons in UTM.
+
+    The area is divided into cells which can each be swept without
+    crossing a hole. The cells are swept in turn, each from the
+    corner nearest the last waypoint, or start if it's given. The
+    moves between cells are straight and may cross a hole.
+    """
+
+    frame, lines, line_x, low, high = sweep_segments(polygon,
+                                                     sweep_heading,
+                                                     spacing,
+                                                     holes)
+    if not len(lines):
+        return list()
+
+    if start is None:
+        position = None
+    else:
+        position = frame.to_local((start.x, start.y))[0]
+
+    local_points = list()
+    ascending = list()
+    for cell in _cells(lines, low, high):
+        cell = np.array(cell)
+        if position is None:
+            upward = True
+        else:
+            #
+            # Start from the nearest of the ends of the first and
+            # last sweeps, sweeping the cell in reverse from the last.
+            #
+            corners = np.array([[line_x[cell[0]], low[cell[0]]],
+                                [line_x[cell[0]], high[cell[0]]],
+                                [line_x[cell[-1]], low[cell[-1]]],
+                                [line_x[cell[-1]], high[cell[-1]]]])
+            corner = int(np.argmin(np.hypot(corners[:, 0] - position[0],
+                                            corners[:, 1] - position[1])))
+            if corner >= 2:
+                cell = cell[::-1]
+            upward = corner % 2 == 0
+
+        #
+        # Alternate the direction of the sweeps in the cell.
+        #
+        up = (np.arange(len(cell)) % 2 == 0) == upward
+        starts = np.where(up, low[cell], high[cell])
+        ends = np.where(up, high[cell], low[cell])
+        points = np.empty((2 * len(cell), 2))
+        points[0::2, 0] = line_x[cell]
+        points[1::2, 0] = line_x[cell]
+        points[0::2, 1] = starts
+        points[1::2, 1] = ends
+
+        local_points.append(points)
+        ascending.append(np.repeat(up, 2))
+        position = points[-1]
+
+    local_points = np.concatenate(local_points)
+    ascending = np.concatenate(ascending)
+    utm_points = frame.to_utm(local_points)
+
+    #
+    # The heading of each leg is the heading from the waypoint
+    # before. The sweeps are exactly on the sweep heading, and the
+    # first waypoint is given the heading of its sweep.
+    #
+    steps = np.diff(utm_points, axis=0)
+    headings = np.empty(len(utm_points))
+    headings[1:] = np.degrees(np.arctan2(steps[:, 0], steps[:, 1])) % 360
+    sweep_headings = np.where(ascending, sweep_heading % 360, (sweep_heading + 180) % 360)
+    headings[1::2] = sweep_headings[1::2]
+    headings[0] = sweep_headings[0]
+
+    return [(x, y, depth, heading) for (x, y), heading in
+            zip(utm_points.tolist(), headings.tolist())]
@@ -0,0 +1,204 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Geofence
+
+A raster of the contest area, built once, which tells whether
+a UTM position is inside the area, near its edge or outside it
+with a single lookup, away from the edges.
+"""
+
+from math import sqrt
+import numpy as np
+from auv_bonus_xprize.settings import config
+from searchspace.geometry import Point, Polygon, Segment
+from searchspace.navigation import utm_position_from_config
+
+INSIDE = 0
+NEAR = 1
+OUTSIDE = 2
+
+#
+# The cells the raster can't classify, which are checked against
+# the polygon.
+#
+_EDGE = 3
+
+#
+# The geofence defaults, when they aren't in the search section
+# of the configuration file. The cells only need to be small
+# compared to the area, since the positions in cells along the
+# edges are checked exactly.
+#
+GEOFENCE_CELL_METERS = 5.0
+GEOFENCE_NEAR_METERS = 25.0
+
+
+class Geofence(object):
+    """Geofence
+
+    A grid of square cells covering the polygon, each classified
+    once. Every position in an INSIDE cell is inside the polygon and
+    more than near_distance from its edges, and every position in an
+    OUTSIDE cell is outside the polygon. Positions in the remaining
+    cells, along the edge of the polygon and of the near_distance
+    band, are checked against the polygon itself: a position inside
+    the polygon and within near_distance of an edge is NEAR.
+    Positions beyond the grid are OUTSIDE.
+    """
+
+    def __init__(self, polygon, cell_size, near_distance):
+        """__init__()
+
+        Rasterize the polygon. Each cell is classified by whether
+        its center is inside the polygon and by the distance from
+        its center to the nearest edge, allowing for the half
+        diagonal of the cell. The cells are classified one row at
+        a time, so the memory used while building is proportional
+        to a row.
+        """
+
+        if cell_size <= 0.0:
+            raise Exception('The cell size must be greater than zero')
+        if near_distance < 0.0:
+            raise Exception('The near distance must not be negative')
+
+        half_diagonal = cell_size * sqrt(2.0) / 2.0
+        margin = near_distance + half_diagonal + cell_size
+
+        vertices = polygon.vertices
+        min_x = min(vertex.x for vertex in vertices) - margin
+        min_y = min(vertex.y for vertex in vertices) - margin
+        max_x = max(vertex.x for vertex in vertices) + margin
+        max_y = max(vertex.y for vertex in vertices) + margin
+
+        self._polygon = polygon
+        self._edges = [Segment(vertices[idx - 1], vertex)
+                       for idx, vertex in enumerate(vertices)]
+        self._near_distance = float(near_distance)
+        self._origin_x = min_x
+        self._origin_y = min_y
+        self._cell_size = float(cell_size)
+        self._columns = int(np.ceil((max_x - min_x) / cell_size))
+        self._rows = int(np.ceil((max_y - min_y) / cell_size))
+
+        centers = np.empty((self._columns, 2))
+        centers[:, 0] = min_x + (np.arange(self._columns) + 0.5) * cell_size
+        cells = bytearray()
+        for row in range(self._rows):
+            centers[:, 1] = min_y + (row + 0.5) * cell_size
+            cells += self._classify(centers, half_diagonal)
+
+        #
+        # A flat bytes object is indexed faster than a numpy array
+        # and returns a plain int.
+        #
+        self._cells = bytes(cells)
+
+    def _edge_distances(self, points):
+        """_edge_distances()
+
+        Return the distance from each of points to the nearest
+        edge of the polygon.
+        """
+
+        distances = self._edges[0].distances_to_points(points)
+        for edge in self._edges[1:]:
+            np.minimum(distances, edge.distances_to_points(points), out=distances)
+
+        return distances
+
+    def _classify(self, centers, half_diagonal):
+        """_classify()
+
+        Return the classes of the cells with the (N, 2) array of
+        centers, as bytes.
+        """
+
+        inside = self._polygon.points_are_inside(centers)
+        edge_distance = self._edge_distances(centers)
+
+        cells = np.full(len(centers), _EDGE, dtype=np.uint8)
+        cells[inside & (edge_distance > self._near_distance + half_diagonal)] = INSIDE
+        cells[inside
+              & (edge_distance > half_diagonal)
+              & (edge_distance < self._near_distance - half_diagonal)] = NEAR
+        cells[~inside & (edge_distance > half_diagonal)] = OUTSIDE
+
+        return cells.tobytes()
+
+    def _check_exactly(self, x, y):
+        """_check_exactly()
+
+        Return INSIDE, NEAR or OUTSIDE for UTM x, y from the
+        polygon itself.
+        """
+
+        position = Point(x, y)
+        if not self._polygon.point_is_inside(position):
+            return OUTSIDE
+
+        for edge in self._edges:
+            if edge.distance_to_point(position) <= self._near_distance:
+                return NEAR
+
+        return INSIDE
+
+    @classmethod
+    def construct_from_vertices(cls, vertices, cell_size, near_distance):
+        """construct_from_vertices()
+
+        Create the Geofence from a list of Points.
+        """
+
+        return cls(Polygon(vertices), cell_size, near_distance)
+
+    def check(self, x, y):
+        """check()
+
+        Return INSIDE, NEAR or OUTSIDE for UTM x, y.
+        """
+
+        column = int((x - self._origin_x) // self._cell_size)
+        row = int((y - self._origin_y) // self._cell_size)
+        if 0 <= column < self._columns and 0 <= row < self._rows:
+            status = self._cells[row * self._columns + column]
+            if status == _EDGE:
+                return self._check_exactly(x, y)
+            return status
+
+        return OUTSIDE
+
+
+def geofence_from_config():
+    """geofence_from_config()
+
+    Return the Geofence of the contest area defined by the corners
+    in the starting section of the configuration file, without the
+    boundary buffer used for the search area. The size of the cells
+    and the width of the band near the edges come from
+    geofence_cell_meters and geofence_near_meters in the search
+    section.
+    """
+
+    corners = [utm_position_from_config(corner) for corner in ['northwest',
+                                                                'northeast',
+                                                                'southeast',
+                                                                'southwest']]
+
+    return Geofence.construct_from_vertices(
+        corners,
+        config['search'].getfloat('geofence_cell_meters',
+                                  fallback=GEOFENCE_CELL_METERS),
+        config['search'].getfloat('geofence_near_meters',
+                                  fallback=GEOFENCE_NEAR_METERS))
@@ -17,12 +17,42 @@ Classes and methods for representing and interacting with
 points, lines, and polygons.
 """
 
-from math import sqrt, radians, cos, sin, pi
-from math import atan, degrees
-import matplotlib.path as mplPath
+from math import sqrt, radians, cos, sin, pi, hypot, ceil
+from math import atan, atan2, degrees
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from operator import attrgetter
+import numpy as np
 
 INFINITE = float("inf")
 
+#
+# How far, in the same units as the coordinates, a point may be
+# outside an edge of a Polygon and still be considered on the edge.
+# This is the half-width of the 0.1 radius stroke matplotlib used
+# for Polygon.point_is_inside() with clockwise vertices.
+#
+EDGE_TOLERANCE = 0.05
+
+#
+# Two GeneralLines are parallel when the sine of the angle
+# between them is no more than PARALLEL_TOLERANCE. A point is
+# on a GeneralLine when it is no more than LINE_TOLERANCE from it.
+#
+PARALLEL_TOLERANCE = 1e-9
+LINE_TOLERANCE = 1e-6
+
+#
+# Polygons with more edges than this use an EdgeGrid to find
+# the edges near a point or ray, instead of examining them all.
+#
+GRID_EDGE_THRESHOLD = 32
+
+#
+# How many (vertices, distance) results inset_vertices() keeps.
+#
+INSET_CACHE_SIZE = 32
+
 
 def bearing_to_point(point1, point2):
     """bearing_to_point()
@@ -94,6 +124,34 @@ def compass_heading_to_polar_angle(heading):
         return angle
 
 
+def heading_to_direction(heading):
+    """heading_to_direction()
+
+    Return the x and y components of the unit vector pointing
+    along the compass heading in degrees. As with
+    compass_heading_to_polar_angle(), the heading is truncated to
+    an integer. The angle is reduced to [0, 45] degrees before
+    calling sin() and cos(), so the components are exactly 0 or 1
+    for multiples of 90 degrees and exactly equal in magnitude for
+    the odd multiples of 45 degrees.
+    """
+
+    quarter_turns, angle = divmod(int(heading) % 360, 90)
+    if angle < 45:
+        x_offset = sin(radians(angle))
+        y_offset = cos(radians(angle))
+    elif angle > 45:
+        x_offset = cos(radians(90 - angle))
+        y_offset = sin(radians(90 - angle))
+    else:
+        x_offset = y_offset = sqrt(0.5)
+
+    for _ in range(quarter_turns):
+        x_offset, y_offset = y_offset, -x_offset
+
+    return x_offset + 0.0, y_offset + 0.0
+
+
 def formula_from_points(p1, p2):
     """formula_from_points()
 
@@ -120,53 +178,253 @@ class Point(object):
     """Point
 
     Represent a two-dimensional point and its
-    properties.
+    properties. A Point is immutable and hashable, so
+    it can be used in sets and as a dict key.
     """
 
+    __slots__ = ('_x', '_y')
+
+    dimensions = 2
+
     def __init__(self, x=0, y=0):
         """__init__
 
         Record the dimensions of a point.
         """
 
-        self.x = x
-        self.y = y
+        self._x = x
+        self._y = y
 
-        self.dimensions = 2
+    x = property(attrgetter('_x'), doc='The x coordinate.')
+    y = property(attrgetter('_y'), doc='The y coordinate.')
 
-        if self.x >= 0:
-            if self.y >= 0:
-                self.quadrant = 'I'
-            else:
-                self.quadrant = 'IV'
+    @property
+    def quadrant(self):
+        """quadrant
 
-        else:
-            if self.y >= 0:
-                self.quadrant = 'II'
-            else:
-                self.quadrant = 'III'
+        The quadrant containing the point, calculated only
+        when it's read.
+        """
+
+        if self._x >= 0:
+            if self._y >= 0:
+                return 'I'
+            return 'IV'
+
+        if self._y >= 0:
+            return 'II'
+        return 'III'
 
     def __eq__(self, other):
-        if isinstance(other, self.__class__):
-            return self.x == other.x and self.y == other.y
+        if isinstance(other, Point):
+            return self._x == other._x and self._y == other._y
         else:
             return False
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        return hash((self._x, self._y))
+
     def as_tuple(self):
         """as_tuple()
 
         Return the Point coordinates as a tuple.
         """
 
-        return (self.x, self.y)
+        return (self._x, self._y)
 
     def __repr__(self):
         """__repr__ Formatted output of the point dimensions."""
 
-        return '(%f, %f)' % (self.x, self.y)
+        return '(%f, %f)' % (self._x, self._y)
+
+
+class PointArray(object):
+    """PointArray
+
+    Represent N two-dimensional points as a single (N, 2)
+    array of floats, for use with the batch versions of the
+    geometry functions.
+    """
+
+    def __init__(self, coordinates):
+        """__init__
+
+        Record the coordinates, which must be shaped (N, 2)
+        with x in the first column and y in the second.
+        """
+
+        self._xy = np.array(coordinates, dtype=float, ndmin=2)
+        if self._xy.ndim != 2 or self._xy.shape[1] != 2:
+            raise Exception('Coordinates must be shaped (N, 2)')
+
+    @classmethod
+    def construct_from_points(cls, points):
+        """construct_from_points
+
+        Instantiate a PointArray from a sequence of Points.
+        """
+
+        return cls([(point.x, point.y) for point in points])
+
+    @property
+    def x(self):
+        return self._xy[:, 0]
+
+    @property
+    def y(self):
+        return self._xy[:, 1]
+
+    def as_array(self):
+        """as_array()
+
+        Return the (N, 2) array of coordinates.
+        """
+
+        return self._xy
+
+    def as_points(self):
+        """as_points()
+
+        Return the coordinates as a list of Points.
+        """
+
+        return [Point(x, y) for x, y in self._xy.tolist()]
+
+    def __len__(self):
+        return self._xy.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PointArray(self._xy[index])
+
+        x, y = self._xy[index].tolist()
+        return Point(x, y)
+
+    def __iter__(self):
+        return iter(self.as_points())
+
+    def __repr__(self):
+        """__repr__ Formatted output of the quantity of points."""
+
+        return 'PointArray(%d points)' % len(self)
+
+
+def _as_xy(points):
+    """_as_xy()
+
+    Return points, which may be a Point, a PointArray, or
+    anything shaped (N, 2), as an (N, 2) array of floats.
+    """
+
+    if isinstance(points, PointArray):
+        return points.as_array()
+
+    if isinstance(points, Point):
+        return np.array([[points.x, points.y]], dtype=float)
+
+    return PointArray(points).as_array()
+
+
+def _broadcast_xy(points1, points2):
+    """_broadcast_xy()
+
+    Return x1, y1, x2, y2 arrays of the same length, so a
+    single Point can be compared against many.
+    """
+
+    xy1 = _as_xy(points1)
+    xy2 = _as_xy(points2)
+
+    x1, x2 = np.broadcast_arrays(xy1[:, 0], xy2[:, 0])
+    y1, y2 = np.broadcast_arrays(xy1[:, 1], xy2[:, 1])
+
+    return x1, y1, x2, y2
+
+
+def bearings_to_points(points1, points2):
+    """bearings_to_points()
+
+    The batch version of bearing_to_point(). Return an array
+    of the compass headings in degrees from each of points1 to
+    the corresponding point in points2. Where the two points are
+    the same point, the heading is NaN instead of None.
+    """
+
+    x1, y1, x2, y2 = _broadcast_xy(points1, points2)
+    delta_x = x2 - x1
+    delta_y = y2 - y1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = delta_y / delta_x
+        bearing = np.trunc(90 - np.degrees(np.arctan(slope)))
+
+    reverse = np.where(slope > 0, y2 < y1, y2 > y1)
+    bearing = np.where(reverse, (bearing + 180) % 360, bearing)
+
+    same_x = x1 == x2
+    same_y = y1 == y2
+
+    return np.select(
+        [same_x & same_y,
+         same_x,
+         same_y],
+        [np.nan,
+         np.where(y2 > y1, 0.0, 180.0),
+         np.where(x2 > x1, 90.0, 270.0)],
+        default=bearing)
+
+
+def points_distances(points1, points2):
+    """points_distances()
+
+    The batch version of points_distance(). Return an array
+    of the Euclidean distances between each of points1 and the
+    corresponding point in points2.
+    """
+
+    x1, y1, x2, y2 = _broadcast_xy(points1, points2)
+
+    return np.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+
+
+def compass_headings_to_polar_angles(headings):
+    """compass_headings_to_polar_angles()
+
+    The batch version of compass_heading_to_polar_angle().
+    Return an array of polar angles in radians (-pi, pi] for
+    the array of compass headings in degrees.
+    """
+
+    compass_headings = np.trunc(np.asarray(headings, dtype=float)) % 360
+    angles = np.radians((-1 * (compass_headings - 360) + 90) % 360)
+
+    return np.where(angles > pi, angles - 2 * pi, angles)
+
+
+def formulas_from_points(points1, points2):
+    """formulas_from_points()
+
+    The batch version of formula_from_points(). Return arrays
+    of the slope, y_intercept, and x of the lines through each
+    of points1 and the corresponding point in points2. The
+    None values of the scalar version are NaN.
+    """
+
+    x1, y1, x2, y2 = _broadcast_xy(points1, points2)
+    vertical = x1 == x2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(vertical, INFINITE, (y2 - y1) / (x2 - x1))
+        y_intercept = np.where(vertical,
+                               np.where(x1 == 0, 0.0, np.nan),
+                               -1 * slope * x2 + y2)
+
+    x = np.where(vertical, x1, np.nan)
+
+    return slope, y_intercept, x
 
 
 class Line(object):
@@ -325,20 +583,11 @@ class Line(object):
         Calculate the shortest distance from point to the line.
         """
 
-        if self.on_the_line(point):
-            return 0
-
-        #
-        # 1. Find the perpendicular line
-        # 2. Find the intersection of the two lines
-        # 3. Calculate the distance between the point
-        #    and the intersection
-        #
-        perpendicular = self.find_perpendicular(point)
-        intersection = self.find_intersection(perpendicular)
-        distance = points_distance(intersection, point)
+        if self.slope is INFINITE:
+            return abs(point.x - self.x)
 
-        return distance
+        return (abs(self.slope * point.x - point.y + self.y_intercept) /
+                sqrt(1 + self.slope ** 2))
 
     def point_at_distance(self,
                           starting_point,
@@ -412,6 +661,833 @@ class Line(object):
         return 'y = %f * x + %f' % (self.slope, self.y_intercept)
 
 
+class GeneralLine(object):
+    """GeneralLine
+
+    Represent a line in the general form a * x + b * y + c = 0.
+    Vertical lines (b = 0) need no special handling, so none of
+    the methods branch on the orientation of the line.
+    """
+
+    __slots__ = ('a', 'b', 'c')
+
+    def __init__(self, a, b, c):
+        """__init__
+
+        Record the coefficients of the line. a and b must not
+        both be zero.
+        """
+
+        if a == 0 and b == 0:
+            raise Exception('Not enough information to define a line.')
+
+        self.a = float(a)
+        self.b = float(b)
+        self.c = float(c)
+
+    @classmethod
+    def construct_from_two_points(cls, p1, p2):
+        """construct_from_two_points
+
+        Instantiate a GeneralLine based on two points on that line.
+        """
+
+        a = p2.y - p1.y
+        b = p1.x - p2.x
+
+        return cls(a, b, -(a * p1.x + b * p1.y))
+
+    @classmethod
+    def construct_from_formula(cls, slope, y_intercept, x):
+        """construct_from_formula
+
+        Instantiate a GeneralLine from the slope, y_intercept,
+        and x used by Line.
+        """
+
+        if slope == INFINITE:
+            if x is None:
+                x = 0
+            return cls(1.0, 0.0, -x)
+
+        if y_intercept is None:
+            raise Exception('Not enough information to define a line.')
+
+        return cls(slope, -1.0, y_intercept)
+
+    @classmethod
+    def construct_from_heading(cls, point_on_line, heading):
+        """construct_from_heading
+
+        Given a point on the line and the compass heading of the
+        line, instantiate a GeneralLine.
+        """
+
+        x_offset, y_offset = heading_to_direction(heading)
+
+        return cls(y_offset,
+                   -x_offset,
+                   x_offset * point_on_line.y - y_offset * point_on_line.x)
+
+    @property
+    def slope(self):
+        if self.b == 0:
+            return INFINITE
+        return -self.a / self.b
+
+    @property
+    def y_intercept(self):
+        if self.b == 0:
+            return None
+        return -self.c / self.b
+
+    @property
+    def x(self):
+        if self.b == 0:
+            return -self.c / self.a
+        return None
+
+    def is_parallel(self, line, tolerance=PARALLEL_TOLERANCE):
+        """is_parallel
+
+        Return True if the line is parallel to this line, within
+        the tolerance on the sine of the angle between them.
+        """
+
+        a1, b1 = self.a, self.b
+        a2, b2 = line.a, line.b
+        cross = a1 * b2 - a2 * b1
+
+        return (cross * cross <= tolerance * tolerance *
+                (a1 * a1 + b1 * b1) * (a2 * a2 + b2 * b2))
+
+    def find_intersection(self, line):
+        """find_intersection
+
+        Return the point where two lines intersect, or None if
+        they're parallel.
+        """
+
+        a1, b1, c1 = self.a, self.b, self.c
+        a2, b2, c2 = line.a, line.b, line.c
+
+        cross = a1 * b2 - a2 * b1
+        if (cross * cross <= PARALLEL_TOLERANCE * PARALLEL_TOLERANCE *
+                (a1 * a1 + b1 * b1) * (a2 * a2 + b2 * b2)):
+            return None
+
+        #
+        # Solve the two equations by elimination, pivoting on
+        # the larger x coefficient to limit the rounding error.
+        #
+        if abs(a1) < abs(a2):
+            a1, b1, c1, a2, b2, c2 = a2, b2, c2, a1, b1, c1
+
+        ratio = a2 / a1
+        y = (ratio * c1 - c2) / (b2 - ratio * b1)
+
+        return Point(-(c1 + b1 * y) / a1, y)
+
+    def find_perpendicular(self, point):
+        """find_perpendicular
+
+        Return a GeneralLine which passes through the point and
+        is perpendicular to the current line.
+        """
+
+        return GeneralLine(self.b,
+                           -self.a,
+                           self.a * point.y - self.b * point.x)
+
+    def signed_distance(self, point):
+        """signed_distance
+
+        Return the distance from the line to the point, positive
+        on the side the normal (a, b) points toward.
+        """
+
+        return ((self.a * point.x + self.b * point.y + self.c) /
+                hypot(self.a, self.b))
+
+    def on_the_line(self, point, tolerance=LINE_TOLERANCE):
+        """on_the_line Return True if point is within tolerance of the line."""
+
+        return abs(self.signed_distance(point)) <= tolerance
+
+    def distance_to_point(self, point):
+        """distance_to_point
+
+        Calculate the shortest distance from point to the line.
+        """
+
+        return abs(self.signed_distance(point))
+
+    def project(self, point):
+        """project
+
+        Return the point on the line which is closest to point.
+        """
+
+        scale = ((self.a * point.x + self.b * point.y + self.c) /
+                 (self.a * self.a + self.b * self.b))
+
+        return Point(point.x - scale * self.a,
+                     point.y - scale * self.b)
+
+    def point_at_distance(self,
+                          starting_point,
+                          destination_point,
+                          distance):
+        """point_at_distance
+
+        Find the point on the line which is distance units from
+        starting_point, in the direction of destination_point.
+        starting_point is projected onto the line first.
+        """
+
+        start = self.project(starting_point)
+        norm = hypot(self.a, self.b)
+        direction_x = -self.b / norm
+        direction_y = self.a / norm
+        if ((destination_point.x - start.x) * direction_x +
+                (destination_point.y - start.y) * direction_y) < 0:
+            distance = -distance
+
+        return Point(start.x + distance * direction_x,
+                     start.y + distance * direction_y)
+
+    def __repr__(self):
+        """__repr__ Formatted output of the equation for the line."""
+
+        return '%f * x + %f * y + %f = 0' % (self.a, self.b, self.c)
+
+
+class Segment(object):
+    """Segment
+
+    Represent the line segment from start to end, such as one
+    track of a search path. The direction and length are
+    calculated once, so each query is a few multiplications.
+
+    Cross-track distances are positive to the right of the
+    direction of travel from start to end, and along-track
+    distances are measured from start toward end.
+    """
+
+    __slots__ = ('x0', 'y0', 'x1', 'y1', 'dx', 'dy',
+                 'length', 'unit_x', 'unit_y')
+
+    def __init__(self, start, end):
+        """__init__
+
+        Record the end points of the segment, which must not
+        be the same point.
+        """
+
+        self.x0 = float(start.x)
+        self.y0 = float(start.y)
+        self.x1 = float(end.x)
+        self.y1 = float(end.y)
+        self.dx = self.x1 - self.x0
+        self.dy = self.y1 - self.y0
+        self.length = hypot(self.dx, self.dy)
+        if self.length == 0:
+            raise Exception('A segment must have two different end points.')
+
+        self.unit_x = self.dx / self.length
+        self.unit_y = self.dy / self.length
+
+    @property
+    def start(self):
+        return Point(self.x0, self.y0)
+
+    @property
+    def end(self):
+        return Point(self.x1, self.y1)
+
+    @property
+    def heading(self):
+        """heading
+
+        The compass heading in degrees from start to end.
+        """
+
+        return degrees(atan2(self.dx, self.dy)) % 360
+
+    def as_line(self):
+        """as_line()
+
+        Return the GeneralLine through the segment.
+        """
+
+        return GeneralLine.construct_from_two_points(self.start, self.end)
+
+    def along_track_distance(self, point):
+        """along_track_distance()
+
+        Return the distance from start to the projection of the
+        point onto the segment's line. It's negative before start
+        and greater than the length beyond end.
+        """
+
+        return ((point.x - self.x0) * self.unit_x +
+                (point.y - self.y0) * self.unit_y)
+
+    def cross_track_distance(self, point):
+        """cross_track_distance()
+
+        Return the signed distance from the segment's line to the
+        point, positive to the right of the direction of travel.
+        """
+
+        return ((point.x - self.x0) * self.unit_y -
+                (point.y - self.y0) * self.unit_x)
+
+    def _clamped_along(self, along):
+        """_clamped_along()
+
+        Limit an along-track distance to the segment.
+        """
+
+        if along < 0.0:
+            return 0.0
+        if along > self.length:
+            return self.length
+        return along
+
+    def distance_to_point(self, point):
+        """distance_to_point()
+
+        Return the distance from the point to the nearest point
+        on the segment.
+        """
+
+        offset_x = point.x - self.x0
+        offset_y = point.y - self.y0
+        along = self._clamped_along(offset_x * self.unit_x +
+                                    offset_y * self.unit_y)
+
+        return hypot(offset_x - along * self.unit_x,
+                     offset_y - along * self.unit_y)
+
+    def nearest_point(self, point):
+        """nearest_point()
+
+        Return the point on the segment nearest to the point.
+        """
+
+        along = self._clamped_along(self.along_track_distance(point))
+
+        return Point(self.x0 + along * self.unit_x,
+                     self.y0 + along * self.unit_y)
+
+    def _offsets(self, points):
+        """_offsets()
+
+        Return the x and y offsets of each of points from start.
+        """
+
+        xy = _as_xy(points)
+
+        return xy[:, 0] - self.x0, xy[:, 1] - self.y0
+
+    def along_track_distances(self, points):
+        """along_track_distances()
+
+        The batch version of along_track_distance().
+        """
+
+        offset_x, offset_y = self._offsets(points)
+
+        return offset_x * self.unit_x + offset_y * self.unit_y
+
+    def cross_track_distances(self, points):
+        """cross_track_distances()
+
+        The batch version of cross_track_distance().
+        """
+
+        offset_x, offset_y = self._offsets(points)
+
+        return offset_x * self.unit_y - offset_y * self.unit_x
+
+    def distances_to_points(self, points):
+        """distances_to_points()
+
+        The batch version of distance_to_point().
+        """
+
+        offset_x, offset_y = self._offsets(points)
+        along = np.clip(offset_x * self.unit_x + offset_y * self.unit_y,
+                        0.0, self.length)
+
+        return np.hypot(offset_x - along * self.unit_x,
+                        offset_y - along * self.unit_y)
+
+    def nearest_points(self, points):
+        """nearest_points()
+
+        The batch version of nearest_point(). Return an (N, 2)
+        array of the nearest points on the segment.
+        """
+
+        along = np.clip(self.along_track_distances(points), 0.0, self.length)
+
+        return np.column_stack((self.x0 + along * self.unit_x,
+                                self.y0 + along * self.unit_y))
+
+    def __repr__(self):
+        """__repr__ Formatted output of the end points."""
+
+        return '(%f, %f) -> (%f, %f)' % (self.x0, self.y0, self.x1, self.y1)
+
+
+class EdgeGrid(object):
+    """EdgeGrid
+
+    A uniform grid over the bounding box of a set of edges, where
+    each cell lists the edges passing through it. A
+    ray is answered by walking only the cells it passes through, so
+    with about one cell per edge the cost grows with the square
+    root of the quantity of edges instead of with the quantity.
+    """
+
+    def __init__(self, edges, min_x, min_y, max_x, max_y):
+        """__init__
+
+        Build the grid for the edges, each a tuple of x0, y0, x1,
+        y1, dx, dy, length_squared, x_per_y as calculated by
+        Polygon.
+        """
+
+        self._edges = edges
+        self._cells_per_side = max(1, int(ceil(sqrt(len(edges)))))
+        self._min_x = min_x
+        self._min_y = min_y
+        self._max_x = max_x
+        self._max_y = max_y
+        #
+        # Guard against a zero-width or zero-height grid.
+        #
+        self._cell_width = max(max_x - min_x, EDGE_TOLERANCE) / self._cells_per_side
+        self._cell_height = max(max_y - min_y, EDGE_TOLERANCE) / self._cells_per_side
+
+        self._cells = [list() for _ in range(self._cells_per_side ** 2)]
+        for edge_idx, edge in enumerate(edges):
+            self._add_edge(edge_idx, *edge[:6])
+
+    def _add_edge(self, edge_idx, x0, y0, x1, y1, dx, dy):
+        """_add_edge()
+
+        List the edge in each cell it passes within EDGE_TOLERANCE
+        of. Row by row, only the columns spanned by the part of the
+        edge inside the row are used, so a long diagonal edge isn't
+        listed in every cell of its bounding box.
+        """
+
+        low_y = min(y0, y1) - EDGE_TOLERANCE
+        high_y = max(y0, y1) + EDGE_TOLERANCE
+        first_row = self._cell_of(x0, low_y)[1]
+        last_row = self._cell_of(x0, high_y)[1]
+
+        for row in range(first_row, last_row + 1):
+            if dy == 0:
+                band_x0 = x0
+                band_x1 = x1
+            else:
+                row_low_y = self._min_y + row * self._cell_height - EDGE_TOLERANCE
+                row_high_y = row_low_y + self._cell_height + 2 * EDGE_TOLERANCE
+                along_low = min(max((row_low_y - y0) / dy, 0.0), 1.0)
+                along_high = min(max((row_high_y - y0) / dy, 0.0), 1.0)
+                band_x0 = x0 + along_low * dx
+                band_x1 = x0 + along_high * dx
+
+            first_column = self._cell_of(min(band_x0, band_x1) - EDGE_TOLERANCE, low_y)[0]
+            last_column = self._cell_of(max(band_x0, band_x1) + EDGE_TOLERANCE, low_y)[0]
+            row_start = row * self._cells_per_side
+            for column in range(first_column, last_column + 1):
+                self._cells[row_start + column].append(edge_idx)
+
+    def _cell_of(self, x, y):
+        """_cell_of()
+
+        Return the column and row of the cell containing x, y,
+        limited to the grid.
+        """
+
+        last = self._cells_per_side - 1
+        column = int((x - self._min_x) / self._cell_width)
+        row = int((y - self._min_y) / self._cell_height)
+
+        return min(max(column, 0), last), min(max(row, 0), last)
+
+    def contains(self, x, y):
+        """contains()
+
+        Return True if x, y is inside the edges or within
+        EDGE_TOLERANCE of one, like Polygon.point_is_inside(). Only
+        the cells from x, y to the eastern side of the grid are
+        examined.
+        """
+
+        column, row = self._cell_of(x, y)
+        row_start = row * self._cells_per_side
+        tolerance_squared = EDGE_TOLERANCE * EDGE_TOLERANCE
+
+        for edge_idx in self._cells[row_start + column]:
+            x0, y0, x1, y1, dx, dy, length_squared, x_per_y = self._edges[edge_idx]
+            if length_squared > 0:
+                along = ((x - x0) * dx + (y - y0) * dy) / length_squared
+                along = min(max(along, 0.0), 1.0)
+                offset_x = x - (x0 + along * dx)
+                offset_y = y - (y0 + along * dy)
+                if offset_x * offset_x + offset_y * offset_y <= tolerance_squared:
+                    return True
+
+        #
+        # Count the edges crossed by a ray from x, y toward +x.
+        # Every such crossing is in this row, east of x.
+        #
+        tested = set()
+        inside = False
+        for cell_idx in range(row_start + column, row_start + self._cells_per_side):
+            for edge_idx in self._cells[cell_idx]:
+                if edge_idx in tested:
+                    continue
+                tested.add(edge_idx)
+
+                x0, y0, x1, y1, dx, dy, length_squared, x_per_y = self._edges[edge_idx]
+                if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * x_per_y:
+                    inside = not inside
+
+        return inside
+
+    def first_hit(self, x, y, direction_x, direction_y, min_distance=0.0):
+        """first_hit()
+
+        Follow the ray from x, y along the unit vector
+        direction_x, direction_y and return the distance along the
+        ray and the index of the first edge it crosses beyond
+        min_distance, or None if it crosses none.
+        """
+
+        column, row = self._cell_of(x, y)
+        last = self._cells_per_side - 1
+
+        #
+        # Set up the walk through the cells: the distance along the
+        # ray to the next column and row boundaries, and how far
+        # the ray travels to cross a whole column or row.
+        #
+        if direction_x > 0:
+            step_column = 1
+            next_column_t = (self._min_x + (column + 1) * self._cell_width - x) / direction_x
+            column_t = self._cell_width / direction_x
+        elif direction_x < 0:
+            step_column = -1
+            next_column_t = (self._min_x + column * self._cell_width - x) / direction_x
+            column_t = -self._cell_width / direction_x
+        else:
+            step_column = 0
+            next_column_t = column_t = INFINITE
+
+        if direction_y > 0:
+            step_row = 1
+            next_row_t = (self._min_y + (row + 1) * self._cell_height - y) / direction_y
+            row_t = self._cell_height / direction_y
+        elif direction_y < 0:
+            step_row = -1
+            next_row_t = (self._min_y + row * self._cell_height - y) / direction_y
+            row_t = -self._cell_height / direction_y
+        else:
+            step_row = 0
+            next_row_t = row_t = INFINITE
+
+        tested = set()
+        best_t = INFINITE
+        best_edge = None
+        while True:
+            for edge_idx in self._cells[row * self._cells_per_side + column]:
+                if edge_idx in tested:
+                    continue
+                tested.add(edge_idx)
+
+                x0, y0, x1, y1, dx, dy = self._edges[edge_idx][:6]
+                denominator = direction_x * dy - direction_y * dx
+                if denominator == 0:
+                    continue
+
+                offset_x = x0 - x
+                offset_y = y0 - y
+                t = (offset_x * dy - offset_y * dx) / denominator
+                along = (offset_x * direction_y - offset_y * direction_x) / denominator
+                if t > min_distance and -1e-12 <= along <= 1 + 1e-12 and t < best_t:
+                    best_t = t
+                    best_edge = edge_idx
+
+            #
+            # A hit inside the present cell can't be beaten by an
+            # edge in any cell further along the ray.
+            #
+            cell_exit_t = min(next_column_t, next_row_t)
+            if best_edge is not None and best_t <= cell_exit_t:
+                return best_t, best_edge
+
+            if next_column_t < next_row_t:
+                column += step_column
+                next_column_t += column_t
+            else:
+                row += step_row
+                next_row_t += row_t
+
+            if not (0 <= column <= last and 0 <= row <= last):
+                break
+
+        if best_edge is None:
+            return None
+
+        return best_t, best_edge
+
+
+class Trapezoid(object):
+    """Trapezoid
+
+    A convex cell of a Polygon decomposition, bounded below and
+    above by horizontal lines at y_low and y_high and on the left
+    and right by lines between the given x coordinates at those
+    heights. Either horizontal side may have zero width, making
+    the cell a triangle.
+    """
+
+    __slots__ = ('y_low', 'y_high', 'low_left_x', 'low_right_x',
+                 'high_left_x', 'high_right_x', 'area', 'bounding_box',
+                 'left_scale', 'right_scale')
+
+    def __init__(self, y_low, y_high,
+                 low_left_x, low_right_x,
+                 high_left_x, high_right_x):
+        """__init__
+
+        Record the corners and calculate the area, the bounding
+        box as (min_x, min_y, max_x, max_y) and, for each side, the
+        horizontal width of a band of unit perpendicular width
+        along it.
+        """
+
+        self.y_low = y_low
+        self.y_high = y_high
+        self.low_left_x = low_left_x
+        self.low_right_x = low_right_x
+        self.high_left_x = high_left_x
+        self.high_right_x = high_right_x
+
+        self.area = ((low_right_x - low_left_x + high_right_x - high_left_x) *
+                     (y_high - y_low) / 2.0)
+        self.bounding_box = (min(low_left_x, high_left_x),
+                             y_low,
+                             max(low_right_x, high_right_x),
+                             y_high)
+
+        height = y_high - y_low
+        if height > 0:
+            self.left_scale = hypot(1.0, (high_left_x - low_left_x) / height)
+            self.right_scale = hypot(1.0, (high_right_x - low_right_x) / height)
+        else:
+            self.left_scale = 1.0
+            self.right_scale = 1.0
+
+    def _fraction(self, y):
+        return (y - self.y_low) / (self.y_high - self.y_low)
+
+    def left_x_at(self, y):
+        """left_x_at()
+
+        Return the x of the left side at height y.
+        """
+
+        return self.low_left_x + (self.high_left_x - self.low_left_x) * self._fraction(y)
+
+    def right_x_at(self, y):
+        """right_x_at()
+
+        Return the x of the right side at height y.
+        """
+
+        return self.low_right_x + (self.high_right_x - self.low_right_x) * self._fraction(y)
+
+    def point_is_inside(self, point, tolerance=EDGE_TOLERANCE):
+        """point_is_inside()
+
+        Return True if point is inside the cell, or within tolerance
+        of its sides. The tolerance is measured perpendicular to each
+        side, as in Polygon.point_is_inside(), so it's widened along
+        x by the slope of the slanted sides.
+        """
+
+        if not self.y_low - tolerance <= point.y <= self.y_high + tolerance:
+            return False
+
+        y = min(max(point.y, self.y_low), self.y_high)
+
+        return (self.left_x_at(y) - tolerance * self.left_scale <= point.x <=
+                self.right_x_at(y) + tolerance * self.right_scale)
+
+    @property
+    def vertices(self):
+        """vertices
+
+        The corners as a tuple of Points, counterclockwise from the
+        lower left, without the repeated corner of a triangle.
+        """
+
+        corners = [Point(self.low_left_x, self.y_low),
+                   Point(self.low_right_x, self.y_low),
+                   Point(self.high_right_x, self.y_high),
+                   Point(self.high_left_x, self.y_high)]
+
+        return tuple(corner for idx, corner in enumerate(corners)
+                     if corner != corners[idx - 1])
+
+    def __repr__(self):
+        return 'Trapezoid{0}'.format(self.vertices)
+
+
+def _ring_crosses_itself(x, y):
+    """_ring_crosses_itself()
+
+    Return True if any two edges of the ring of vertices x, y,
+    which don't share a vertex, cross or touch. Every pair of
+    edges is tested at once.
+    """
+
+    count = len(x)
+    if count < 4:
+        return False
+
+    end_x = np.roll(x, -1)
+    end_y = np.roll(y, -1)
+    dx = end_x - x
+    dy = end_y - y
+
+    def _side(i_x, i_y, i_dx, i_dy, p_x, p_y):
+        return np.sign(i_dx * (p_y - i_y) - i_dy * (p_x - i_x))
+
+    #
+    # side_start[i, j] is the side of edge i on which edge j
+    # starts, and side_end[i, j] the side on which it ends.
+    #
+    side_start = _side(x[:, np.newaxis], y[:, np.newaxis],
+                       dx[:, np.newaxis], dy[:, np.newaxis], x, y)
+    side_end = _side(x[:, np.newaxis], y[:, np.newaxis],
+                     dx[:, np.newaxis], dy[:, np.newaxis], end_x, end_y)
+    straddles = side_start * side_end <= 0
+    collinear = (side_start == 0) & (side_end == 0)
+    crosses = straddles & straddles.T & ~collinear & ~collinear.T
+
+    index = np.arange(count)
+    separation = np.abs(index[:, np.newaxis] - index)
+    non_adjacent = (separation > 1) & (separation < count - 1)
+
+    return bool(np.any(crosses & non_adjacent))
+
+
+@lru_cache(maxsize=INSET_CACHE_SIZE)
+def inset_vertices(vertices, distance):
+    """inset_vertices()
+
+    Return the vertices of the polygon, given as a tuple of Points
+    in either winding order, with every edge moved inward by distance,
+    as a tuple of Points in the same order. A negative distance moves
+    the edges outward.
+
+    Each new vertex is the intersection of the offset lines of its
+    two edges, so corners stay sharp. At a concave corner that keeps
+    the result at least distance from the original edges. An edge
+    which the offset reverses has collapsed and is dropped, letting
+    its neighbors meet. Raise an Exception if fewer than three edges
+    remain or the polygon turns inside out, and a ValueError if the
+    inset of a concave polygon splits into pieces, leaving a ring
+    which crosses itself.
+
+    Results are cached per (vertices, distance), so replanning in the
+    same area doesn't repeat the calculation.
+    """
+
+    vertex_array = np.array([vertex.as_tuple() for vertex in vertices],
+                            dtype=float)
+    if len(vertex_array) < 3:
+        raise Exception("Must provide a minimum of three vertices")
+
+    if distance == 0:
+        return tuple(vertices)
+
+    x0 = vertex_array[:, 0]
+    y0 = vertex_array[:, 1]
+    dx = np.roll(x0, -1) - x0
+    dy = np.roll(y0, -1) - y0
+    twice_area = np.sum(x0 * np.roll(y0, -1) - np.roll(x0, -1) * y0)
+    if twice_area == 0:
+        raise Exception("The vertices don't enclose an area")
+
+    #
+    # Unit normals pointing into the polygon. Each edge i is the
+    # line normal_i . p = offset_i, which moves inward by distance.
+    #
+    keep = np.hypot(dx, dy) > 0
+    x0, y0, dx, dy = x0[keep], y0[keep], dx[keep], dy[keep]
+    length = np.hypot(dx, dy)
+    if twice_area > 0:
+        normal_x = -dy / length
+        normal_y = dx / length
+    else:
+        normal_x = dy / length
+        normal_y = -dx / length
+    offset = normal_x * x0 + normal_y * y0 + distance
+
+    while True:
+        if len(offset) < 3:
+            raise Exception("Buffer of {0} collapses the polygon".format(
+                distance))
+
+        #
+        # New vertex i is where the lines of edges i - 1 and i
+        # cross. Where they are parallel, the edges continue in a
+        # straight line and the start of edge i is simply moved.
+        #
+        previous_x = np.roll(normal_x, 1)
+        previous_y = np.roll(normal_y, 1)
+        previous_offset = np.roll(offset, 1)
+        determinant = previous_x * normal_y - previous_y * normal_x
+        parallel = np.abs(determinant) <= PARALLEL_TOLERANCE
+        safe_determinant = np.where(parallel, 1.0, determinant)
+        new_x = np.where(parallel,
+                         x0 + normal_x * distance,
+                         (previous_offset * normal_y - offset * previous_y) / safe_determinant)
+        new_y = np.where(parallel,
+                         y0 + normal_y * distance,
+                         (previous_x * offset - normal_x * previous_offset) / safe_determinant)
+
+        collapsed = ((np.roll(new_x, -1) - new_x) * dx +
+                     (np.roll(new_y, -1) - new_y) * dy) <= 0
+        if not collapsed.any():
+            break
+
+        keep = ~collapsed
+        x0, y0, dx, dy = x0[keep], y0[keep], dx[keep], dy[keep]
+        normal_x, normal_y, offset = normal_x[keep], normal_y[keep], offset[keep]
+
+    new_twice_area = np.sum(new_x * np.roll(new_y, -1) - np.roll(new_x, -1) * new_y)
+    if new_twice_area * twice_area <= 0:
+        raise Exception("Buffer of {0} collapses the polygon".format(
+            distance))
+
+    if _ring_crosses_itself(new_x, new_y):
+        raise ValueError("Buffer of {0} splits the polygon".format(
+            distance))
+
+    return tuple(Point(x, y) for x, y in zip(new_x.tolist(), new_y.tolist()))
+
+
 class Polygon(object):
     """Polygon
 
@@ -422,7 +1498,9 @@ class Polygon(object):
         """__init__()
 
         Construct the representation of a polygon defined
-        by the provided list of vertices.
+        by the provided list of vertices. The bounding box
+        and the coefficients of each edge are calculated
+        once here, so the containment tests don't repeat them.
         """
 
         if len(vertices) < 3:
@@ -432,16 +1510,392 @@ class Polygon(object):
         for vertex in vertices:
             self._vertices.append([vertex.x, vertex.y])
 
-        self._vertex_path = mplPath.Path(self._vertices)
+        vertex_array = np.array(self._vertices, dtype=float)
+        self._min_x, self._min_y = vertex_array.min(axis=0).tolist()
+        self._max_x, self._max_y = vertex_array.max(axis=0).tolist()
+
+        #
+        # Each edge runs from (x0, y0) to (x1, y1). x_per_y is
+        # the inverse slope used by the crossing test and is zero
+        # for horizontal edges, which never cross a horizontal ray.
+        #
+        x0 = vertex_array[:, 0]
+        y0 = vertex_array[:, 1]
+        x1 = np.roll(x0, -1)
+        y1 = np.roll(y0, -1)
+        dx = x1 - x0
+        dy = y1 - y0
+        length_squared = dx * dx + dy * dy
+        horizontal = dy == 0
+        x_per_y = np.where(horizontal, 0.0, dx / np.where(horizontal, 1.0, dy))
+
+        self._edge_coefficients = np.stack((x0, y0, x1, y1, dx, dy,
+                                            length_squared, x_per_y))
+        self._edges = [tuple(edge) for edge in
+                       self._edge_coefficients.T.tolist()]
+
+        self._edge_grid = None
+        self._area = None
+        self._centroid = None
+        self._perimeter = None
+        self._slab_ys = None
+        self._slab_cells = None
+
+    @property
+    def vertices(self):
+        """vertices
+
+        The vertices as a tuple of Points, in the order given.
+        """
+
+        return tuple(Point(x, y) for x, y in self._vertices)
+
+    @property
+    def area(self):
+        """area
+
+        The area enclosed by the polygon, calculated only
+        when it's first read.
+        """
+
+        if self._area is None:
+            self._calculate_area_and_centroid()
+
+        return self._area
+
+    @property
+    def centroid(self):
+        """centroid
+
+        The center of mass of the area, as a Point, calculated
+        only when it's first read.
+        """
+
+        if self._centroid is None:
+            self._calculate_area_and_centroid()
+
+        return self._centroid
+
+    @property
+    def perimeter(self):
+        """perimeter
+
+        The total length of the edges, calculated only when
+        it's first read.
+        """
+
+        if self._perimeter is None:
+            self._perimeter = float(np.sqrt(self._edge_coefficients[6]).sum())
+
+        return self._perimeter
+
+    def _calculate_area_and_centroid(self):
+        """_calculate_area_and_centroid()
+
+        Use the shoelace formula for the signed area and the
+        centroid, which works in either winding order.
+        """
+
+        x0, y0, x1, y1 = self._edge_coefficients[:4]
+        cross = x0 * y1 - x1 * y0
+        signed_area = cross.sum() / 2.0
+        if signed_area == 0:
+            raise Exception("The vertices don't enclose an area")
+
+        self._area = abs(float(signed_area))
+        self._centroid = Point(float(((x0 + x1) * cross).sum() / (6.0 * signed_area)),
+                               float(((y0 + y1) * cross).sum() / (6.0 * signed_area)))
+
+    def decompose(self):
+        """decompose()
+
+        Return the polygon divided into convex Trapezoid cells, as
+        a list ordered from south to north and then west to east.
+
+        The cells are found with a sweep from south to north. Every
+        vertex starts a horizontal slab, and the edges crossing a
+        slab divide it into cells between pairs of edges. The result
+        is calculated once and kept.
+        """
+
+        if self._slab_cells is None:
+            self._decompose()
+
+        return [cell for cells in self._slab_cells for cell in cells]
+
+    def _decompose(self):
+        """_decompose()
+
+        Sweep the slabs, keeping the edges which cross the
+        present slab in a list.
+        """
+
+        ys = sorted(set(vertex[1] for vertex in self._vertices))
+        crossing = [edge for edge in self._edges if edge[1] != edge[3]]
+        crossing.sort(key=lambda edge: min(edge[1], edge[3]))
+
+        slab_cells = list()
+        active = list()
+        next_edge = 0
+        for y_low, y_high in zip(ys, ys[1:]):
+            active = [edge for edge in active if max(edge[1], edge[3]) > y_low]
+            while (next_edge < len(crossing) and
+                   min(crossing[next_edge][1], crossing[next_edge][3]) <= y_low):
+                active.append(crossing[next_edge])
+                next_edge += 1
+
+            #
+            # The edges don't cross inside the slab, so sorting by
+            # their x at the middle orders them at every height.
+            # Each cell is inside the polygon between an odd and the
+            # following even edge.
+            #
+            sides = list()
+            for x0, y0, x1, y1, dx, dy, length_squared, x_per_y in active:
+                sides.append((x0 + (y_low - y0) * x_per_y,
+                              x0 + (y_high - y0) * x_per_y))
+            sides.sort(key=lambda side: side[0] + side[1])
+
+            cells = list()
+            for left, right in zip(sides[0::2], sides[1::2]):
+                cells.append(Trapezoid(y_low, y_high,
+                                       left[0], right[0],
+                                       left[1], right[1]))
+            slab_cells.append(cells)
+
+        self._slab_ys = ys
+        self._slab_cells = slab_cells
+
+    def cell_containing(self, point):
+        """cell_containing()
+
+        Return the Trapezoid from decompose() which contains point,
+        or None if the point isn't inside the polygon. The slab is
+        found by bisecting the slab heights and the cell by bisecting
+        the cells of the slab, so the cost grows with the logarithm
+        of the quantity of cells. A point within EDGE_TOLERANCE of
+        an edge is in a cell along that edge, as it's inside for
+        point_is_inside().
+        """
+
+        if self._slab_cells is None:
+            self._decompose()
+
+        if not self._in_bounding_box(point.x, point.y):
+            return None
+
+        last_slab = len(self._slab_cells) - 1
+        slab_idx = min(max(bisect_right(self._slab_ys, point.y) - 1, 0), last_slab)
+        cell = self._cell_in_slab(slab_idx, point)
+        if cell is not None:
+            return cell
+
+        #
+        # A point within the tolerance of a horizontal edge, or
+        # of the end of a slanted one, may only be in a cell of a
+        # neighbouring slab.
+        #
+        first_near = max(bisect_left(self._slab_ys, point.y - EDGE_TOLERANCE) - 1, 0)
+        last_near = min(bisect_right(self._slab_ys, point.y + EDGE_TOLERANCE) - 1, last_slab)
+        for near_idx in range(first_near, last_near + 1):
+            if near_idx != slab_idx:
+                cell = self._cell_in_slab(near_idx, point)
+                if cell is not None:
+                    return cell
+
+        return None
+
+    def _cell_in_slab(self, slab_idx, point):
+        """_cell_in_slab()
+
+        Return the cell of the slab containing point, or None.
+        """
+
+        cells = self._slab_cells[slab_idx]
+        if not cells:
+            return None
+
+        y = min(max(point.y, cells[0].y_low), cells[0].y_high)
+        low = 0
+        high = len(cells)
+        while low < high:
+            middle = (low + high) // 2
+            cell = cells[middle]
+            if cell.right_x_at(y) + EDGE_TOLERANCE * cell.right_scale < point.x:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(cells) and cells[low].point_is_inside(point):
+            return cells[low]
+
+        return None
+
+    def _in_bounding_box(self, x, y):
+        """_in_bounding_box()
+
+        Return True if x, y is inside the bounding box of the
+        polygon, expanded by the edge tolerance.
+        """
+
+        return (self._min_x - EDGE_TOLERANCE <= x <= self._max_x + EDGE_TOLERANCE and
+                self._min_y - EDGE_TOLERANCE <= y <= self._max_y + EDGE_TOLERANCE)
 
     def point_is_inside(self, point):
         """point_is_inside()
 
-        https://stackoverflow.com/questions/16625507/python-checking-if-point-is-inside-a-polygon
-
         Return True if the given point is inside the polygon
-        or on the edge, False otherwise.
+        or on the edge, False otherwise. A point within
+        EDGE_TOLERANCE of an edge is on the edge.
+
+        The inside test counts the edges crossed by a ray from
+        the point toward +x. Polygons with more than
+        GRID_EDGE_THRESHOLD edges use their EdgeGrid, so only
+        the edges near the ray are examined.
+        """
+
+        x = point.x
+        y = point.y
+        if not self._in_bounding_box(x, y):
+            return False
+
+        if len(self._edges) > GRID_EDGE_THRESHOLD:
+            return self.edge_grid().contains(x, y)
+
+        tolerance_squared = EDGE_TOLERANCE * EDGE_TOLERANCE
+        inside = False
+        for x0, y0, x1, y1, dx, dy, length_squared, x_per_y in self._edges:
+            if length_squared > 0:
+                along = ((x - x0) * dx + (y - y0) * dy) / length_squared
+                along = min(max(along, 0.0), 1.0)
+                offset_x = x - (x0 + along * dx)
+                offset_y = y - (y0 + along * dy)
+                if offset_x * offset_x + offset_y * offset_y <= tolerance_squared:
+                    return True
+
+            if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * x_per_y:
+                inside = not inside
+
+        return inside
+
+    def points_are_inside(self, points):
+        """points_are_inside()
+
+        The batch version of point_is_inside(). Return an array
+        of booleans, one for each of the points, which may be a
+        PointArray or anything shaped (N, 2).
+        """
+
+        xy = _as_xy(points)
+        inside = np.zeros(len(xy), dtype=bool)
+
+        candidates = np.flatnonzero(
+            (xy[:, 0] >= self._min_x - EDGE_TOLERANCE) &
+            (xy[:, 0] <= self._max_x + EDGE_TOLERANCE) &
+            (xy[:, 1] >= self._min_y - EDGE_TOLERANCE) &
+            (xy[:, 1] <= self._max_y + EDGE_TOLERANCE))
+
+        x0, y0, x1, y1, dx, dy, length_squared, x_per_y = self._edge_coefficients
+        safe_length_squared = np.where(length_squared > 0, length_squared, 1.0)
+
+        #
+        # Work through the candidates in chunks, so the
+        # intermediate (points, edges) arrays stay small.
+        #
+        chunk_size = max(1, 2 ** 18 // len(self._edges))
+        for start in range(0, len(candidates), chunk_size):
+            idx = candidates[start:start + chunk_size]
+            x = xy[idx, 0][:, np.newaxis]
+            y = xy[idx, 1][:, np.newaxis]
+
+            along = np.clip(((x - x0) * dx + (y - y0) * dy) / safe_length_squared,
+                            0.0, 1.0)
+            offset_x = x - (x0 + along * dx)
+            offset_y = y - (y0 + along * dy)
+            on_edge = np.any(offset_x * offset_x + offset_y * offset_y <=
+                             EDGE_TOLERANCE * EDGE_TOLERANCE, axis=1)
+
+            crossings = ((y0 > y) != (y1 > y)) & (x < x0 + (y - y0) * x_per_y)
+            odd = np.count_nonzero(crossings, axis=1) % 2 == 1
+
+            inside[idx] = on_edge | odd
+
+        return inside
+
+    def edge_grid(self):
+        """edge_grid()
+
+        Return the EdgeGrid for the polygon, building it the
+        first time it's needed.
+        """
+
+        if self._edge_grid is None:
+            self._edge_grid = EdgeGrid(self._edges,
+                                       self._min_x,
+                                       self._min_y,
+                                       self._max_x,
+                                       self._max_y)
+
+        return self._edge_grid
+
+    def edge_line(self, edge_idx):
+        """edge_line()
+
+        Return the GeneralLine through the edge with index edge_idx.
         """
 
-        return self._vertex_path.contains_point(point=point.as_tuple(),
-                                                radius=-0.1)
+        x0, y0, x1, y1 = self._edges[edge_idx][:4]
+
+        return GeneralLine.construct_from_two_points(Point(x0, y0),
+                                                     Point(x1, y1))
+
+    def inset(self, distance):
+        """inset()
+
+        Return a new Polygon with every edge moved inward by
+        distance, or outward if distance is negative. See
+        inset_vertices().
+        """
+
+        return Polygon(inset_vertices(self.vertices, distance))
+
+    def exit_point(self, point, heading):
+        """exit_point()
+
+        Return the point where a ray from point, which must be
+        inside the polygon or on the edge, on the compass heading
+        first leaves the polygon. If the ray leaves immediately,
+        because point is on the edge and the heading points out of
+        the polygon, return point. If point is outside the polygon,
+        return None.
+        """
+
+        if not self.point_is_inside(point):
+            return None
+
+        direction_x, direction_y = heading_to_direction(heading)
+        hit = self.edge_grid().first_hit(point.x,
+                                         point.y,
+                                         direction_x,
+                                         direction_y,
+                                         min_distance=EDGE_TOLERANCE)
+        if hit is None:
+            return point
+
+        distance, edge_idx = hit
+        halfway = Point(point.x + direction_x * distance / 2,
+                        point.y + direction_y * distance / 2)
+        if not self.point_is_inside(halfway):
+            return point
+
+        #
+        # Intersect the lines, rather than stepping along the ray,
+        # so points on axis-aligned edges come out exact.
+        #
+        track_line = GeneralLine.construct_from_heading(point, heading)
+        exit_pt = track_line.find_intersection(self.edge_line(edge_idx))
+        if exit_pt is None:
+            return Point(point.x + direction_x * distance,
+                         point.y + direction_y * distance)
+
+        return exit_pt
@@ -14,9 +14,40 @@
 """navigation utility class
 
 """
-from math import cos, radians
+from math import cos, sin, asin, radians, degrees, atan2
+import numpy as np
 from auv_bonus_xprize.settings import config
 from searchspace.geometry import Point, Line, Polygon
+from searchspace.geometry import points_distance
+
+#
+# WGS84 ellipsoid and the UTM projection parameters.
+#
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+UTM_K0 = 0.9996
+UTM_FALSE_EASTING = 500000.0
+UTM_FALSE_NORTHING_SOUTH = 10000000.0
+
+KNOTS_TO_METERS_PER_SECOND = 1852.0 / 3600.0
+
+#
+# Coefficients of the Krüger series for the transverse Mercator
+# projection, to the third power of the third flattening n, which
+# is accurate to well under a millimeter within a zone.
+#
+_N = WGS84_F / (2 - WGS84_F)
+_RECTIFYING_RADIUS = WGS84_A / (1 + _N) * (1 + _N ** 2 / 4 + _N ** 4 / 64)
+_ALPHA = (_N / 2 - 2 * _N ** 2 / 3 + 5 * _N ** 3 / 16,
+          13 * _N ** 2 / 48 - 3 * _N ** 3 / 5,
+          61 * _N ** 3 / 240)
+_BETA = (_N / 2 - 2 * _N ** 2 / 3 + 37 * _N ** 3 / 96,
+         _N ** 2 / 48 + _N ** 3 / 15,
+         17 * _N ** 3 / 480)
+_DELTA = (2 * _N - 2 * _N ** 2 / 3 - 2 * _N ** 3,
+          7 * _N ** 2 / 3 - 8 * _N ** 3 / 5,
+          56 * _N ** 3 / 15)
+_CONFORMAL = 2 * np.sqrt(_N) / (1 + _N)
 
 
 class NavConverter(object):
@@ -58,6 +89,8 @@ class NavConverter(object):
         instance._north_lat = instance._center_lat + (distance_in_deg / 2.0)
         instance._south_lat = instance._center_lat - (distance_in_deg / 2.0)
 
+        instance._calculate_scale_factors()
+
         return instance
 
     @classmethod
@@ -91,8 +124,27 @@ class NavConverter(object):
         instance._north_south_distance_meters = lat_degrees_to_meters(north_lat - south_lat,
                                                                       instance._center_lat)
 
+        instance._calculate_scale_factors()
+
         return instance
 
+    def _calculate_scale_factors(self):
+        """_calculate_scale_factors()
+
+        Calculate the meters per degree and degrees per meter
+        at the center latitude of the area once, so each conversion
+        is only a subtraction and a multiplication from the west and
+        south boundaries, and the conversions in each direction are
+        the inverse of each other.
+        """
+
+        self._lat_meters_per_degree = lat_degrees_to_meters(1.0,
+                                                            self._center_lat)
+        self._lon_meters_per_degree = lon_degrees_to_meters(1.0,
+                                                            self._center_lat)
+        self._lat_degrees_per_meter = 1 / self._lat_meters_per_degree
+        self._lon_degrees_per_meter = 1 / self._lon_meters_per_degree
+
     def geo_to_cartesian(self, geo_position):
         """geo_to_cartesian()
 
@@ -110,8 +162,8 @@ class NavConverter(object):
 
             raise Exception('Position is outside the defined area.')
 
-        x = lon_degrees_to_meters(lon - self._west_lon, self._center_lat)
-        y = lat_degrees_to_meters(lat - self._south_lat, self._center_lat)
+        x = (lon - self._west_lon) * self._lon_meters_per_degree
+        y = (lat - self._south_lat) * self._lat_meters_per_degree
 
         return Point(x, y)
 
@@ -132,13 +184,174 @@ class NavConverter(object):
 
             raise Exception('Position is outside the defined area.')
 
-        lat = self._south_lat + y * (1 / lat_degrees_to_meters(1.0,
-                                                               abs(self._center_lat)))
-        lon = self._west_lon + x * (1 / lon_degrees_to_meters(1.0,
-                                                              abs(self._center_lon)))
+        lat = self._south_lat + y * self._lat_degrees_per_meter
+        lon = self._west_lon + x * self._lon_degrees_per_meter
 
         return (lat, lon)
 
+    def geo_to_cartesian_array(self, geo_positions):
+        """geo_to_cartesian_array()
+
+        The array version of geo_to_cartesian(). Convert an (N, 2)
+        array of lat, lon to an (N, 2) array of x, y. The rows of
+        positions outside the defined area are NaN, instead of
+        raising an Exception.
+        """
+
+        geo_positions = np.asarray(geo_positions, dtype=float).reshape(-1, 2)
+        lat = geo_positions[:, 0]
+        lon = geo_positions[:, 1]
+        outside = ((lat < self._south_lat) |
+                   (lat > self._north_lat) |
+                   (lon < self._west_lon) |
+                   (lon > self._east_lon))
+
+        x = (lon - self._west_lon) * self._lon_meters_per_degree
+        y = (lat - self._south_lat) * self._lat_meters_per_degree
+
+        cartesian_positions = np.column_stack((x, y))
+        cartesian_positions[outside] = np.nan
+
+        return cartesian_positions
+
+    def cartesian_to_geo_array(self, cartesian_positions):
+        """cartesian_to_geo_array()
+
+        The array version of cartesian_to_geo(). Convert an (N, 2)
+        array of x, y to an (N, 2) array of lat, lon. The rows of
+        positions which can't be converted, outside the defined area
+        or not finite, are NaN. It never raises an Exception for
+        the whole batch.
+        """
+
+        cartesian_positions = np.asarray(cartesian_positions,
+                                         dtype=float).reshape(-1, 2)
+        x = cartesian_positions[:, 0]
+        y = cartesian_positions[:, 1]
+        outside = ((x < 0.0) |
+                   (x > self._east_west_distance_meters) |
+                   (y < 0.0) |
+                   (y > self._north_south_distance_meters))
+
+        lat = self._south_lat + y * self._lat_degrees_per_meter
+        lon = self._west_lon + x * self._lon_degrees_per_meter
+
+        geo_positions = np.column_stack((lat, lon))
+        geo_positions[outside | ~np.isfinite(cartesian_positions).all(axis=1)] = np.nan
+
+        return geo_positions
+
+
+class LocalFrame(object):
+    """LocalFrame
+
+    A Cartesian frame with its origin at a UTM position and its +y
+    axis on a given compass heading, so that planning can be done
+    with axes aligned to the search area or to the current.
+    Positions and headings convert in both directions, either one
+    at a time or as (N, 2) arrays.
+    """
+
+    def __init__(self, origin, heading):
+        """__init__()
+
+        Define the frame with its origin at the UTM Point origin
+        and its +y axis on the compass heading in degrees.
+        """
+
+        self.origin = Point(float(origin.x), float(origin.y))
+        self.heading = heading % 360
+        self._cos = cos(radians(self.heading))
+        self._sin = sin(radians(self.heading))
+
+    @classmethod
+    def construct_from_polygon(cls, polygon):
+        """construct_from_polygon()
+
+        Create a frame centered on the polygon, with its axes
+        parallel and perpendicular to the longest edge. The frame
+        is rotated by no more than 45 degrees from UTM.
+        """
+
+        vertices = polygon.vertices
+        longest = max(range(len(vertices)),
+                      key=lambda idx: points_distance(vertices[idx - 1],
+                                                      vertices[idx]))
+        start = vertices[longest - 1]
+        end = vertices[longest]
+        edge_heading = degrees(atan2(end.x - start.x, end.y - start.y))
+
+        rotation = edge_heading % 90
+        if rotation > 45:
+            rotation -= 90
+
+        return cls(polygon.centroid, rotation)
+
+    def to_local(self, positions):
+        """to_local()
+
+        Convert an (N, 2) array of UTM positions to the frame.
+        """
+
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        dx = positions[:, 0] - self.origin.x
+        dy = positions[:, 1] - self.origin.y
+
+        return np.column_stack((dx * self._cos - dy * self._sin,
+                                dx * self._sin + dy * self._cos))
+
+    def to_utm(self, positions):
+        """to_utm()
+
+        Convert an (N, 2) array of frame positions to UTM.
+        """
+
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        x = positions[:, 0]
+        y = positions[:, 1]
+
+        return np.column_stack((self.origin.x + x * self._cos + y * self._sin,
+                                self.origin.y - x * self._sin + y * self._cos))
+
+    def point_to_local(self, point):
+        """point_to_local()
+
+        Convert a UTM Point to a frame Point.
+        """
+
+        x, y = self.to_local((point.x, point.y))[0].tolist()
+
+        return Point(x, y)
+
+    def point_to_utm(self, point):
+        """point_to_utm()
+
+        Convert a frame Point to a UTM Point.
+        """
+
+        x, y = self.to_utm((point.x, point.y))[0].tolist()
+
+        return Point(x, y)
+
+    def heading_to_local(self, heading):
+        """heading_to_local()
+
+        Convert a compass heading to a heading in the frame.
+        """
+
+        return (heading - self.heading) % 360
+
+    def heading_to_utm(self, heading):
+        """heading_to_utm()
+
+        Convert a heading in the frame to a compass heading.
+        """
+
+        return (heading + self.heading) % 360
+
+    def __repr__(self):
+        return 'LocalFrame({0}, {1})'.format(self.origin, self.heading)
+
 
 def lat_degrees_to_meters(lat_degrees, at_this_latitude):
     """lat_degrees_to_meters()
@@ -189,3 +402,175 @@ def lon_degrees_to_meters(lon_degrees, at_this_latitude):
     meters_per_degree = first - third + fifth
 
     return lon_degrees * meters_per_degree
+
+
+def utm_zone(lat, lon):
+    """utm_zone()
+
+    Return the UTM zone number for each lat, lon, including
+    the exceptions for southwest Norway and Svalbard.
+    """
+
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+
+    zone = np.minimum(((lon + 180.0) // 6.0).astype(int) + 1, 60)
+    zone = np.where((56.0 <= lat) & (lat < 64.0) & (3.0 <= lon) & (lon < 12.0),
+                    32,
+                    zone)
+    svalbard = (72.0 <= lat) & (lat <= 84.0) & (0.0 <= lon) & (lon < 42.0)
+    zone = np.where(svalbard & (lon < 9.0), 31, zone)
+    zone = np.where(svalbard & (9.0 <= lon) & (lon < 21.0), 33, zone)
+    zone = np.where(svalbard & (21.0 <= lon) & (lon < 33.0), 35, zone)
+    zone = np.where(svalbard & (33.0 <= lon), 37, zone)
+
+    return zone
+
+
+def latlon_to_utm(lat, lon, zone=None):
+    """latlon_to_utm()
+
+    Convert WGS84 lat and lon, in degrees, to UTM. The arguments
+    may be numbers or arrays. Return arrays of easting, northing,
+    zone number and whether the position is in the northern
+    hemisphere. Each position is projected in its own zone,
+    unless zone is given, which allows positions on both sides
+    of a zone boundary to share one grid.
+    """
+
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    if zone is None:
+        zone = utm_zone(lat, lon)
+    zone = np.broadcast_to(np.asarray(zone, dtype=int), np.broadcast(lat, lon).shape)
+    northern = lat >= 0.0
+
+    phi = np.radians(lat)
+    delta_lambda = np.radians(lon - (zone * 6.0 - 183.0))
+    sin_phi = np.sin(phi)
+    t = np.sinh(np.arctanh(sin_phi) - _CONFORMAL * np.arctanh(_CONFORMAL * sin_phi))
+    xi = np.arctan2(t, np.cos(delta_lambda))
+    eta = np.arctanh(np.sin(delta_lambda) / np.sqrt(1 + t * t))
+
+    easting = eta.copy()
+    northing = xi.copy()
+    for j, alpha in enumerate(_ALPHA, 1):
+        easting += alpha * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+        northing += alpha * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+
+    easting = UTM_FALSE_EASTING + UTM_K0 * _RECTIFYING_RADIUS * easting
+    northing = (np.where(northern, 0.0, UTM_FALSE_NORTHING_SOUTH) +
+                UTM_K0 * _RECTIFYING_RADIUS * northing)
+
+    return easting, northing, zone, northern
+
+
+def utm_to_latlon(easting, northing, zone, northern=True):
+    """utm_to_latlon()
+
+    Convert UTM easting and northing in the given zone and
+    hemisphere to WGS84 lat and lon in degrees. The arguments
+    may be numbers or arrays. Return arrays of lat and lon.
+    """
+
+    easting = np.asarray(easting, dtype=float)
+    northing = np.asarray(northing, dtype=float)
+    zone = np.asarray(zone, dtype=int)
+
+    scale = UTM_K0 * _RECTIFYING_RADIUS
+    xi = (northing - np.where(northern, 0.0, UTM_FALSE_NORTHING_SOUTH)) / scale
+    eta = (easting - UTM_FALSE_EASTING) / scale
+
+    xi_prime = xi.copy()
+    eta_prime = eta.copy()
+    for j, beta in enumerate(_BETA, 1):
+        xi_prime -= beta * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+        eta_prime -= beta * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+
+    chi = np.arcsin(np.sin(xi_prime) / np.cosh(eta_prime))
+    phi = chi.copy()
+    for j, delta in enumerate(_DELTA, 1):
+        phi += delta * np.sin(2 * j * chi)
+
+    lat = np.degrees(phi)
+    lon = (zone * 6.0 - 183.0) + np.degrees(np.arctan2(np.sinh(eta_prime),
+                                                       np.cos(xi_prime)))
+
+    return lat, lon
+
+
+def utm_position_from_config(name):
+    """utm_position_from_config()
+
+    Return the position called name in the starting section of
+    the config file, such as 'northwest' or 'auv_position', as a
+    Point of UTM easting and northing. The position is read from
+    name_utm if it's defined, otherwise from name_latlon as
+    "lat,lon" in degrees. The optional utm_zone forces the zone
+    used for lat, lon positions.
+    """
+
+    starting = config['starting']
+    if name + '_utm' in starting:
+        easting, northing = starting[name + '_utm'].split(',')[:2]
+
+        return Point(float(easting), float(northing))
+
+    if name + '_latlon' in starting:
+        lat, lon = starting[name + '_latlon'].split(',')[:2]
+        zone = None
+        if 'utm_zone' in starting:
+            zone = int(starting['utm_zone'])
+        easting, northing, _, _ = latlon_to_utm(float(lat), float(lon), zone)
+
+        return Point(float(easting), float(northing))
+
+    raise Exception('Define {0}_utm or {0}_latlon in [starting]'.format(name))
+
+
+def crab_heading(track_heading, speed, current_set, current_drift):
+    """crab_heading()
+
+    Return the compass heading to steer at speed meters per second
+    through the water, so that the current of set degrees and drift
+    knots keeps the ground track on track_heading, and the speed
+    over the ground along the track. Raise an Exception if the
+    current is too strong to hold the track.
+    """
+
+    drift = current_drift * KNOTS_TO_METERS_PER_SECOND
+    relative_set = radians(current_set - track_heading)
+    cross_track = drift * sin(relative_set)
+    if abs(cross_track) >= speed:
+        raise Exception('The current is too strong to hold a track on {0}'.format(
+            track_heading))
+
+    correction = asin(cross_track / speed)
+    ground_speed = speed * cos(correction) + drift * cos(relative_set)
+    if ground_speed <= 0.0:
+        raise Exception('The current is too strong to make way on {0}'.format(
+            track_heading))
+
+    return (track_heading - degrees(correction)) % 360, ground_speed
+
+
+def crab_headings(track_headings, speed, current_set, current_drift):
+    """crab_headings()
+
+    The array version of crab_heading(). Return the arrays of
+    the headings to steer and the speeds over the ground for an
+    array of track headings.
+    """
+
+    drift = current_drift * KNOTS_TO_METERS_PER_SECOND
+    relative_set = np.radians(current_set - np.asarray(track_headings, dtype=float))
+    cross_track = drift * np.sin(relative_set)
+    if np.any(np.abs(cross_track) >= speed):
+        raise Exception('The current is too strong to hold the tracks')
+
+    correction = np.arcsin(cross_track / speed)
+    ground_speed = speed * np.cos(correction) + drift * np.cos(relative_set)
+    if np.any(ground_speed <= 0.0):
+        raise Exception('The current is too strong to make way on the tracks')
+
+    return (np.asarray(track_headings) - np.degrees(correction)) % 360, ground_speed
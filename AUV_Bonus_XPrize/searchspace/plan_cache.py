@@ -0,0 +1,192 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""PlanCache
+
+Keep the search paths already planned, keyed by everything the
+planning depends on, so the same plan isn't calculated twice.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+import numpy as np
+from auv_bonus_xprize.settings import config
+
+#
+# The number of search paths kept in memory, when plan_cache_size
+# isn't in the search section.
+#
+PLAN_CACHE_SIZE = 16
+
+#
+# The version of the planners and of the file format, part of every
+# key. Bump it whenever the search paths planned for the same inputs
+# change, or the way they're saved does, so the plans saved before
+# are no longer used.
+#
+PLAN_CACHE_VERSION = 1
+
+
+def plan_key(plan_inputs):
+    """plan_key()
+
+    Return the key of a plan, the SHA-256 hex digest of
+    PLAN_CACHE_VERSION and its inputs written as JSON with sorted
+    keys. The inputs are a dict of strings, numbers and lists of
+    them, so equal inputs always give the same key, in this run or
+    another, until the version changes.
+    """
+
+    canonical = json.dumps({'version': PLAN_CACHE_VERSION, 'inputs': plan_inputs},
+                           sort_keys=True,
+                           separators=(',', ':'))
+
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _path_to_array(search_path):
+    """_path_to_array()
+
+    Return the search path as an (N, width) float array, with
+    NaN for the None headings.
+    """
+
+    width = max(len(waypt) for waypt in search_path)
+    array = np.full((len(search_path), width), np.nan)
+    for row, waypt in enumerate(search_path):
+        array[row, :len(waypt)] = [np.nan if value is None else value for value in waypt]
+
+    return array
+
+
+def _array_to_path(array):
+    """_array_to_path()
+
+    Return the search path stored in an array by _path_to_array().
+    The first three values of a waypoint are never None.
+    """
+
+    return [tuple(waypt[:3]) + tuple(None if value != value else value
+                                     for value in waypt[3:])
+            for waypt in array.tolist()]
+
+
+class PlanCache(object):
+    """PlanCache
+
+    The least recently used size search paths, kept in memory, in
+    front of an optional directory of <key>.npy files which keeps
+    every plan across runs. A plan found in the directory is read
+    with np.load(), without parsing text.
+
+    The plans are lists of waypoint tuples, as returned by
+    SearchSpace.calculate_search_path(). The tuples are immutable,
+    so each get() returns a new list of the same tuples.
+    """
+
+    def __init__(self, directory=None, size=PLAN_CACHE_SIZE):
+        """__init__()
+        """
+
+        if size < 1:
+            raise Exception('The plan cache must hold at least one plan')
+
+        self._directory = directory
+        self._size = size
+        self._plans = OrderedDict()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def construct_from_config(cls):
+        """construct_from_config()
+
+        Create the PlanCache with the plan_cache_dir and
+        plan_cache_size in the search section of the
+        configuration file. Without plan_cache_dir, the
+        plans are only kept in memory.
+        """
+
+        search = config['search']
+        return cls(search.get('plan_cache_dir', fallback=None),
+                   search.getint('plan_cache_size', fallback=PLAN_CACHE_SIZE))
+
+    def __len__(self):
+        return len(self._plans)
+
+    def _filename(self, key):
+        return os.path.join(self._directory, '{0}.npy'.format(key))
+
+    def get(self, key):
+        """get()
+
+        Return the search path planned for key, or None if it
+        hasn't been.
+        """
+
+        if key in self._plans:
+            self._plans.move_to_end(key)
+            return list(self._plans[key])
+
+        if self._directory is None:
+            return None
+
+        try:
+            array = np.load(self._filename(key))
+        except (OSError, ValueError):
+            return None
+
+        search_path = _array_to_path(array)
+        self._remember(key, search_path)
+
+        return list(search_path)
+
+    def put(self, key, search_path):
+        """put()
+
+        Keep the search path planned for key, in memory and, with
+        a directory, on disk. The file is written under another
+        name and renamed, so a file of the cache is always whole.
+        """
+
+        self._remember(key, [tuple(waypt) for waypt in search_path])
+
+        if self._directory is None or not search_path:
+            return
+
+        filename = self._filename(key)
+        partial_filename = '{0}.{1}.tmp'.format(filename, os.getpid())
+        try:
+            with open(partial_filename, 'wb') as plan_file:
+                np.save(plan_file, _path_to_array(search_path))
+            os.replace(partial_filename, filename)
+        except OSError as e:
+            logging.warning('PlanCache.put(): Failed to save {0}: {1}'.format(
+                filename,
+                e))
+
+    def _remember(self, key, search_path):
+        """_remember()
+
+        Keep the search path in memory, forgetting the least
+        recently used plan when there are too many.
+        """
+
+        self._plans[key] = search_path
+        self._plans.move_to_end(key)
+        while len(self._plans) > self._size:
+            self._plans.popitem(last=False)
@@ -0,0 +1,324 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""SampleIndex
+
+A spatial index of the positions where the AUV has sampled, to
+ask whether it has already sampled near a position or along a
+candidate search path.
+"""
+
+from math import ceil
+import numpy as np
+
+#
+# The number of new samples buffered before they're merged into
+# the sorted samples in one batch. Queries check the buffered
+# samples one by one, so this bounds the linear part of a query.
+#
+PENDING_SAMPLES = 256
+
+#
+# Each of the cell coordinates, relative to the cell of the first
+# sample, is packed into 21 bits of the cell key.
+#
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+
+class SampleIndex(object):
+    """SampleIndex
+
+    A spatial hash of (x, y, depth) sample positions. Each sample is
+    keyed by the cube of cell_size meters containing it, with the
+    column in the lowest bits of the key, then the row and then the
+    layer. The samples are kept sorted by key, so the cells along a
+    row of the grid are one run of samples, found by binary search.
+    New samples are buffered and merged into the sorted samples
+    PENDING_SAMPLES at a time.
+
+    A query searches outward in rings of rows around its cell, and
+    stops once the rings left are further away than the nearest
+    sample found, or than the radius. Only the layers holding
+    samples are searched, so a query grows with the square of the
+    radius at most, rather than the cube.
+
+    Distances are measured in three dimensions. The queries take
+    positions as (x, y, depth) and arrays of positions shaped (N, 3).
+    """
+
+    def __init__(self, cell_size):
+        """__init__()
+        """
+
+        if cell_size <= 0.0:
+            raise Exception('The cell size must be greater than zero')
+
+        self._cell_size = float(cell_size)
+        self._origin = None
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._positions = np.zeros((0, 3))
+        self._layers = None
+        self._pending = np.zeros((PENDING_SAMPLES, 3))
+        self._pending_count = 0
+
+    def __len__(self):
+        return len(self._keys) + self._pending_count
+
+    def _cells(self, positions):
+        """_cells()
+
+        Return the integer cell coordinates of an (N, 3) array
+        of positions, relative to the cell of the first sample.
+        """
+
+        return np.floor(positions / self._cell_size).astype(np.int64) - self._origin
+
+    @staticmethod
+    def _keys_of(cells):
+        """_keys_of()
+
+        Pack an (N, 3) array of cell coordinates into keys.
+        Cells too far from the first sample to pack are given
+        the key -1, which no sample has.
+        """
+
+        shifted = cells + _KEY_OFFSET
+        packable = np.all((shifted >= 0) & (shifted <= _KEY_MASK), axis=1)
+        keys = (shifted[:, 0] |
+                (shifted[:, 1] << _KEY_BITS) |
+                (shifted[:, 2] << (2 * _KEY_BITS)))
+
+        return np.where(packable, keys, -1)
+
+    def add(self, x, y, depth):
+        """add()
+
+        Add the position of a sample.
+        """
+
+        if self._origin is None:
+            self._origin = np.floor(np.array([x, y, depth]) / self._cell_size).astype(np.int64)
+
+        if self._pending_count >= len(self._pending):
+            self._merge()
+        self._pending[self._pending_count] = (x, y, depth)
+        self._pending_count += 1
+
+    def add_positions(self, positions):
+        """add_positions()
+
+        Add an (N, 3) array of sample positions.
+        """
+
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        if not len(positions):
+            return
+        if self._origin is None:
+            self._origin = np.floor(positions[0] / self._cell_size).astype(np.int64)
+
+        self._merge(positions)
+
+    def _merge(self, positions=None):
+        """_merge()
+
+        Merge the buffered samples, and any positions, into
+        the sorted samples, copying them once.
+        """
+
+        new_positions = self._pending[:self._pending_count]
+        if positions is not None:
+            new_positions = np.concatenate((new_positions, positions))
+        self._pending_count = 0
+        if not len(new_positions):
+            return
+
+        new_cells = self._cells(new_positions)
+        new_keys = self._keys_of(new_cells)
+        order = np.argsort(new_keys, kind='stable')
+        new_keys = new_keys[order]
+        new_positions = new_positions[order]
+
+        at = np.searchsorted(self._keys, new_keys, side='right')
+        self._keys = np.insert(self._keys, at, new_keys)
+        self._positions = np.insert(self._positions, at, new_positions, axis=0)
+
+        low, high = int(new_cells[:, 2].min()), int(new_cells[:, 2].max())
+        if self._layers is not None:
+            low, high = min(low, self._layers[0]), max(high, self._layers[1])
+        self._layers = (low, high)
+
+    def _ring(self, cells, ring, reach):
+        """_ring()
+
+        Return the (first, last) arrays, shaped (rows, N), of the
+        runs of sorted samples in the rows of the ring ring rows
+        and layers out from each of the (N, 3) cells of the queries.
+        A row spans reach columns either side of the cell. The rows
+        in layers without samples are left out.
+        """
+
+        steps = np.arange(-ring, ring + 1)
+        layer_offsets, row_offsets = np.meshgrid(steps, steps, indexing='ij')
+        on_ring = np.maximum(np.abs(layer_offsets), np.abs(row_offsets)) == ring
+        layer_offsets = layer_offsets[on_ring][:, np.newaxis]
+        row_offsets = row_offsets[on_ring][:, np.newaxis]
+
+        layers = cells[:, 2] + layer_offsets
+        in_layers = ((layers >= self._layers[0]) & (layers <= self._layers[1])).any(axis=1)
+        layers = layers[in_layers]
+        rows = cells[:, 1] + row_offsets[in_layers]
+        columns = np.broadcast_to(cells[:, 0], layers.shape)
+        layers, rows, columns = layers.ravel(), rows.ravel(), columns.ravel()
+
+        first_keys = self._keys_of(np.column_stack((columns - reach, rows, layers)))
+        last_keys = self._keys_of(np.column_stack((columns + reach, rows, layers)))
+        first = np.searchsorted(self._keys, first_keys, side='left')
+        last = np.searchsorted(self._keys, last_keys, side='right')
+        last = np.where((first_keys >= 0) & (last_keys >= 0), last, first)
+
+        return first.reshape(-1, len(cells)), last.reshape(-1, len(cells))
+
+    def _pairs(self, first, last):
+        """_pairs()
+
+        Return the query and sample index arrays of every sample
+        in the runs from first to last of each query.
+        """
+
+        counts = last - first
+        total = int(counts.sum())
+        if not total:
+            return None, None
+
+        queries = np.repeat(np.arange(len(first)), counts)
+        run_starts = np.repeat(first - np.cumsum(counts) + counts, counts)
+
+        return queries, run_starts + np.arange(total)
+
+    def _pending_distances(self, positions):
+        """_pending_distances()
+
+        Return the (N, M) distances from the positions to the
+        buffered samples.
+        """
+
+        pending = self._pending[:self._pending_count]
+
+        return np.linalg.norm(positions[:, np.newaxis, :] - pending[np.newaxis, :, :],
+                              axis=2)
+
+    def _nearest_distances(self, positions, radius):
+        """_nearest_distances()
+
+        Return the distance from each of the (N, 3) positions to
+        the nearest sample, or inf if there's none within radius.
+        """
+
+        nearest = np.full(len(positions), np.inf)
+        if not len(self) or not len(positions):
+            return nearest
+
+        if self._pending_count:
+            np.minimum(nearest, self._pending_distances(positions).min(axis=1), out=nearest)
+
+        if len(self._keys):
+            reach = int(ceil(radius / self._cell_size))
+            active = np.arange(len(positions))
+            cells = self._cells(positions)
+            for ring in range(reach + 1):
+                first, last = self._ring(cells, ring, reach)
+                queries, samples = self._pairs(first.ravel(), last.ravel())
+                if queries is not None:
+                    queries = active[queries % len(active)]
+                    distances = np.linalg.norm(self._positions[samples] - positions[queries],
+                                               axis=1)
+                    np.minimum.at(nearest, queries, distances)
+
+                #
+                # Every sample in the rings beyond this one is at
+                # least this far away, so a query with a nearer
+                # sample is done.
+                #
+                beyond = ring * self._cell_size
+                still_active = (nearest[active] > beyond) & (beyond <= radius)
+                active = active[still_active]
+                cells = cells[still_active]
+                if not len(active):
+                    break
+
+        nearest[nearest > radius] = np.inf
+
+        return nearest
+
+    def count_within(self, x, y, depth, radius):
+        """count_within()
+
+        Return the number of samples within radius of x, y, depth.
+        """
+
+        if not len(self):
+            return 0
+
+        position = np.array([[x, y, depth]], dtype=float)
+        count = 0
+        if len(self._keys):
+            reach = int(ceil(radius / self._cell_size))
+            cells = self._cells(position)
+            for ring in range(reach + 1):
+                first, last = self._ring(cells, ring, reach)
+                _, samples = self._pairs(first.ravel(), last.ravel())
+                if samples is not None:
+                    distances = np.linalg.norm(self._positions[samples] - position[0], axis=1)
+                    count += int(np.count_nonzero(distances <= radius))
+
+        if self._pending_count:
+            count += int(np.count_nonzero(self._pending_distances(position) <= radius))
+
+        return count
+
+    def nearest(self, x, y, depth, max_distance):
+        """nearest()
+
+        Return the distance to the sample nearest x, y, depth, or
+        None if there's none within max_distance.
+        """
+
+        distance = self._nearest_distances(np.array([[x, y, depth]], dtype=float),
+                                           max_distance)[0]
+        if np.isinf(distance):
+            return None
+
+        return float(distance)
+
+    def sampled_near(self, positions, radius):
+        """sampled_near()
+
+        Return an array of booleans, True for each of the (N, 3)
+        positions with a sample within radius.
+        """
+
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+
+        return np.isfinite(self._nearest_distances(positions, radius))
+
+    def coverage_gaps(self, positions, radius):
+        """coverage_gaps()
+
+        Return the indices of the (N, 3) positions, such as the
+        samples of a candidate search path, without a sample
+        within radius.
+        """
+
+        return np.flatnonzero(~self.sampled_near(positions, radius))
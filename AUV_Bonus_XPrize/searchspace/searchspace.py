@@ -17,12 +17,66 @@ The functionality for the search space in which the AUV
 operates.
 """
 
-from math import atan2, isclose
-
+import logging
+from time import time
+import numpy as np
 from auv_bonus_xprize.settings import config
-from searchspace.geometry import Point, Line, Polygon
-from searchspace.geometry import points_distance
-from searchspace.geometry import compass_heading_to_polar_angle
+from searchspace.geometry import Point, Polygon
+from searchspace.geometry import points_distance, inset_vertices
+from searchspace.navigation import utm_position_from_config, LocalFrame
+from searchspace.navigation import crab_heading, crab_headings
+from searchspace.bathymetry import bathymetry_from_config
+from searchspace.voxelgrid import VoxelGrid
+from searchspace.sampleindex import SampleIndex
+from searchspace.coverage import boustrophedon_path
+from searchspace.plan_cache import PlanCache, plan_key
+
+#
+# How sure an estimate of the current must be before it replaces
+# the set and drift in the configuration file, when
+# min_current_confidence isn't in the search section.
+#
+MIN_CURRENT_CONFIDENCE = 0.8
+
+#
+# The width of the cells in which the sensor samples are kept, when
+# voxel_cell_meters isn't in the search section. The layers default
+# to the track separation.
+#
+VOXEL_CELL_METERS = 5.0
+
+#
+# The options of the search section which change the search path
+# calculate_search_path() plans.
+#
+PLAN_OPTIONS = ['min_depth_meters',
+                'max_depth_meters',
+                'track_separation_meters',
+                'planning_frame',
+                'frame_snap_degrees',
+                'search_pattern',
+                'follow_seafloor',
+                'drift_compensation']
+
+#
+# The sections of the configuration file _plan_inputs() reads,
+# with the charted depths. The inputs are only built again when
+# their raw text changes.
+#
+PLAN_SECTIONS = ['starting', 'search', 'auv', 'bathymetry']
+
+
+def _plan_sections():
+    """_plan_sections()
+
+    Return the raw text of the PLAN_SECTIONS of the configuration
+    file, which is much cheaper to read than the options, to tell
+    whether they have changed.
+    """
+
+    return tuple(tuple(config.items(section, raw=True))
+                 for section in PLAN_SECTIONS
+                 if config.has_section(section))
 
 
 def _next_track_depth(present_depth):
@@ -49,15 +103,229 @@ def _next_track_depth(present_depth):
 def _starting_waypt():
     """_starting_waypt()
 
-    Retrieve the starting position UTM coordinates from
-    the config file and return the position as a Point.
+    Retrieve the starting position from the config file, as
+    UTM or lat, lon, and return the UTM position as a Point.
     """
 
-    auv_position = config['starting']['auv_position_utm'].split(',')
+    auv_position = utm_position_from_config('auv_position')
     logging.debug('_starting_waypt(): Setting AUV position {0}'.format(
         auv_position))
-    return Point(float(auv_position[0]),
-                 float(auv_position[1]))
+    return auv_position
+
+
+def densify_search_path(search_path, spacing):
+    """densify_search_path()
+
+    Return an (N, 4) array of x, y, depth, heading samples along
+    the search path from SearchSpace.calculate_search_path(),
+    evenly spaced no more than spacing apart on each leg. Every
+    waypoint is a sample. Depth changes linearly along a leg and
+    the heading is the heading of the leg, NaN where the leg only
+    changes depth.
+    """
+
+    samples, _ = _densify(search_path, spacing)
+
+    return samples
+
+
+def _densify(search_path, spacing):
+    """_densify()
+
+    Return the samples of densify_search_path() and an array of
+    the leg of each sample but the last. Leg k runs from waypoint
+    k to waypoint k + 1, so the piece of the path from sample i to
+    sample i + 1 is on leg[i].
+    """
+
+    if spacing <= 0:
+        raise Exception('The spacing must be greater than zero')
+
+    waypoints = np.array([(x, y, depth, np.nan if heading is None else heading)
+                          for x, y, depth, heading in (waypt[:4] for waypt in search_path)],
+                         dtype=float).reshape(-1, 4)
+    if len(waypoints) < 2:
+        return waypoints, np.zeros(0, dtype=int)
+
+    #
+    # Leg k is split into counts[k] equal steps. Sample j of the
+    # leg is at the fraction j / counts[k] of the way along it.
+    #
+    starts = waypoints[:-1]
+    ends = waypoints[1:]
+    lengths = np.hypot(ends[:, 0] - starts[:, 0], ends[:, 1] - starts[:, 1])
+    counts = np.maximum(np.ceil(lengths / spacing), 1).astype(int)
+    leg = np.repeat(np.arange(len(counts)), counts)
+    first_sample = np.cumsum(counts) - counts
+    fraction = (np.arange(len(leg)) - first_sample[leg]) / counts[leg]
+
+    samples = np.empty((len(leg) + 1, 4))
+    samples[:-1, :3] = (starts[leg, :3] +
+                        fraction[:, np.newaxis] * (ends[leg, :3] - starts[leg, :3]))
+    samples[:-1, 3] = ends[leg, 3]
+    samples[-1] = waypoints[-1]
+
+    return samples, leg
+
+
+def _safe_depths(samples, bathymetry):
+    """_safe_depths()
+
+    Return the deepest depth at which the AUV keeps the minimum
+    altitude above the charted sea floor at each sample. Depths
+    within the search depths are rounded up to a track depth, and
+    shallower ones up to a whole meter, no shallower than the
+    surface. Where the depth isn't charted, it's infinite.
+    """
+
+    min_altitude = float(config['auv']['min_altitude_meters'])
+    min_depth = float(config['search']['min_depth_meters'])
+    track_separation = float(config['search']['track_separation_meters'])
+
+    safe = bathymetry.depths_at(samples[:, 0], samples[:, 1]) - min_altitude
+    safe = np.where(np.isnan(safe), np.inf, safe)
+
+    track_depths = min_depth + np.floor((safe - min_depth) / track_separation) * track_separation
+
+    return np.where(safe >= min_depth,
+                    track_depths,
+                    np.maximum(np.floor(safe), 0.0))
+
+
+def fit_search_path_to_seafloor(search_path, starting_waypt, bathymetry):
+    """fit_search_path_to_seafloor()
+
+    Adjust the search path from SearchSpace.calculate_search_path()
+    so that the AUV keeps the minimum altitude above the charted
+    sea floor, instead of leaving it to altitude_safety().
+
+    Every leg, including the first one from starting_waypt, is
+    sampled at the spacing of the bathymetry grid in one pass. Each
+    piece of a track is flown at its planned depth or, where the
+    sea floor is too shallow, at the deepest safe depth, with
+    waypoints wherever the depth changes. The AUV climbs before
+    reaching shallower ground and descends after passing it.
+
+    When the next track comes back along the same line, the end
+    of a track which is all too shallow for its depth is trimmed
+    and the AUV turns around where the sea floor allows its depth.
+    The tracks are ordered from shallow to deep, so the path ends
+    before the first track with no piece at its planned depth.
+    """
+
+    if not search_path:
+        return list()
+
+    first_waypt = search_path[0]
+    waypoints = ([(starting_waypt.x, starting_waypt.y) + tuple(first_waypt[2:])] +
+                 list(search_path))
+    samples, leg = _densify(waypoints, bathymetry.cell_size)
+    safe = _safe_depths(samples, bathymetry)
+
+    #
+    # The safe depth of the piece from sample i to sample i + 1 is
+    # the shallower of its ends. Each piece of a track is flown at
+    # the shallower of its planned and safe depths.
+    #
+    planned = np.array([waypt[2] for waypt in waypoints[1:]], dtype=float)[leg]
+    piece_depths = np.minimum(planned, np.minimum(safe[:-1], safe[1:]))
+    clipped = piece_depths < planned
+    first_piece = np.searchsorted(leg, np.arange(len(waypoints) - 1))
+    last_piece = np.searchsorted(leg, np.arange(len(waypoints) - 1), side='right')
+
+    #
+    # turn_sample is the sample where the AUV turns, where a depth
+    # change is made. skip_pieces is the quantity of pieces at the
+    # start of the next track which retrace a trimmed end.
+    #
+    fitted_path = list()
+    turn_sample = 0
+    skip_pieces = 0
+    for leg_idx in range(len(waypoints) - 1):
+        heading = waypoints[leg_idx + 1][3]
+        if heading is None:
+            x, y = samples[turn_sample, :2].tolist()
+            depth = min(waypoints[leg_idx + 1][2], float(safe[turn_sample]))
+            if fitted_path and depth > fitted_path[-1][2]:
+                fitted_path.append((x, y, depth, None))
+            continue
+
+        leg_first = first_piece[leg_idx] + skip_pieces
+        leg_last = last_piece[leg_idx]
+        skip_pieces = 0
+
+        unclipped = np.flatnonzero(~clipped[leg_first:leg_last])
+        if len(unclipped) == 0 and leg_idx > 0:
+            logging.debug('fit_search_path_to_seafloor(): Dropping the tracks from {0}'.format(
+                waypoints[leg_idx]))
+            break
+
+        #
+        # Trim the end of the track which is too shallow for its
+        # depth, when the next track comes straight back over it.
+        #
+        next_track = leg_idx + 1
+        if next_track < len(waypoints) - 1 and waypoints[next_track + 1][3] is None:
+            next_track += 1
+        if (len(unclipped) and
+                next_track < len(waypoints) - 1 and
+                abs((waypoints[next_track + 1][3] - heading) % 360 - 180) < 1e-6 and
+                (last_piece[next_track] - first_piece[next_track]) ==
+                (last_piece[leg_idx] - first_piece[leg_idx])):
+            skip_pieces = leg_last - (leg_first + unclipped[-1] + 1)
+            leg_last -= skip_pieces
+
+        #
+        # The AUV heads for the depth of the waypoint it's moving
+        # toward. So it descends after the sample where the depth
+        # changes, and climbs over the piece before that sample,
+        # which is safe for both depths.
+        #
+        depths = piece_depths[leg_first:leg_last]
+        previous_change = 0
+        for change in (np.flatnonzero(np.diff(depths)) + 1).tolist():
+            if depths[change] < depths[change - 1] and change - 1 > previous_change:
+                x, y = samples[leg_first + change - 1, :2].tolist()
+                fitted_path.append((x, y, float(depths[change - 1]), heading))
+            x, y = samples[leg_first + change, :2].tolist()
+            fitted_path.append((x, y,
+                                float(min(depths[change - 1], depths[change])),
+                                heading))
+            previous_change = change
+        x, y = samples[leg_last, :2].tolist()
+        fitted_path.append((x, y, float(depths[-1]), heading))
+        turn_sample = leg_last
+
+    return fitted_path
+
+
+def compensate_search_path_for_drift(search_path, speed, current_set, current_drift):
+    """compensate_search_path_for_drift()
+
+    Return the search path with a fifth element added to each
+    waypoint: the heading to steer at speed meters per second so
+    that the current of set and drift knots keeps the ground track
+    on the heading of the leg to the waypoint. It's None for the
+    legs which only change depth.
+    """
+
+    track_headings = [waypt[3] for waypt in search_path if waypt[3] is not None]
+    if not track_headings:
+        return [tuple(waypt[:4]) + (None,) for waypt in search_path]
+
+    steered_headings = iter(crab_headings(track_headings,
+                                          speed,
+                                          current_set,
+                                          current_drift)[0].tolist())
+
+    compensated_path = list()
+    for waypt in search_path:
+        if waypt[3] is None:
+            compensated_path.append(tuple(waypt[:4]) + (None,))
+        else:
+            compensated_path.append(tuple(waypt[:4]) + (next(steered_headings),))
+
+    return compensated_path
 
 
 class SearchSpace(object):
@@ -67,67 +335,62 @@ class SearchSpace(object):
     def __init__(self):
         """__init__() - Create an instance of the SearchSpace
         """
-        self._cubes = dict()
+        self._voxels = None
+        self._sample_index = None
 
         self._boundary_polygon = None
-        self._northern_boundary = None
-        self._southern_boundary = None
-        self._eastern_boundary = None
-        self._western_boundary = None
         self._perimeter_length = None
 
         self._current_set = 0
         self._current_drift = 0.0
+        self._estimated_current = None
+
+        self._bathymetry = None
+        self._plan_cache = None
+        self._plan_state = None
+        self._plan_key = None
 
-    def _next_track_heading_and_waypt(self, starting_waypt):
+    def _next_track_heading_and_waypt(self,
+                                      starting_waypt,
+                                      boundary_polygon=None,
+                                      current_set=None):
         """next_track_heading_and_waypt()
 
         Given the sea current velocity and the starting_waypt,
         calculate the heading for the next track.
 
-        Determine the distance to each boundary. Return the heading
-        which is perpendicular to the current set and a waypt
-        which intersects the boundary on that heading.
+        Find where the track perpendicular to the current set
+        leaves the search area in each direction. Return the heading
+        and the waypt on the boundary for the longer of the two.
+        The search area and the set default to those of the
+        instance, and may instead be given in a LocalFrame.
         """
 
-        if self._inside_the_boundaries(starting_waypt):
-
-            track_heading = (self._current_set + 90) % 360
-
-            track_line = Line.construct_from_heading(starting_waypt,
-                                                     track_heading)
-
-            distances = list()
-            for boundary in [self._northern_boundary,
-                             self._eastern_boundary,
-                             self._southern_boundary,
-                             self._western_boundary]:
-                intersect_pt = boundary.find_intersection(track_line)
-                if intersect_pt:
-                    distance_to_boundary = points_distance(starting_waypt,
-                                                           intersect_pt)
-                    distances.append((distance_to_boundary,
-                                      intersect_pt))
-            distances.sort()
-
-            for intersect_pt_idx in range(1, len(distances)):
-                intersect_pt = distances[intersect_pt_idx][1]
-                if not self._inside_the_boundaries(intersect_pt):
-                    continue
+        if boundary_polygon is None:
+            boundary_polygon = self._boundary_polygon
+        if current_set is None:
+            current_set = self._current_set
 
-                angle_to_intersect_pt = atan2(
-                    intersect_pt.y - starting_waypt.y,
-                    intersect_pt.x - starting_waypt.x)
+        if boundary_polygon.point_is_inside(starting_waypt):
 
-                if not isclose(angle_to_intersect_pt,
-                               compass_heading_to_polar_angle(
-                                   track_heading),
-                               rel_tol=1e-5):
-                    track_heading = (track_heading + 180) % 360
+            track_heading = (current_set + 90) % 360
 
-                return track_heading, intersect_pt
+            longest = None
+            for heading in [track_heading, (track_heading + 180) % 360]:
+                exit_pt = boundary_polygon.exit_point(starting_waypt,
+                                                      heading)
+                if exit_pt is None:
+                    continue
 
-            raise Exception('No waypoint is inside the boundaries')
+                distance_to_boundary = points_distance(starting_waypt,
+                                                       exit_pt)
+                if longest is None or distance_to_boundary > longest[0]:
+                    longest = (distance_to_boundary, heading, exit_pt)
+
+            if longest is None or longest[0] == 0.0:
+                raise Exception('No waypoint is inside the boundaries')
+
+            return longest[1], longest[2]
         else:
             raise Exception('Starting point is outside the boundaries')
 
@@ -146,22 +409,89 @@ class SearchSpace(object):
         auv_y,
         auv_depth,
         sensor_value,
-        sensor_gain
+        sensor_gain,
+        timestamp=None
     ):
         """record_auv_path()
 
         Update the measurements for a particular cell visited
-        by the AUV.
+        by the AUV, in the VoxelGrid created by
+        set_search_boundaries(), with the sensor_gain it was read
+        at, and add the position to the SampleIndex. Return False
+        if the position is outside the grid. Raise an Exception if
+        the search boundaries haven't been set.
+        """
+
+        if self._voxels is None:
+            raise Exception('The search boundaries must be set before recording')
+
+        if timestamp is None:
+            timestamp = time()
+
+        self._sample_index.add(auv_x, auv_y, auv_depth)
+
+        return self._voxels.record(auv_x,
+                                   auv_y,
+                                   auv_depth,
+                                   sensor_value,
+                                   timestamp,
+                                   sensor_gain)
+
+    def sample_radius(self):
+        """sample_radius()
+
+        Return how near a position, in meters, a sample must be to
+        have sampled it, from sample_radius_meters in the search
+        section or else the track separation.
+        """
+
+        return config['search'].getfloat(
+            'sample_radius_meters',
+            fallback=float(config['search']['track_separation_meters']))
+
+    def unsampled_positions(self, search_path):
+        """unsampled_positions()
+
+        Return the (N, 3) array of the x, y, depth positions along
+        search_path, spaced the sample radius apart, which are not
+        within the sample radius of a recorded sample.
         """
 
-        self._cubes[(auv_x, auv_y, auv_depth)] = (sensor_value, sensor_gain)
+        radius = self.sample_radius()
+        positions = densify_search_path(search_path, radius)[:, :3]
+        if self._sample_index is None:
+            return positions
+
+        return positions[self._sample_index.coverage_gaps(positions, radius)]
+
+    def set_estimated_current(self, current_set, current_drift, confidence):
+        """set_estimated_current()
+
+        Save the set in compass degrees, the drift in knots and the
+        confidence of an estimate of the current, such as the one
+        from the AUV's CurrentEstimator.
+        """
+
+        self._estimated_current = (current_set, current_drift, confidence)
 
     def set_current_velocity(self):
         """set_current_velocity()
+
+        Use the set and drift from the configuration file or, with
+        the estimate_current option, the estimated current once its
+        confidence reaches min_current_confidence.
         """
 
         current_set = int(float(config['starting']['set']))
         current_drift = float(config['starting']['drift'])
+
+        if (self._estimated_current is not None and
+                config['search'].getboolean('estimate_current', fallback=False)):
+            estimated_set, estimated_drift, confidence = self._estimated_current
+            if confidence >= config['search'].getfloat('min_current_confidence',
+                                                       fallback=MIN_CURRENT_CONFIDENCE):
+                current_set = int(estimated_set) % 360
+                current_drift = estimated_drift
         if 0 <= current_set < 360:
             self._current_set = current_set
         else:
@@ -174,14 +504,15 @@ class SearchSpace(object):
     def set_search_boundaries(self):
         """set_search_boundaries
 
-        Calculate the horizontal search boundaries as lines offset
-        from the configured contest boundaries by a buffer. The
-        definition of the contest area vertices, as well as the
+        Calculate the horizontal search boundaries as the configured
+        contest boundaries inset by a buffer. The definition of the
+        contest area vertices, as UTM or lat, lon, as well as the
         buffer at the boundary, come from the configuration file.
 
-        The results of this method are saved as instance variables
-        named like _northern_boundary and are lines defined to
-        work with UTM positions.
+        The result of this method is saved as the instance
+        variable _boundary_polygon, defined to work with UTM
+        positions. The inset is cached by geometry.inset_vertices(),
+        so recalculating the same boundaries is cheap.
 
         https://www.latlong.net/lat-long-utm.html
 
@@ -190,57 +521,60 @@ class SearchSpace(object):
 
         boundary_buffer = round(float(config['search']['boundary_buffer_meters']))
 
-        vertex_list = list()
+        contest_vertices = list()
+        for corner in ['northwest',
+                       'northeast',
+                       'southeast',
+                       'southwest']:
+            corner_utm = utm_position_from_config(corner)
+            contest_vertices.append(Point(round(corner_utm.x),
+                                          round(corner_utm.y)))
+
+        #
+        # The samples are kept over the whole contest area, once,
+        # so they outlast any later changes to the boundaries.
+        #
+        if self._voxels is None:
+            layer_thickness = config['search'].getfloat(
+                'voxel_layer_meters',
+                fallback=float(config['search']['track_separation_meters']))
+            self._voxels = VoxelGrid.construct_from_polygon(
+                Polygon(contest_vertices),
+                float(config['search']['max_depth_meters']) + layer_thickness,
+                config['search'].getfloat('voxel_cell_meters',
+                                          fallback=VOXEL_CELL_METERS),
+                layer_thickness)
+            self._sample_index = SampleIndex(self.sample_radius())
+
+        vertex_list = inset_vertices(tuple(contest_vertices), boundary_buffer)
 
-        northwest_utm = config['starting']['northwest_utm'].split(',')
-        northwest_vertex = Point(round(float(northwest_utm[0])) + boundary_buffer,
-                                 round(float(northwest_utm[1])) - boundary_buffer)
-        vertex_list.append(northwest_vertex)
+        self._boundary_polygon = Polygon(vertex_list)
+        self._perimeter_length = self._boundary_polygon.perimeter
 
-        northeast_utm = config['starting']['northeast_utm'].split(',')
-        northeast_vertex = Point(round(float(northeast_utm[0])) - boundary_buffer,
-                                 round(float(northeast_utm[1])) - boundary_buffer)
-        vertex_list.append(northeast_vertex)
+    def planning_frame(self):
+        """planning_frame()
 
-        southeast_utm = config['starting']['southeast_utm'].split(',')
-        southeast_vertex = Point(round(float(southeast_utm[0])) - boundary_buffer,
-                                 round(float(southeast_utm[1])) + boundary_buffer)
-        vertex_list.append(southeast_vertex)
+        Return the LocalFrame for planning, as chosen by the
+        planning_frame option in the search section of the
+        configuration file, or None to plan in UTM:
 
-        southwest_utm = config['starting']['southwest_utm'].split(',')
-        southwest_vertex = Point(round(float(southwest_utm[0])) + boundary_buffer,
-                                 round(float(southwest_utm[1])) + boundary_buffer)
-        vertex_list.append(southwest_vertex)
+            utm      plan in UTM, the default
+            polygon  axes aligned with the longest boundary edge
+            current  +y axis on the current set, so tracks run
+                     along the frame x axis
+        """
 
-        self._boundary_polygon = Polygon(vertex_list)
+        planning_frame = config['search'].get('planning_frame',
+                                              fallback='utm')
+        if planning_frame == 'utm':
+            return None
+        elif planning_frame == 'polygon':
+            return LocalFrame.construct_from_polygon(self._boundary_polygon)
+        elif planning_frame == 'current':
+            return LocalFrame(self._boundary_polygon.centroid,
+                              self._current_set)
 
-        self._northern_boundary = Line.construct_from_two_points(
-            northwest_vertex,
-            northeast_vertex)
-        self._perimeter_length = points_distance(
-            northwest_vertex,
-            northeast_vertex)
-
-        self._eastern_boundary = Line.construct_from_two_points(
-            northeast_vertex,
-            southeast_vertex)
-        self._perimeter_length += points_distance(
-            northeast_vertex,
-            southeast_vertex)
-
-        self._southern_boundary = Line.construct_from_two_points(
-            southeast_vertex,
-            southwest_vertex)
-        self._perimeter_length += points_distance(
-            southeast_vertex,
-            southwest_vertex)
-
-        self._western_boundary = Line.construct_from_two_points(
-            southwest_vertex,
-            northwest_vertex)
-        self._perimeter_length += points_distance(
-            southwest_vertex,
-            northwest_vertex)
+        raise Exception('planning_frame must be utm, polygon or current')
 
     def calculate_search_path(self):
         """calculate_search_path()
@@ -248,24 +582,328 @@ class SearchSpace(object):
         Using the current position of AUV as a starting point
         and the set and drift of the current, calculate an ordered
         list of waypoints for the AUV to follow.
+
+        The search_pattern option in the search section chooses
+        the path:
+
+            curtain        tracks across the current, stepping
+                           down through the depths, the default
+            boustrophedon  sweeps across the current, covering the
+                           whole contest area at min_depth_meters,
+                           from boustrophedon_path()
+
+        The curtain is planned in the frame from planning_frame() and,
+        with the follow_seafloor option, fitted to the charted sea
+        floor with fit_search_path_to_seafloor(). With the
+        drift_compensation option, each waypoint also has the
+        heading to steer against the current.
+
+        The plans are kept in the PlanCache from the configuration
+        file, by the key of _plan_inputs(), and a plan already made
+        for the same inputs is returned from it. The key is only
+        calculated again when the boundaries, the current, the
+        charted depths or the text of the configuration file have
+        changed.
+        """
+
+        self.set_current_velocity()
+
+        plan_sections = _plan_sections()
+        if self._plan_inputs_state(plan_sections) != self._plan_state:
+            if config['search'].getboolean('follow_seafloor', fallback=False):
+                if self._bathymetry is None:
+                    self._bathymetry = bathymetry_from_config()
+                if self._bathymetry is None:
+                    raise Exception('follow_seafloor requires a bathymetry section')
+
+            if self._plan_cache is None:
+                self._plan_cache = PlanCache.construct_from_config()
+            self._plan_key = plan_key(self._plan_inputs())
+            self._plan_state = self._plan_inputs_state(plan_sections)
+            logging.debug('calculate_search_path(): Plan key {0}'.format(
+                self._plan_key))
+
+        key = self._plan_key
+        search_path = self._plan_cache.get(key)
+        if search_path is not None:
+            return search_path
+
+        search_path = self._plan()
+        self._plan_cache.put(key, search_path)
+
+        return search_path
+
+    def _plan_inputs_state(self, plan_sections):
+        """_plan_inputs_state()
+
+        Return what _plan_inputs() is built from, to be compared
+        with the state of the last key calculated: the boundaries,
+        the current, the charted depths and plan_sections from
+        _plan_sections().
+        """
+
+        return (self._boundary_polygon,
+                self._current_set,
+                self._current_drift,
+                self._bathymetry,
+                plan_sections)
+
+    def _plan_inputs(self):
+        """_plan_inputs()
+
+        Return a dict of everything calculate_search_path() plans
+        with: the boundaries, the starting position, the set and
+        drift in use, the planning options and, where they're
+        used, the speed and the digest of the bathymetry.
+        """
+
+        search = config['search']
+        starting_waypt = _starting_waypt()
+        plan_inputs = {
+            'boundaries': [list(vertex.as_tuple()) for vertex in self._boundary_polygon.vertices],
+            'starting_waypt': list(starting_waypt.as_tuple()),
+            'set': self._current_set,
+            'drift': self._current_drift,
+            'search': {option: search.get(option, fallback=None)
+                       for option in PLAN_OPTIONS},
+        }
+
+        if search.getboolean('drift_compensation', fallback=False):
+            plan_inputs['max_speed'] = config['auv']['max_speed']
+
+        if search.getboolean('follow_seafloor', fallback=False):
+            plan_inputs['min_altitude_meters'] = config['auv']['min_altitude_meters']
+            plan_inputs['bathymetry'] = self._bathymetry.digest
+
+        return plan_inputs
+
+    def _plan(self):
+        """_plan()
+
+        Plan the search path for calculate_search_path(), without
+        the cache.
+        """
+
+        search_pattern = config['search'].get('search_pattern',
+                                              fallback='curtain')
+        if search_pattern == 'curtain':
+            search_path = self._plan_in_frame(self.planning_frame())
+        elif search_pattern == 'boustrophedon':
+            search_path = self._plan_boustrophedon()
+        else:
+            raise Exception('search_pattern must be curtain or boustrophedon')
+
+        if config['search'].getboolean('follow_seafloor', fallback=False):
+            search_path = fit_search_path_to_seafloor(search_path,
+                                                      _starting_waypt(),
+                                                      self._bathymetry)
+
+        if config['search'].getboolean('drift_compensation', fallback=False):
+            search_path = compensate_search_path_for_drift(
+                search_path,
+                float(config['auv']['max_speed']),
+                self._current_set,
+                self._current_drift)
+
+        return search_path
+
+    def _boundaries_in_frame(self, frame):
+        """_boundaries_in_frame()
+
+        Return the boundary polygon and the set in frame. The set
+        is rounded to whole degrees, or to the nearest frame axis
+        if that is within frame_snap_degrees.
+        """
+
+        utm_vertices = [vertex.as_tuple() for vertex in self._boundary_polygon.vertices]
+        local_polygon = Polygon([Point(x, y) for x, y in
+                                 frame.to_local(utm_vertices).tolist()])
+        local_set = frame.heading_to_local(self._current_set)
+        nearest_axis = round(local_set / 90.0) * 90
+        snap_degrees = config['search'].getfloat('frame_snap_degrees',
+                                                 fallback=5.0)
+        if abs(local_set - nearest_axis) <= snap_degrees:
+            local_set = nearest_axis
+
+        return local_polygon, int(round(local_set)) % 360
+
+    def _plan_in_frame(self, frame):
+        """_plan_in_frame()
+
+        Plan the search path in frame, or in UTM if frame is None,
+        and return it in UTM.
+
+        The boundaries, starting point and set are converted to the
+        frame and the waypoints are converted back to UTM together.
+        The set in the frame is rounded to whole degrees, or to the
+        nearest frame axis if that is within frame_snap_degrees, so
+        the tracks run square to the boundaries.
         """
 
+        if frame is None:
+            return self._plan_search_path(_starting_waypt(),
+                                          self._boundary_polygon,
+                                          self._current_set)
+
+        local_polygon, local_set = self._boundaries_in_frame(frame)
+        local_path = self._plan_search_path(frame.point_to_local(_starting_waypt()),
+                                            local_polygon,
+                                            local_set)
+
+        utm_positions = frame.to_utm([waypt[:2] for waypt in local_path]).tolist()
+        search_path = list()
+        for (x, y), (_, _, depth, heading) in zip(utm_positions, local_path):
+            if heading is not None:
+                heading = frame.heading_to_utm(heading)
+            search_path.append((x, y, depth, heading))
+
+        return search_path
+
+    def iter_search_path(self):
+        """iter_search_path()
+
+        Generate the waypoints of the curtain search path one at a
+        time, planning each track only when the waypoint before it
+        is taken. Only the last waypoint, the depths and the passes
+        left are kept, so the first waypoint is ready at once
+        however large the search area and however fine the track
+        separation.
+
+        A dict sent to the generator replans from the next
+        waypoint, which send() returns:
+
+            starting_waypt  a UTM Point to move to the boundary from,
+                            as from the starting position
+            min_depth       a new depth band, which the remaining
+            max_depth       tracks step down through from min_depth
+
+        The tracks are planned in the frame from planning_frame()
+        and, with the drift_compensation option, each waypoint has
+        the heading to steer against the current. The
+        follow_seafloor option and the boustrophedon pattern need
+        the whole path, so they're only in calculate_search_path().
+        """
+
+        self.set_current_velocity()
+
+        search_pattern = config['search'].get('search_pattern',
+                                              fallback='curtain')
+        if (search_pattern != 'curtain' or
+                config['search'].getboolean('follow_seafloor', fallback=False)):
+            raise Exception('iter_search_path() plans only the curtain, without follow_seafloor')
+
+        frame = self.planning_frame()
+        if frame is None:
+            boundary_polygon, current_set = self._boundary_polygon, self._current_set
+        else:
+            boundary_polygon, current_set = self._boundaries_in_frame(frame)
+
+        drift_compensation = config['search'].getboolean('drift_compensation',
+                                                         fallback=False)
+        speed = float(config['auv']['max_speed']) if drift_compensation else None
         min_depth = float(config['search']['min_depth_meters'])
         max_depth = float(config['search']['max_depth_meters'])
         track_separation = float(config['search']['track_separation_meters'])
-        track_passes = int((max_depth - min_depth) / track_separation) + 1
 
+        def _to_local(utm_waypt):
+            return utm_waypt if frame is None else frame.point_to_local(utm_waypt)
+
+        waypt = _to_local(_starting_waypt())
         track_depth = min_depth
+        next_depth = min_depth
+        track_passes = int((max_depth - min_depth) / track_separation) + 1
+        to_the_boundary = True
+        change_depth = False
+
+        while track_passes > 0:
+            if change_depth:
+                heading = None
+                track_depth = next_depth
+                change_depth = False
+            else:
+                heading, waypt = self._next_track_heading_and_waypt(waypt,
+                                                                    boundary_polygon,
+                                                                    current_set)
+                if to_the_boundary:
+                    to_the_boundary = False
+                else:
+                    track_passes -= 1
+                    if track_passes > 0:
+                        next_depth = min(max(track_depth + track_separation, min_depth),
+                                         max_depth)
+                        change_depth = True
+
+            if frame is None:
+                utm_waypt, utm_heading = waypt, heading
+            else:
+                utm_waypt = frame.point_to_utm(waypt)
+                utm_heading = None if heading is None else frame.heading_to_utm(heading)
+
+            search_waypt = utm_waypt.as_tuple() + (track_depth, utm_heading)
+            if drift_compensation:
+                if utm_heading is None:
+                    search_waypt += (None,)
+                else:
+                    search_waypt += (crab_heading(utm_heading,
+                                                  speed,
+                                                  self._current_set,
+                                                  self._current_drift)[0],)
+
+            update = yield search_waypt
+
+            if update:
+                if 'starting_waypt' in update:
+                    waypt = _to_local(update['starting_waypt'])
+                    to_the_boundary = True
+                    change_depth = False
+                if 'min_depth' in update or 'max_depth' in update:
+                    min_depth = float(update.get('min_depth', min_depth))
+                    max_depth = float(update.get('max_depth', max_depth))
+                    track_passes = int((max_depth - min_depth) / track_separation) + 1
+                    next_depth = min_depth
+                    if to_the_boundary:
+                        track_depth = min_depth
+                    else:
+                        change_depth = True
+
+    def _plan_boustrophedon(self):
+        """_plan_boustrophedon()
+
+        Cover the boundary polygon with sweeps across the current,
+        track_separation_meters apart at min_depth_meters, starting
+        from the end of the first sweep nearest the AUV.
+        """
 
-        self.set_current_velocity()
+        return boustrophedon_path(self._boundary_polygon,
+                                  (self._current_set + 90) % 360,
+                                  float(config['search']['track_separation_meters']),
+                                  float(config['search']['min_depth_meters']),
+                                  start=_starting_waypt())
+
+    def _plan_search_path(self, starting_waypt, boundary_polygon, current_set):
+        """_plan_search_path()
+
+        Calculate the search path from starting_waypt in
+        boundary_polygon, across current_set.
+        """
+
+        min_depth = float(config['search']['min_depth_meters'])
+        max_depth = float(config['search']['max_depth_meters'])
+        track_separation = float(config['search']['track_separation_meters'])
+        track_passes = int((max_depth - min_depth) / track_separation) + 1
+
+        track_depth = min_depth
 
-        heading, waypt = self._next_track_heading_and_waypt(
-            _starting_waypt())
+        heading, waypt = self._next_track_heading_and_waypt(starting_waypt,
+                                                            boundary_polygon,
+                                                            current_set)
         search_path = list()
         search_path.append(waypt.as_tuple() + (track_depth, heading))
 
         while track_passes:
-            heading, waypt = self._next_track_heading_and_waypt(waypt)
+            heading, waypt = self._next_track_heading_and_waypt(waypt,
+                                                                boundary_polygon,
+                                                                current_set)
             search_path.append(waypt.as_tuple() + (track_depth, heading))
 
             if track_passes > 1:
@@ -0,0 +1,95 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Simulation
+
+Simulate the AUV following a search path in a current, to compare
+the time the search takes with the time planned for still water.
+"""
+
+import numpy as np
+from searchspace.navigation import KNOTS_TO_METERS_PER_SECOND
+
+#
+# The longest simulated leg, in time steps, before the current is
+# considered too strong for the AUV to reach the waypoint.
+#
+MAX_SIMULATION_STEPS = 100000
+
+
+def simulate_search_path(search_path,
+                         starting_waypt,
+                         speed,
+                         current_set,
+                         current_drift,
+                         time_step=1.0,
+                         tolerance=4.0):
+    """simulate_search_path()
+
+    Simulate the AUV steering for each waypoint of search_path as
+    Auv.move_toward_waypoint() does: toward the bearing to the
+    waypoint, plus the crab angle of a compensated search path, at
+    speed meters per second through the water, while the current of
+    set degrees and drift knots carries it. A leg is done within
+    tolerance meters of its waypoint.
+
+    All of the legs are simulated at once, each starting from the
+    waypoint before it. The changes of depth aren't simulated.
+
+    Return the seconds planned for still water, the seconds taken,
+    and the furthest the AUV strayed from the line of a leg.
+    """
+
+    starts = np.array([[starting_waypt.x, starting_waypt.y]] +
+                      [waypt[:2] for waypt in search_path[:-1]], dtype=float)
+    ends = np.array([waypt[:2] for waypt in search_path], dtype=float)
+    crab_angles = np.array([(waypt[4] - waypt[3] + 180.0) % 360.0 - 180.0
+                            if len(waypt) > 4 and waypt[4] is not None else 0.0
+                            for waypt in search_path])
+
+    legs = ends - starts
+    lengths = np.hypot(legs[:, 0], legs[:, 1])
+    directions = legs / np.where(lengths > 0.0, lengths, 1.0)[:, np.newaxis]
+    current = current_drift * KNOTS_TO_METERS_PER_SECOND * np.array(
+        [np.sin(np.radians(current_set)), np.cos(np.radians(current_set))])
+
+    positions = starts.copy()
+    elapsed = np.zeros(len(search_path))
+    cross_track = np.zeros(len(search_path))
+    active = np.flatnonzero(lengths > tolerance)
+
+    steps = 0
+    while active.size:
+        steps += 1
+        if steps > MAX_SIMULATION_STEPS:
+            raise Exception('The current is too strong to reach the waypoints')
+
+        to_end = ends[active] - positions[active]
+        headings = np.radians(np.degrees(np.arctan2(to_end[:, 0], to_end[:, 1])) +
+                              crab_angles[active])
+        velocities = speed * np.column_stack((np.sin(headings), np.cos(headings)))
+        positions[active] += (velocities + current) * time_step
+        elapsed[active] += time_step
+
+        from_start = positions[active] - starts[active]
+        cross_track[active] = np.maximum(
+            cross_track[active],
+            np.abs(from_start[:, 0] * directions[active, 1] -
+                   from_start[:, 1] * directions[active, 0]))
+
+        remaining = ends[active] - positions[active]
+        active = active[np.hypot(remaining[:, 0], remaining[:, 1]) > tolerance]
+
+    return (float(lengths.sum() / speed),
+            float(elapsed.sum()),
+            float(cross_track.max(initial=0.0)))
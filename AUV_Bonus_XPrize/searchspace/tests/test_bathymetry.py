@@ -0,0 +1,99 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Bathymetry
+
+Tests for the Bathymetry class
+"""
+import pytest
+
+
+@pytest.fixture
+def depths_file(tmp_path):
+    """depths_file
+
+    Fixture to save a grid of depths which slope down toward
+    the northeast, 40 + 0.01 * x + 0.02 * y meters below
+    the grid origin.
+    """
+
+    import numpy as np
+
+    rows, columns = np.mgrid[0:50, 0:80]
+    depths = 40.0 + 0.01 * columns * 5.0 + 0.02 * rows * 5.0
+    filename = str(tmp_path / 'depths.npy')
+    np.save(filename, depths.astype(np.float32))
+
+    return filename
+
+
+def test_depth_at(depths_file):
+    """test_depth_at
+
+    Interpolate depths from a memory-mapped grid, one
+    at a time and as arrays.
+    """
+
+    import numpy as np
+    from searchspace.bathymetry import Bathymetry
+
+    bathymetry = Bathymetry.construct_from_file(depths_file,
+                                                757000.0, 1978300.0, 5.0)
+    assert isinstance(bathymetry._depths.base, np.memmap)
+
+    assert bathymetry.depth_at(757000.0, 1978300.0) == pytest.approx(40.0)
+    assert bathymetry.depth_at(757012.5, 1978302.5) == pytest.approx(40.175)
+    assert bathymetry.depth_at(757395.0, 1978545.0) == pytest.approx(48.85)
+    assert np.isnan(bathymetry.depth_at(756999.0, 1978400.0))
+    assert np.isnan(bathymetry.depth_at(757100.0, 1978546.0))
+    assert bathymetry.altitude_at(757012.5, 1978302.5, 30.0) == pytest.approx(10.175)
+    assert bathymetry.altitude_at(757500.0, 1978302.5, 30.0) is None
+
+    rng = np.random.default_rng(7)
+    x = rng.uniform(756990.0, 757410.0, 1000)
+    y = rng.uniform(1978290.0, 1978560.0, 1000)
+    depths = bathymetry.depths_at(x, y)
+    for point_x, point_y, depth in zip(x, y, depths):
+        expected = bathymetry.depth_at(point_x, point_y)
+        if np.isnan(expected):
+            assert np.isnan(depth)
+        else:
+            assert depth == pytest.approx(expected)
+            assert depth == pytest.approx(40.0 +
+                                          0.01 * (point_x - 757000.0) +
+                                          0.02 * (point_y - 1978300.0),
+                                          abs=1e-4)
+
+
+def test_bathymetry_from_config(depths_file):
+    """test_bathymetry_from_config
+
+    Load the grid defined in the configuration file, if any.
+    """
+
+    from auv_bonus_xprize.settings import config
+    from searchspace.bathymetry import bathymetry_from_config
+
+    assert bathymetry_from_config() is None
+
+    config.add_section('bathymetry')
+    try:
+        config['bathymetry']['depths_file'] = depths_file
+        config['bathymetry']['origin_utm'] = '757000.0,1978300.0'
+        config['bathymetry']['cell_size_meters'] = '5.0'
+
+        bathymetry = bathymetry_from_config()
+        assert bathymetry.depth_at(757000.0, 1978300.0) == pytest.approx(40.0)
+
+    finally:
+        config.remove_section('bathymetry')
@@ -40,4 +40,4 @@ def test_class_constructor():
 
     search_space = SearchSpace()
 
-    assert isinstance(search_space._cubes, dict)
+    assert search_space._voxels is None
@@ -0,0 +1,138 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Coverage
+
+Tests for the boustrophedon coverage of polygons
+"""
+import pytest
+
+
+def _sweeps(path):
+    """_sweeps()
+
+    Return the start and end Points of the sweeps of a path.
+    """
+
+    from searchspace.geometry import Point
+
+    return [(Point(*path[index - 1][:2]), Point(*path[index][:2]))
+            for index in range(1, len(path), 2)]
+
+
+def test_square():
+    """test_square
+
+    Cover a square with sweeps to the north and back, centered
+    across it.
+    """
+
+    from searchspace.geometry import Point, Polygon
+    from searchspace.coverage import boustrophedon_path
+
+    square = Polygon([Point(0.0, 0.0), Point(0.0, 100.0),
+                      Point(100.0, 100.0), Point(100.0, 0.0)])
+
+    path = boustrophedon_path(square, 0, 20.0, 30.0)
+    assert len(path) == 10
+    assert [waypt[0] for waypt in path[0::2]] == pytest.approx([10.0, 30.0, 50.0, 70.0, 90.0])
+    assert [waypt[1] for waypt in path] == pytest.approx([0.0, 100.0, 100.0, 0.0, 0.0,
+                                                          100.0, 100.0, 0.0, 0.0, 100.0])
+    assert [waypt[3] for waypt in path[1::2]] == [0.0, 180.0, 0.0, 180.0, 0.0]
+    assert all(waypt[2] == 30.0 for waypt in path)
+
+    #
+    # Starting near the northeast corner, the sweeps start there.
+    #
+    path = boustrophedon_path(square, 0, 20.0, 30.0, start=Point(120.0, 110.0))
+    assert path[0][:2] == pytest.approx((90.0, 100.0))
+
+    with pytest.raises(Exception):
+        boustrophedon_path(square, 0, 0.0, 30.0)
+
+
+def test_holes():
+    """test_holes
+
+    No sweep crosses a hole, and the sweeps beside the hole are
+    grouped into cells, each swept back and forth before the next.
+    """
+
+    from searchspace.geometry import Point, Polygon
+    from searchspace.coverage import boustrophedon_path
+
+    square = Polygon([Point(0.0, 0.0), Point(0.0, 100.0),
+                      Point(100.0, 100.0), Point(100.0, 0.0)])
+    hole = Polygon([Point(25.0, 25.0), Point(25.0, 75.0),
+                    Point(75.0, 75.0), Point(75.0, 25.0)])
+
+    path = boustrophedon_path(square, 0, 20.0, 30.0, holes=[hole])
+    sweeps = _sweeps(path)
+    assert len(sweeps) == 8
+    for start, end in sweeps:
+        middle = Point((start.x + end.x) / 2.0, (start.y + end.y) / 2.0)
+        assert square.point_is_inside(middle)
+        assert not hole.point_is_inside(middle)
+
+    #
+    # The cell south of the hole is swept before the cell north of
+    # it, which is swept back from its nearest corner.
+    #
+    assert [(start.x, start.y, end.x, end.y) for start, end in sweeps[1:7]] == pytest.approx(
+        [(30.0, 25.0, 30.0, 0.0), (50.0, 0.0, 50.0, 25.0), (70.0, 25.0, 70.0, 0.0),
+         (70.0, 75.0, 70.0, 100.0), (50.0, 100.0, 50.0, 75.0), (30.0, 75.0, 30.0, 100.0)])
+
+
+def test_concave():
+    """test_concave
+
+    Sweeps across the notch of a U shaped polygon stay out of
+    the notch, whatever the sweep heading.
+    """
+
+    from searchspace.geometry import Point, Polygon
+    from searchspace.coverage import boustrophedon_path
+
+    u_shape = Polygon([Point(0.0, 0.0), Point(0.0, 300.0), Point(100.0, 300.0),
+                       Point(100.0, 100.0), Point(200.0, 100.0), Point(200.0, 300.0),
+                       Point(300.0, 300.0), Point(300.0, 0.0)])
+    notch = Polygon([Point(100.0, 100.0), Point(100.0, 300.0),
+                     Point(200.0, 300.0), Point(200.0, 100.0)])
+
+    for sweep_heading in (0, 37, 90, 135):
+        path = boustrophedon_path(u_shape, sweep_heading, 10.0, 30.0)
+        for start, end in _sweeps(path):
+            for fraction in (0.25, 0.5, 0.75):
+                x = start.x + fraction * (end.x - start.x)
+                y = start.y + fraction * (end.y - start.y)
+                assert not notch.point_is_inside(Point(x, y))
+
+
+def test_large_area():
+    """test_large_area
+
+    A four square kilometer area at five meter spacing is covered
+    by sweeps no more than the spacing apart.
+    """
+
+    from searchspace.geometry import Point, Polygon
+    from searchspace.coverage import sweep_segments
+
+    area = Polygon([Point(0.0, 0.0), Point(-100.0, 2000.0),
+                    Point(1900.0, 2100.0), Point(2000.0, 0.0)])
+
+    frame, lines, line_x, low, high = sweep_segments(area, 30, 5.0)
+    assert len(lines) == lines[-1] + 1
+    assert (high > low).all()
+    assert (lines[1:] - lines[:-1] == 1).all()
+    assert (line_x[1:] - line_x[:-1]) == pytest.approx(5.0)
@@ -0,0 +1,96 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Geofence
+
+Tests for the Geofence class
+"""
+import pytest
+
+
+def test_geofence_check():
+    """test_geofence_check
+
+    Every position classified INSIDE or OUTSIDE agrees with the
+    polygon.
+    """
+
+    import numpy as np
+    from searchspace.geofence import Geofence, INSIDE, NEAR, OUTSIDE
+    from searchspace.geometry import Point, Polygon
+
+    vertices = [Point(0.0, 0.0), Point(-10.0, 1000.0),
+                Point(490.0, 1005.0), Point(500.0, 5.0)]
+    polygon = Polygon(vertices)
+    geofence = Geofence(polygon, 2.0, 20.0)
+
+    assert geofence.check(250.0, 500.0) == INSIDE
+    assert geofence.check(10.0, 500.0) == NEAR
+    assert geofence.check(-4.0, 500.0) == NEAR
+    assert geofence.check(-30.0, 500.0) == OUTSIDE
+    assert geofence.check(5000.0, 500.0) == OUTSIDE
+
+    rng = np.random.default_rng(17)
+    for x, y in rng.uniform(-100.0, 1100.0, (2000, 2)).tolist():
+        status = geofence.check(x, y)
+        if status == INSIDE:
+            assert polygon.point_is_inside(Point(x, y))
+        elif status == OUTSIDE:
+            assert not polygon.point_is_inside(Point(x, y))
+
+    with pytest.raises(Exception):
+        Geofence(polygon, 0.0, 20.0)
+
+
+def test_geofence_edges():
+    """test_geofence_edges
+
+    With cells larger than the distance to the edge, positions
+    near the edges are still classified by the polygon itself.
+    """
+
+    from searchspace.geofence import Geofence, INSIDE, NEAR, OUTSIDE
+    from searchspace.geometry import Point, Polygon
+
+    vertices = [Point(0.0, 0.0), Point(0.0, 1000.0),
+                Point(1000.0, 1000.0), Point(1000.0, 0.0)]
+    geofence = Geofence(Polygon(vertices), 50.0, 20.0)
+
+    assert geofence.check(-1.0, 500.0) == OUTSIDE
+    assert geofence.check(1.0, 500.0) == NEAR
+    assert geofence.check(19.0, 500.0) == NEAR
+    assert geofence.check(21.0, 500.0) == INSIDE
+    assert geofence.check(500.0, 500.0) == INSIDE
+    assert geofence.check(999.0, 999.0) == NEAR
+    assert geofence.check(1001.0, 999.0) == OUTSIDE
+
+
+def test_geofence_from_config(monkeypatch):
+    """test_geofence_from_config
+
+    The geofence covers the contest area, not the buffered
+    search area.
+    """
+
+    from searchspace.geofence import geofence_from_config, INSIDE, NEAR
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'northwest_utm', '0.0,1000.0')
+    monkeypatch.setitem(config['starting'], 'northeast_utm', '1000.0,1000.0')
+    monkeypatch.setitem(config['starting'], 'southeast_utm', '1000.0,0.0')
+    monkeypatch.setitem(config['starting'], 'southwest_utm', '0.0,0.0')
+    monkeypatch.setitem(config['search'], 'geofence_near_meters', '10.0')
+
+    geofence = geofence_from_config()
+    assert geofence.check(50.0, 500.0) == INSIDE
+    assert geofence.check(5.0, 500.0) == NEAR
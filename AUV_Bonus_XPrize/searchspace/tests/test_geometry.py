@@ -30,6 +30,37 @@ def vertex_list():
     return vertices
 
 
+def test_point():
+    """test_point()
+
+    A Point is immutable, hashable, and calculates its
+    quadrant when it's read.
+    """
+
+    import pickle
+    from searchspace.geometry import Point
+
+    point = Point(3, -4)
+    assert point.x == 3
+    assert point.y == -4
+    assert point.as_tuple() == (3, -4)
+    assert point.quadrant == 'IV'
+    assert Point(-1, 1).quadrant == 'II'
+    assert Point(-1, -1).quadrant == 'III'
+    assert Point().quadrant == 'I'
+
+    with pytest.raises(AttributeError):
+        point.x = 5
+    with pytest.raises(AttributeError):
+        point.z = 5
+
+    assert Point(3, -4) in {point}
+    assert {Point(3, -4): 'found'}[point] == 'found'
+    assert len({Point(1, 1), Point(1.0, 1.0), Point(1, 2)}) == 2
+    assert point != (3, -4)
+    assert pickle.loads(pickle.dumps(point)) == point
+
+
 def test_points_distance():
     """test_points_distance()
     """
@@ -208,3 +239,542 @@ def test_point_is_inside(vertex_list):
 
     assert polygon.point_is_inside(inside_pt)
     assert not polygon.point_is_inside(outside_pt)
+
+
+def test_point_array(vertex_list):
+    """test_point_array
+
+    Test the constructors and accessors for the PointArray class.
+    """
+
+    from searchspace.geometry import Point, PointArray
+
+    points = PointArray.construct_from_points(vertex_list)
+
+    assert len(points) == 4
+    assert points.as_array().shape == (4, 2)
+    assert list(points.x) == [1, 4, 4, 1]
+    assert list(points.y) == [5, 5, 1, 1]
+    assert points[1] == Point(4, 5)
+    assert len(points[1:3]) == 2
+    assert points.as_points() == vertex_list
+
+    with pytest.raises(Exception):
+        PointArray([1, 2, 3])
+
+
+def test_batch_functions_match_scalar():
+    """test_batch_functions_match_scalar
+
+    The batch versions of the geometry functions must return
+    exactly what the scalar versions return, including for
+    vertical and horizontal lines and for identical points.
+    """
+
+    from math import isnan
+    from searchspace.geometry import Point, PointArray
+    from searchspace.geometry import bearing_to_point, bearings_to_points
+    from searchspace.geometry import points_distance, points_distances
+    from searchspace.geometry import formula_from_points, formulas_from_points
+    from searchspace.geometry import compass_heading_to_polar_angle
+    from searchspace.geometry import compass_headings_to_polar_angles
+
+    coordinates = [-7.5, -1, 0, 1, 3, 10]
+    points1 = list()
+    points2 = list()
+    for x1 in coordinates:
+        for y1 in coordinates:
+            for x2 in coordinates:
+                for y2 in coordinates:
+                    points1.append(Point(x1, y1))
+                    points2.append(Point(x2, y2))
+
+    array1 = PointArray.construct_from_points(points1)
+    array2 = PointArray.construct_from_points(points2)
+
+    bearings = bearings_to_points(array1, array2)
+    distances = points_distances(array1, array2)
+    slopes, y_intercepts, xs = formulas_from_points(array1, array2)
+
+    def same(scalar_value, batch_value):
+        if scalar_value is None:
+            return isnan(batch_value)
+        return scalar_value == batch_value
+
+    for idx, (p1, p2) in enumerate(zip(points1, points2)):
+        assert same(bearing_to_point(p1, p2), bearings[idx])
+        assert points_distance(p1, p2) == distances[idx]
+        slope, y_intercept, x = formula_from_points(p1, p2)
+        assert same(slope, slopes[idx])
+        assert same(y_intercept, y_intercepts[idx])
+        assert same(x, xs[idx])
+
+    assert list(bearings_to_points(Point(1, 1),
+                                   [(1, 10), (10, 1), (-5, 7)])) == [0, 90, 315]
+
+    headings = [0, 45, 90, 135.5, 180, 270, 359, 360, -90, 725]
+    angles = compass_headings_to_polar_angles(headings)
+    for heading, angle in zip(headings, angles):
+        assert compass_heading_to_polar_angle(heading) == angle
+
+
+def test_points_are_inside(vertex_list):
+    """test_points_are_inside
+
+    The batch containment test must agree with point_is_inside(),
+    including for points on and just outside the edges.
+    """
+
+    import sys
+    from searchspace.geometry import Point, Polygon, EDGE_TOLERANCE
+
+    rectangle = Polygon(vertex_list)
+    trapezoid = Polygon([Point(1, 5), Point(4, 5), Point(3, 1), Point(2, 1)])
+    concave = Polygon([Point(0, 0), Point(10, 0), Point(10, 10),
+                       Point(5, 3), Point(0, 10)])
+
+    test_points = [(3, 4), (5, 7), (4, 3), (1, 1), (4, 5), (2.5, 5),
+                   (4 + EDGE_TOLERANCE / 2, 3), (4 + 2 * EDGE_TOLERANCE, 3),
+                   (5, 2), (5, 4), (0, 5), (-1, -1), (10, 5), (7, 6)]
+    for polygon in [rectangle, trapezoid, concave]:
+        batch = polygon.points_are_inside(test_points)
+        for (x, y), inside in zip(test_points, batch):
+            assert polygon.point_is_inside(Point(x, y)) == inside
+
+    assert list(concave.points_are_inside([(5, 2), (5, 4), (7, 5), (2, 6)])) == \
+        [True, False, True, True]
+    assert list(rectangle.points_are_inside([(4 + EDGE_TOLERANCE / 2, 3),
+                                             (4 + 2 * EDGE_TOLERANCE, 3)])) == \
+        [True, False]
+
+    assert 'matplotlib' not in sys.modules
+
+
+def test_heading_to_direction():
+    """test_heading_to_direction
+    """
+
+    from math import sqrt
+    from searchspace.geometry import heading_to_direction
+
+    assert heading_to_direction(0) == (0.0, 1.0)
+    assert heading_to_direction(90) == (1.0, 0.0)
+    assert heading_to_direction(180) == (0.0, -1.0)
+    assert heading_to_direction(270) == (-1.0, 0.0)
+    assert heading_to_direction(360) == (0.0, 1.0)
+    assert heading_to_direction(135) == (sqrt(0.5), -sqrt(0.5))
+    x_offset, y_offset = heading_to_direction(30)
+    assert x_offset == pytest.approx(0.5)
+    assert y_offset == pytest.approx(sqrt(3) / 2)
+
+
+def test_general_line():
+    """test_general_line
+
+    Test the constructors and the compatibility properties of
+    the GeneralLine class.
+    """
+
+    from searchspace.geometry import Point, GeneralLine
+
+    line = GeneralLine.construct_from_two_points(Point(0, 1), Point(2, 5))
+    assert line.slope == 2
+    assert line.y_intercept == 1
+    assert line.x is None
+
+    line = GeneralLine.construct_from_two_points(Point(3, 0), Point(3, 7))
+    assert line.slope == float("inf")
+    assert line.y_intercept is None
+    assert line.x == 3
+
+    line = GeneralLine.construct_from_heading(Point(0, 1), 90)
+    assert line.slope == 0
+    assert line.y_intercept == 1
+
+    line = GeneralLine.construct_from_heading(Point(4, 1), 180)
+    assert line.x == 4
+
+    line = GeneralLine.construct_from_heading(Point(0, 1), 45)
+    assert line.slope == pytest.approx(1.0, rel=0.0000001)
+    assert line.y_intercept == pytest.approx(1.0)
+
+    line = GeneralLine.construct_from_formula(float("inf"), None, 5)
+    assert line.x == 5
+    line = GeneralLine.construct_from_formula(-2, 3, None)
+    assert line.slope == -2
+    assert line.y_intercept == 3
+
+    with pytest.raises(Exception):
+        GeneralLine(0, 0, 1)
+
+
+def test_general_line_intersection():
+    """test_general_line_intersection
+    """
+
+    from searchspace.geometry import Point, GeneralLine
+
+    vertical = GeneralLine.construct_from_two_points(Point(100, 300),
+                                                     Point(100, 100))
+    horizontal = GeneralLine.construct_from_two_points(Point(10, 300),
+                                                       Point(100, 300))
+    diagonal = GeneralLine.construct_from_heading(Point(80, 105), 45)
+
+    assert vertical.find_intersection(horizontal) == Point(100, 300)
+    assert vertical.find_intersection(diagonal) == Point(100, 125)
+    assert horizontal.find_intersection(diagonal) == diagonal.find_intersection(horizontal)
+    assert vertical.find_intersection(vertical) is None
+
+    #
+    # The eastern and western edges of the competition area are
+    # nearly vertical and nearly, but not exactly, parallel.
+    #
+    eastern = GeneralLine.construct_from_two_points(Point(758002.65, 1979365.56),
+                                                    Point(758015.66, 1978369.11))
+    western = GeneralLine.construct_from_two_points(Point(757014.15, 1978356.06),
+                                                    Point(757001.19, 1979352.50))
+    assert not eastern.is_parallel(western)
+    assert eastern.is_parallel(western, tolerance=1e-3)
+    shifted = GeneralLine(eastern.a, eastern.b, eastern.c + 1000.0)
+    assert eastern.is_parallel(shifted)
+    assert eastern.find_intersection(shifted) is None
+
+
+def test_general_line_distances():
+    """test_general_line_distances
+    """
+
+    from searchspace.geometry import Point, GeneralLine
+
+    line = GeneralLine.construct_from_two_points(Point(0, 0), Point(4, 4))
+
+    assert line.on_the_line(Point(2, 2))
+    assert not line.on_the_line(Point(2, 3))
+    assert line.distance_to_point(Point(0, 2)) == pytest.approx(2 ** 0.5)
+    assert line.project(Point(0, 2)) == Point(1, 1)
+
+    perpendicular = line.find_perpendicular(Point(0, 2))
+    assert perpendicular.on_the_line(Point(1, 1))
+    assert perpendicular.find_intersection(line) == Point(1, 1)
+
+    found = line.point_at_distance(Point(1, 1), Point(-5, -5), 2 ** 0.5)
+    assert found.x == pytest.approx(0.0)
+    assert found.y == pytest.approx(0.0)
+
+    vertical = GeneralLine.construct_from_two_points(Point(3, 0), Point(3, 7))
+    assert vertical.point_at_distance(Point(3, 2), Point(3, 0), 1.5) == Point(3, 0.5)
+    assert vertical.distance_to_point(Point(-1, 6)) == 4
+
+
+def test_line_distance_to_point():
+    """test_line_distance_to_point
+    """
+
+    from searchspace.geometry import Point, Line
+
+    line = Line.construct_from_two_points(Point(0, 0), Point(4, 4))
+    assert line.distance_to_point(Point(2, 2)) == 0
+    assert line.distance_to_point(Point(0, 2)) == pytest.approx(2 ** 0.5)
+
+    vertical = Line.construct_from_two_points(Point(3, 0), Point(3, 7))
+    assert vertical.distance_to_point(Point(-1, 6)) == 4
+
+
+def test_segment():
+    """test_segment
+    """
+
+    from searchspace.geometry import Point, Segment
+
+    track = Segment(Point(0, 0), Point(0, 10))
+
+    assert track.length == 10
+    assert track.heading == 0
+    assert Segment(Point(0, 0), Point(-5, 0)).heading == 270
+    assert track.start == Point(0, 0)
+    assert track.end == Point(0, 10)
+
+    assert track.along_track_distance(Point(3, 4)) == 4
+    assert track.along_track_distance(Point(3, -2)) == -2
+    assert track.cross_track_distance(Point(3, 4)) == 3
+    assert track.cross_track_distance(Point(-3, 4)) == -3
+
+    assert track.distance_to_point(Point(3, 4)) == 3
+    assert track.distance_to_point(Point(3, 14)) == 5
+    assert track.nearest_point(Point(3, 4)) == Point(0, 4)
+    assert track.nearest_point(Point(3, -4)) == Point(0, 0)
+    assert track.nearest_point(Point(-3, 40)) == Point(0, 10)
+
+    assert track.as_line().on_the_line(Point(0, 25))
+
+    with pytest.raises(Exception):
+        Segment(Point(1, 1), Point(1, 1))
+
+
+def test_segment_batch():
+    """test_segment_batch
+
+    The batch queries must agree with the scalar queries.
+    """
+
+    import numpy as np
+    from searchspace.geometry import Point, Segment
+
+    track = Segment(Point(757001.19, 1979352.50), Point(758002.65, 1979365.56))
+    points = np.random.default_rng(7).uniform((756900, 1979250),
+                                              (758100, 1979450),
+                                              (50, 2))
+
+    along = track.along_track_distances(points)
+    cross = track.cross_track_distances(points)
+    distances = track.distances_to_points(points)
+    nearest = track.nearest_points(points)
+
+    for idx, (x, y) in enumerate(points):
+        point = Point(x, y)
+        assert along[idx] == pytest.approx(track.along_track_distance(point))
+        assert cross[idx] == pytest.approx(track.cross_track_distance(point))
+        assert distances[idx] == pytest.approx(track.distance_to_point(point))
+        assert tuple(nearest[idx]) == pytest.approx(track.nearest_point(point).as_tuple())
+
+
+def test_exit_point(vertex_list):
+    """test_exit_point
+    """
+
+    from searchspace.geometry import Point, Polygon
+
+    rectangle = Polygon(vertex_list)
+
+    assert rectangle.exit_point(Point(2, 3), 0) == Point(2, 5)
+    assert rectangle.exit_point(Point(2, 3), 90) == Point(4, 3)
+    assert rectangle.exit_point(Point(2, 3), 180) == Point(2, 1)
+    assert rectangle.exit_point(Point(2, 3), 270) == Point(1, 3)
+    assert rectangle.exit_point(Point(2, 2), 45) == Point(4, 4)
+    assert rectangle.exit_point(Point(4, 3), 90) == Point(4, 3)
+    assert rectangle.exit_point(Point(4, 3), 270) == Point(1, 3)
+    assert rectangle.exit_point(Point(7, 3), 270) is None
+
+
+def test_exit_point_many_vertices():
+    """test_exit_point_many_vertices
+
+    Compare the exit points of a star-shaped polygon with
+    hundreds of vertices to a search of every edge.
+    """
+
+    from math import sin, cos, radians
+    from searchspace.geometry import Point, Polygon, GeneralLine, Segment
+    from searchspace.geometry import points_distance
+
+    vertices = list()
+    for idx in range(400):
+        angle = radians(idx * 360.0 / 400)
+        radius = 1000.0 if idx % 2 else 800.0
+        vertices.append(Point(radius * cos(angle), radius * sin(angle)))
+    star = Polygon(vertices)
+
+    for start in [Point(0, 0), Point(300, -200), Point(-512, 77)]:
+        for heading in range(0, 360, 7):
+            exit_pt = star.exit_point(start, heading)
+            track = GeneralLine.construct_from_heading(start, heading)
+
+            nearest = None
+            for idx, vertex in enumerate(vertices):
+                edge = Segment(vertices[idx - 1], vertex)
+                crossing = track.find_intersection(edge.as_line())
+                if crossing is None or edge.distance_to_point(crossing) > 1e-6:
+                    continue
+                if points_distance(start, crossing) < 1e-6:
+                    continue
+                if bearing_matches(start, crossing, heading) and \
+                        (nearest is None or
+                         points_distance(start, crossing) < points_distance(start, nearest)):
+                    nearest = crossing
+
+            assert exit_pt.x == pytest.approx(nearest.x)
+            assert exit_pt.y == pytest.approx(nearest.y)
+
+
+def bearing_matches(start, point, heading):
+    """bearing_matches
+
+    Return True if point is ahead of start on the heading.
+    """
+
+    from searchspace.geometry import heading_to_direction
+
+    x_offset, y_offset = heading_to_direction(heading)
+
+    return (point.x - start.x) * x_offset + (point.y - start.y) * y_offset > 0
+
+
+def test_edge_grid_contains():
+    """test_edge_grid_contains
+
+    Polygons with many edges use their EdgeGrid for
+    point_is_inside(), which must agree with the batch test.
+    """
+
+    import numpy as np
+    from math import sin, cos, radians
+    from searchspace.geometry import Point, Polygon, GRID_EDGE_THRESHOLD
+
+    vertices = list()
+    for idx in range(4 * GRID_EDGE_THRESHOLD):
+        angle = radians(idx * 360.0 / (4 * GRID_EDGE_THRESHOLD))
+        radius = 1000.0 if idx % 2 else 800.0
+        vertices.append(Point(radius * cos(angle), radius * sin(angle)))
+    star = Polygon(vertices)
+
+    test_points = np.random.default_rng(3).uniform(-1100, 1100, (2000, 2))
+    test_points[:len(vertices)] = [vertex.as_tuple() for vertex in vertices]
+    batch = star.points_are_inside(test_points)
+
+    for (x, y), inside in zip(test_points, batch):
+        assert star.point_is_inside(Point(x, y)) == inside
+
+
+def test_inset_vertices():
+    """test_inset_vertices
+
+    Move the edges of convex and concave polygons inward and
+    outward, dropping collapsed edges, and reuse cached results.
+    """
+
+    import pytest
+    from searchspace.geometry import Point, Polygon, Segment
+    from searchspace.geometry import inset_vertices
+
+    square = (Point(0, 100), Point(100, 100), Point(100, 0), Point(0, 0))
+    assert inset_vertices(square, 10) == (Point(10, 90), Point(90, 90),
+                                          Point(90, 10), Point(10, 10))
+    assert inset_vertices(square[::-1], 10) == (Point(10, 10), Point(90, 10),
+                                                Point(90, 90), Point(10, 90))
+    assert inset_vertices(square, -10) == (Point(-10, 110), Point(110, 110),
+                                           Point(110, -10), Point(-10, -10))
+
+    concave = tuple(Point(x, y) for x, y in
+                    [(0, 0), (0, 200), (100, 200), (100, 100), (300, 100), (300, 0)])
+    assert inset_vertices(concave, 10) == tuple(
+        Point(x, y) for x, y in
+        [(10, 10), (10, 190), (90, 190), (90, 90), (290, 90), (290, 10)])
+
+    #
+    # The short top edge collapses, leaving a triangle at least
+    # the buffer away from every original edge.
+    #
+    trapezoid = (Point(0, 0), Point(100, 0), Point(55, 40), Point(45, 40))
+    triangle = inset_vertices(trapezoid, 15)
+    assert len(triangle) == 3
+    original = Polygon(trapezoid)
+    for vertex in triangle:
+        assert original.point_is_inside(vertex)
+        for idx in range(len(trapezoid)):
+            edge = Segment(trapezoid[idx - 1], trapezoid[idx])
+            assert edge.distance_to_point(vertex) >= 15 - 1e-9
+
+    hits = inset_vertices.cache_info().hits
+    assert Polygon(square).inset(10).point_is_inside(Point(50, 50))
+    assert inset_vertices.cache_info().hits == hits + 1
+
+    with pytest.raises(Exception):
+        inset_vertices(square, 60)
+
+    #
+    # The arms of a U shape separate, and the ring joining them
+    # would cross itself.
+    #
+    u_shape = tuple(Point(x, y) for x, y in
+                    [(0, 0), (0, 100), (40, 100), (40, 20),
+                     (60, 20), (60, 100), (100, 100), (100, 0)])
+    assert len(inset_vertices(u_shape, 5)) == 8
+    with pytest.raises(ValueError):
+        inset_vertices(u_shape, 15)
+
+
+def test_polygon_metrics():
+    """test_polygon_metrics
+
+    The area, centroid and perimeter of a concave polygon,
+    in both winding orders.
+    """
+
+    from searchspace.geometry import Point, Polygon
+
+    vertices = [Point(x, y) for x, y in
+                [(0, 0), (0, 200), (100, 200), (100, 100), (300, 100), (300, 0)]]
+    for polygon in [Polygon(vertices), Polygon(vertices[::-1])]:
+        assert polygon.area == 40000
+        assert polygon.perimeter == 1000
+        assert polygon.centroid == Point(125, 75)
+
+
+def test_decompose():
+    """test_decompose
+
+    Divide concave polygons into trapezoids covering the same
+    area and find the cell containing a point.
+    """
+
+    import numpy as np
+    from math import sin, cos, radians
+    from searchspace.geometry import Point, Polygon, Segment
+
+    u_shape = Polygon([Point(x, y) for x, y in
+                       [(0, 0), (0, 100), (40, 100), (40, 30),
+                        (60, 30), (60, 100), (100, 100), (100, 0)]])
+    cells = u_shape.decompose()
+    assert len(cells) == 3
+    assert [cell.bounding_box for cell in cells] == [(0, 0, 100, 30),
+                                                     (0, 30, 40, 100),
+                                                     (60, 30, 100, 100)]
+    assert sum(cell.area for cell in cells) == u_shape.area
+    assert u_shape.cell_containing(Point(50, 10)) is cells[0]
+    assert u_shape.cell_containing(Point(20, 60)) is cells[1]
+    assert u_shape.cell_containing(Point(80, 30)) is cells[2]
+    assert u_shape.cell_containing(Point(50, 60)) is None
+    assert u_shape.cell_containing(Point(150, 60)) is None
+
+    vertices = list()
+    for idx in range(60):
+        angle = radians(idx * 6.0)
+        radius = 1000.0 if idx % 2 else 700.0
+        vertices.append(Point(radius * cos(angle), radius * sin(angle)))
+    star = Polygon(vertices)
+    assert abs(sum(cell.area for cell in star.decompose()) - star.area) < 1e-6
+
+    #
+    # Away from the edges, a point is in a cell exactly when
+    # it's inside the polygon.
+    #
+    test_points = np.random.default_rng(5).uniform(-1100, 1100, (2000, 2))
+    edge_distances = np.min([Segment(vertices[idx - 1], vertex).distances_to_points(test_points)
+                             for idx, vertex in enumerate(vertices)], axis=0)
+    test_points = test_points[edge_distances > 0.1]
+    inside = star.points_are_inside(test_points)
+    for (x, y), expected in zip(test_points, inside):
+        cell = star.cell_containing(Point(x, y))
+        assert (cell is not None) == expected
+        if cell is not None:
+            assert cell.point_is_inside(Point(x, y))
+
+    #
+    # Within the edge tolerance, a point inside the polygon is
+    # in a cell, however the edge slopes.
+    #
+    triangle = Polygon([Point(99, 8), Point(-31, 44), Point(-78, -30)])
+    assert triangle.point_is_inside(Point(-10.9567, -15.6269))
+    assert triangle.cell_containing(Point(-10.9567, -15.6269)) is not None
+
+    rng = np.random.default_rng(7)
+    for polygon in (star, triangle, u_shape):
+        polygon_vertices = polygon.vertices
+        for idx, vertex in enumerate(polygon_vertices):
+            edge = Segment(polygon_vertices[idx - 1], vertex)
+            along = rng.uniform(-0.05, 1.05, 50) * edge.length
+            offset = rng.uniform(-0.099, 0.099, 50)
+            for x, y in zip(edge.x0 + along * edge.unit_x + offset * edge.unit_y,
+                            edge.y0 + along * edge.unit_y - offset * edge.unit_x):
+                if polygon.point_is_inside(Point(x, y)):
+                    assert polygon.cell_containing(Point(x, y)) is not None
@@ -132,7 +132,188 @@ def test_cartesian_to_geo():
 
     assert nc.cartesian_to_geo((0.0, 0.0)) == (30.4, -65.6)
 
+    #
+    # The longitude scale is taken at the center latitude, so the
+    # far corner converts back to the boundaries.
+    #
     converted_position = nc.cartesian_to_geo((nc._east_west_distance_meters,
                                               nc._north_south_distance_meters))
-    assert converted_position[0] == 30.5
-    assert -65.39212 < converted_position[1] < -65.39211
+    assert converted_position[0] == pytest.approx(30.5, abs=1e-12)
+    assert converted_position[1] == pytest.approx(-65.5, abs=1e-12)
+
+    for geo_position in [(30.4, -65.6), (30.45, -65.55), (30.49, -65.51)]:
+        point = nc.geo_to_cartesian(geo_position)
+        assert nc.cartesian_to_geo(point.as_tuple()) == pytest.approx(geo_position, abs=1e-12)
+
+def test_array_conversions():
+    """test_array_conversions()
+
+    The array conversions match the single position conversions
+    and return NaN for positions outside the area.
+    """
+
+    import numpy as np
+    from searchspace.navigation import NavConverter
+    nc = NavConverter.construct_from_boundaries(30.5,
+                                                30.4,
+                                                -65.5,
+                                                -65.6)
+
+    rng = np.random.default_rng(11)
+    geo_positions = np.column_stack((rng.uniform(30.35, 30.55, 500),
+                                     rng.uniform(-65.65, -65.45, 500)))
+    inside = ((30.4 <= geo_positions[:, 0]) & (geo_positions[:, 0] <= 30.5) &
+              (-65.6 <= geo_positions[:, 1]) & (geo_positions[:, 1] <= -65.5))
+    cartesian_positions = nc.geo_to_cartesian_array(geo_positions)
+    assert cartesian_positions.shape == (500, 2)
+    assert np.isnan(cartesian_positions[~inside]).all()
+    for geo_position, cartesian_position in zip(geo_positions[inside],
+                                                cartesian_positions[inside]):
+        point = nc.geo_to_cartesian(tuple(geo_position))
+        assert tuple(cartesian_position) == point.as_tuple()
+
+    xy_positions = np.column_stack((rng.uniform(-100.0, 10000.0, 500),
+                                    rng.uniform(-100.0, 12000.0, 500)))
+    inside = ((0.0 <= xy_positions[:, 0]) &
+              (xy_positions[:, 0] <= nc._east_west_distance_meters) &
+              (0.0 <= xy_positions[:, 1]) &
+              (xy_positions[:, 1] <= nc._north_south_distance_meters))
+    geo_positions = nc.cartesian_to_geo_array(xy_positions)
+    assert np.isnan(geo_positions[~inside]).all()
+    for xy_position, geo_position in zip(xy_positions[inside],
+                                         geo_positions[inside]):
+        assert tuple(geo_position) == nc.cartesian_to_geo(tuple(xy_position))
+
+    assert nc.geo_to_cartesian_array((30.4, -65.6)).tolist() == [[0.0, 0.0]]
+
+    #
+    # Positions which can't be converted are NaN rows, also east of
+    # 90 degrees of longitude, and the rest of the batch converts.
+    #
+    nc = NavConverter.construct_from_boundaries(30.5, 30.4, 120.1, 120.0)
+    geo_positions = nc.cartesian_to_geo_array([[0.0, 0.0],
+                                               [np.nan, 10.0],
+                                               [-1.0, 10.0],
+                                               [nc._east_west_distance_meters,
+                                                nc._north_south_distance_meters]])
+    assert geo_positions[0].tolist() == [30.4, 120.0]
+    assert np.isnan(geo_positions[1:3]).all()
+    assert geo_positions[3].tolist() == pytest.approx([30.5, 120.1], abs=1e-12)
+
+def test_latlon_to_utm():
+    """test_latlon_to_utm()
+
+    Convert the competition area corners, a southern hemisphere
+    position and the zone exceptions, and convert back.
+
+    https://www.latlong.net/lat-long-utm.html
+    """
+
+    import numpy as np
+    from searchspace.navigation import latlon_to_utm, utm_to_latlon
+
+    lat = np.array([17.886975, 17.886975, 17.877975, 17.877975])
+    lon = np.array([-66.574447, -66.565, -66.565, -66.574447])
+    easting, northing, zone, northern = latlon_to_utm(lat, lon)
+    assert easting == pytest.approx([757001.19, 758002.65, 758015.66, 757014.15],
+                                    abs=0.01)
+    assert northing == pytest.approx([1979352.50, 1979365.56, 1978369.11, 1978356.06],
+                                     abs=0.01)
+    assert zone.tolist() == [19, 19, 19, 19]
+    assert northern.all()
+
+    converted_lat, converted_lon = utm_to_latlon(easting, northing, zone, northern)
+    assert converted_lat == pytest.approx(lat, abs=1e-8)
+    assert converted_lon == pytest.approx(lon, abs=1e-8)
+
+    easting, northing, zone, northern = latlon_to_utm(-33.8688, 151.2093)
+    assert (easting, northing) == pytest.approx((334368.63, 6250948.35), abs=0.01)
+    assert zone == 56
+    assert not northern
+    assert utm_to_latlon(easting, northing, zone, northern) == pytest.approx(
+        (-33.8688, 151.2093), abs=1e-8)
+
+    assert latlon_to_utm(60.0, 5.0)[2] == 32
+    assert latlon_to_utm(78.0, 15.0)[2] == 33
+    assert latlon_to_utm(17.88, -66.57, zone=20)[0] < 500000.0
+
+def test_utm_position_from_config():
+    """test_utm_position_from_config()
+
+    Read a position from the config file as UTM or lat, lon,
+    preferring UTM.
+    """
+
+    from auv_bonus_xprize.settings import config
+    from searchspace.navigation import utm_position_from_config
+
+    config['starting']['test_corner_latlon'] = '17.886975,-66.574447'
+    position = utm_position_from_config('test_corner')
+    assert position.x == pytest.approx(757001.19, abs=0.01)
+    assert position.y == pytest.approx(1979352.50, abs=0.01)
+
+    config['starting']['test_corner_utm'] = '757000.0,1979350.0'
+    assert utm_position_from_config('test_corner').as_tuple() == (757000.0, 1979350.0)
+
+    del config['starting']['test_corner_latlon']
+    del config['starting']['test_corner_utm']
+    with pytest.raises(Exception):
+        utm_position_from_config('test_corner')
+
+def test_local_frame():
+    """test_local_frame()
+
+    Convert positions and headings to and from a rotated frame,
+    and align a frame with a polygon.
+    """
+
+    import numpy as np
+    from searchspace.geometry import Point, Polygon
+    from searchspace.navigation import LocalFrame
+
+    frame = LocalFrame(Point(1000.0, 2000.0), 90)
+    assert frame.point_to_local(Point(1010.0, 2000.0)).as_tuple() == pytest.approx((0.0, 10.0))
+    assert frame.point_to_utm(Point(0.0, 10.0)).as_tuple() == pytest.approx((1010.0, 2000.0))
+    assert frame.heading_to_local(90) == 0
+    assert frame.heading_to_utm(270) == 0
+
+    frame = LocalFrame(Point(757500.0, 1979200.0), 12.5)
+    positions = np.random.default_rng(2).uniform(-500.0, 500.0, (100, 2)) + [757500.0, 1979200.0]
+    assert frame.to_utm(frame.to_local(positions)) == pytest.approx(positions, abs=1e-6)
+
+    tilted = Polygon([Point(0.0, 0.0), Point(-10.0, 1000.0),
+                      Point(490.0, 1005.0), Point(500.0, 5.0)])
+    frame = LocalFrame.construct_from_polygon(tilted)
+    assert frame.heading == pytest.approx(359.427, abs=0.001)
+    assert frame.origin == tilted.centroid
+    local = frame.to_local([vertex.as_tuple() for vertex in tilted.vertices])
+    assert local[0, 0] == pytest.approx(local[1, 0])
+    assert local[2, 0] == pytest.approx(local[3, 0])
+
+
+def test_crab_heading():
+    """test_crab_heading()
+
+    Steer into a cross current to hold the track, one heading at
+    a time and as arrays.
+    """
+
+    from math import sqrt
+    import numpy as np
+    from searchspace.navigation import crab_heading, crab_headings
+    from searchspace.navigation import KNOTS_TO_METERS_PER_SECOND
+
+    drift = 1.0 / KNOTS_TO_METERS_PER_SECOND
+    assert crab_heading(0, 2.0, 270, drift) == pytest.approx((30.0, sqrt(3.0)))
+    assert crab_heading(180, 2.0, 270, drift) == pytest.approx((150.0, sqrt(3.0)))
+    assert crab_heading(90, 2.0, 270, drift) == pytest.approx((90.0, 1.0))
+    assert crab_heading(45, 2.0, 0, 0.0) == pytest.approx((45.0, 2.0))
+
+    headings, ground_speeds = crab_headings([0, 90, 180, 270], 2.0, 270, drift)
+    assert headings == pytest.approx([30.0, 90.0, 150.0, 270.0])
+    assert ground_speeds == pytest.approx([sqrt(3.0), 1.0, sqrt(3.0), 3.0])
+
+    with pytest.raises(Exception):
+        crab_heading(0, 0.9, 270, drift)
+    with pytest.raises(Exception):
+        crab_headings(np.array([90.0]), 0.9, 270, drift)
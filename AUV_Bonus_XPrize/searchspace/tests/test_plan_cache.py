@@ -0,0 +1,155 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""PlanCache
+
+Tests for keeping the search paths already planned
+"""
+import pytest
+
+SEARCH_PATH = [(250.0, 1002.6, 30.0, 0, 352.5),
+               (250.0, 2.5, 30.0, 180, 187.5),
+               (250.0, 2.5, 35.0, None, None),
+               (250.0, 1002.6, 35.0, 0, 352.5)]
+
+
+def test_plan_key(monkeypatch):
+    """test_plan_key
+
+    Equal inputs have the same key, in any order, and different
+    inputs, or another version of the planners, don't.
+    """
+
+    from searchspace import plan_cache
+    from searchspace.plan_cache import plan_key
+
+    key = plan_key({'set': 270, 'search': {'min_depth_meters': '30.0',
+                                           'max_depth_meters': '40.0'}})
+    assert key == plan_key({'search': {'max_depth_meters': '40.0',
+                                       'min_depth_meters': '30.0'}, 'set': 270})
+    assert key != plan_key({'set': 90, 'search': {'min_depth_meters': '30.0',
+                                                  'max_depth_meters': '40.0'}})
+
+    monkeypatch.setattr(plan_cache, 'PLAN_CACHE_VERSION', plan_cache.PLAN_CACHE_VERSION + 1)
+    assert key != plan_key({'set': 270, 'search': {'min_depth_meters': '30.0',
+                                                   'max_depth_meters': '40.0'}})
+
+
+def test_least_recently_used():
+    """test_least_recently_used
+
+    Without a directory, only the most recently used plans
+    are kept.
+    """
+
+    from searchspace.plan_cache import PlanCache
+
+    plan_cache = PlanCache(size=2)
+    plan_cache.put('a', SEARCH_PATH)
+    plan_cache.put('b', SEARCH_PATH[:2])
+    assert plan_cache.get('a') == SEARCH_PATH
+    plan_cache.put('c', SEARCH_PATH[:1])
+
+    assert len(plan_cache) == 2
+    assert plan_cache.get('b') is None
+    assert plan_cache.get('a') == SEARCH_PATH
+    assert plan_cache.get('c') == SEARCH_PATH[:1]
+
+    with pytest.raises(Exception):
+        PlanCache(size=0)
+
+
+def test_directory(tmp_path):
+    """test_directory
+
+    A plan saved in the directory is found by another PlanCache,
+    with its None headings.
+    """
+
+    from searchspace.plan_cache import PlanCache
+
+    PlanCache(str(tmp_path)).put('a', SEARCH_PATH)
+    assert (tmp_path / 'a.npy').exists()
+    assert not list(tmp_path.glob('*.tmp'))
+
+    plan_cache = PlanCache(str(tmp_path))
+    assert plan_cache.get('a') == SEARCH_PATH
+    assert plan_cache.get('b') is None
+
+
+def test_calculate_search_path(monkeypatch, tmp_path):
+    """test_calculate_search_path
+
+    The search path is planned once for the same inputs, across
+    SearchSpaces sharing a plan_cache_dir, and again when they
+    change.
+    """
+
+    from searchspace import plan_cache
+    from searchspace.searchspace import SearchSpace
+    from searchspace.geometry import Point, Polygon
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'auv_position_utm', '250.0,500.0')
+    monkeypatch.setitem(config['starting'], 'set', '270')
+    monkeypatch.setitem(config['starting'], 'drift', '0.0')
+    monkeypatch.setitem(config['search'], 'min_depth_meters', '30.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '35.0')
+    monkeypatch.setitem(config['search'], 'track_separation_meters', '5.0')
+    monkeypatch.setitem(config['search'], 'plan_cache_dir', str(tmp_path))
+
+    boundary_polygon = Polygon([Point(0.0, 0.0), Point(0.0, 1000.0),
+                                Point(500.0, 1000.0), Point(500.0, 0.0)])
+    planned = list()
+
+    def _search_space():
+        search_space = SearchSpace()
+        monkeypatch.setattr(search_space, '_boundary_polygon', boundary_polygon)
+        plan = search_space._plan
+
+        def _counted_plan():
+            planned.append(True)
+            return plan()
+
+        monkeypatch.setattr(search_space, '_plan', _counted_plan)
+        return search_space
+
+    search_space = _search_space()
+    search_path = search_space.calculate_search_path()
+    assert search_space.calculate_search_path() == search_path
+    assert _search_space().calculate_search_path() == search_path
+    assert len(planned) == 1
+
+
+    #
+    # The inputs aren't read again until the configuration changes.
+    #
+    def _unexpected_inputs():
+        raise AssertionError('The plan inputs were read again')
+
+    plan_inputs = search_space._plan_inputs
+    monkeypatch.setattr(search_space, '_plan_inputs', _unexpected_inputs)
+    assert search_space.calculate_search_path() == search_path
+    monkeypatch.setattr(search_space, '_plan_inputs', plan_inputs)
+
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '40.0')
+    assert len(search_space.calculate_search_path()) > len(search_path)
+    assert len(planned) == 2
+
+    #
+    # Plans saved by another version of the planners aren't used.
+    #
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '35.0')
+    monkeypatch.setattr(plan_cache, 'PLAN_CACHE_VERSION', plan_cache.PLAN_CACHE_VERSION + 1)
+    assert _search_space().calculate_search_path() == search_path
+    assert len(planned) == 3
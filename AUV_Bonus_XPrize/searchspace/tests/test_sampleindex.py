@@ -0,0 +1,104 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""SampleIndex
+
+Tests for the SampleIndex class
+"""
+import pytest
+
+
+def test_sample_index_queries(monkeypatch):
+    """test_sample_index_queries
+
+    Answer the same as a brute force search, with samples both
+    merged and pending.
+    """
+
+    import numpy as np
+    from searchspace import sampleindex
+    from searchspace.sampleindex import SampleIndex
+
+    monkeypatch.setattr(sampleindex, 'PENDING_SAMPLES', 64)
+
+    rng = np.random.default_rng(4)
+    samples = rng.uniform([757000.0, 1978300.0, 0.0],
+                          [757200.0, 1978500.0, 45.0], (1000, 3))
+    queries = rng.uniform([756990.0, 1978290.0, 0.0],
+                          [757210.0, 1978510.0, 45.0], (300, 3))
+
+    index = SampleIndex(5.0)
+    assert index.nearest(757000.0, 1978300.0, 10.0, 5.0) is None
+    assert index.count_within(757000.0, 1978300.0, 10.0, 5.0) == 0
+
+    for x, y, depth in samples[:900].tolist():
+        index.add(x, y, depth)
+    index.add_positions(samples[900:990])
+    for x, y, depth in samples[990:].tolist():
+        index.add(x, y, depth)
+    assert len(index) == 1000
+    assert index._pending_count
+
+    distances = np.linalg.norm(queries[:, np.newaxis, :] - samples[np.newaxis, :, :],
+                               axis=2)
+    for query, query_distances in zip(queries.tolist(), distances):
+        assert index.count_within(*query, 8.0) == np.count_nonzero(query_distances <= 8.0)
+        nearest = index.nearest(*query, 6.0)
+        if query_distances.min() > 6.0:
+            assert nearest is None
+        else:
+            assert nearest == pytest.approx(query_distances.min())
+
+    #
+    # A radius of many cells gives the same answers.
+    #
+    assert index.count_within(*queries[0].tolist(), 60.0) == np.count_nonzero(distances[0] <= 60.0)
+    far = np.array([[757500.0, 1978800.0, 20.0]])
+    assert index.nearest(*far[0].tolist(), 1000.0) == pytest.approx(
+        np.linalg.norm(samples - far, axis=1).min())
+    assert index.nearest(*far[0].tolist(), 100.0) is None
+
+    near = distances.min(axis=1) <= 4.0
+    assert index.sampled_near(queries, 4.0).tolist() == near.tolist()
+    assert index.coverage_gaps(queries, 4.0).tolist() == np.flatnonzero(~near).tolist()
+
+
+def test_unsampled_positions(monkeypatch):
+    """test_unsampled_positions
+
+    The part of a search path already flown is sampled.
+    """
+
+    from searchspace.searchspace import SearchSpace
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'northwest_utm', '0.0,100.0')
+    monkeypatch.setitem(config['starting'], 'northeast_utm', '100.0,100.0')
+    monkeypatch.setitem(config['starting'], 'southeast_utm', '100.0,0.0')
+    monkeypatch.setitem(config['starting'], 'southwest_utm', '0.0,0.0')
+    monkeypatch.setitem(config['search'], 'boundary_buffer_meters', '10.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '45.0')
+    monkeypatch.setitem(config['search'], 'sample_radius_meters', '5.0')
+
+    search_space = SearchSpace()
+    search_space.set_search_boundaries()
+
+    search_path = [(50.0, 10.0, 30.0, 180), (50.0, 90.0, 30.0, 0)]
+    assert len(search_space.unsampled_positions(search_path)) == 17
+
+    for y in range(10, 51):
+        search_space.record_auv_path(50.0, float(y), 30.0, 0, 1, 0.0)
+
+    unsampled = search_space.unsampled_positions(search_path)
+    assert len(unsampled) == 7
+    assert unsampled[:, 1].min() == 60.0
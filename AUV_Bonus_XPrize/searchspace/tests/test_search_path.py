@@ -60,13 +60,25 @@ def waypoint_list():
     return search_path
 
 
-def test_record_auv_path():
+def test_record_auv_path(monkeypatch):
     """test_record_auv_path
 
     Does the function update the search space.
     """
 
+    import pytest
     from searchspace.searchspace import SearchSpace
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'northwest_utm', '0.0,100.0')
+    monkeypatch.setitem(config['starting'], 'northeast_utm', '100.0,100.0')
+    monkeypatch.setitem(config['starting'], 'southeast_utm', '100.0,0.0')
+    monkeypatch.setitem(config['starting'], 'southwest_utm', '0.0,0.0')
+    monkeypatch.setitem(config['search'], 'boundary_buffer_meters', '10.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '45.0')
+    monkeypatch.setitem(config['search'], 'voxel_cell_meters', '5.0')
+    monkeypatch.setitem(config['search'], 'voxel_layer_meters', '5.0')
+
     search_space = SearchSpace()
 
     path_x = 13.1
@@ -75,17 +87,28 @@ def test_record_auv_path():
     sensor_value = 4
     sensor_gain = 10
 
-    assert not search_space._cubes
+    with pytest.raises(Exception):
+        search_space.record_auv_path(path_x, path_y, path_depth,
+                                     sensor_value, sensor_gain)
 
-    search_space.record_auv_path(
+    search_space.set_search_boundaries()
+    assert search_space._voxels.shape == (10, 20, 20)
+    assert not search_space._voxels.count.any()
+
+    assert search_space.record_auv_path(
         path_x,
         path_y,
         path_depth,
         sensor_value,
-        sensor_gain)
+        sensor_gain,
+        100.0)
+    assert not search_space.record_auv_path(150.0, path_y, path_depth,
+                                            sensor_value, sensor_gain)
 
-    assert len(search_space._cubes) == 1
-    assert (path_x, path_y, path_depth) in search_space._cubes
+    assert search_space._voxels.count.sum() == 1
+    assert search_space._voxels.count[2, 2, 2] == 1
+    assert search_space._voxels.last_time[2, 2, 2] == 100.0
+    assert search_space._voxels.gain[2, 2, 2] == sensor_gain
 
 
 def test_set_search_boundaries():
@@ -113,3 +136,311 @@ def test_set_search_boundaries():
 
     assert search_space._perimeter_length > 0
     assert search_space._perimeter_length == 3920
+
+
+def test_densify_search_path():
+    """test_densify_search_path
+
+    Interpolate evenly spaced samples along each leg of a
+    search path, including the legs which only change depth.
+    """
+
+    import numpy as np
+    from searchspace.searchspace import densify_search_path
+    from searchspace.geometry import Point, Line
+
+    search_path = [(0.0, 0.0, 5.0, 90),
+                   (100.0, 0.0, 5.0, 90),
+                   (100.0, 0.0, 6.0, None),
+                   (40.0, 80.0, 8.0, 323)]
+
+    samples = densify_search_path(search_path, 30.0)
+
+    assert samples.shape == (10, 4)
+    assert samples[:4, 0].tolist() == [0.0, 25.0, 50.0, 75.0]
+    assert (samples[:4, 2] == 5.0).all()
+    assert (samples[:4, 3] == 90).all()
+    assert samples[4, :3].tolist() == [100.0, 0.0, 5.0]
+    assert np.isnan(samples[4, 3])
+    assert samples[-1].tolist() == [40.0, 80.0, 8.0, 323.0]
+    assert samples[5:9, 2].tolist() == [6.0, 6.5, 7.0, 7.5]
+
+    #
+    # The diagonal leg is 100 long, split into 4 steps of 25.
+    #
+    line = Line.construct_from_two_points(Point(100.0, 0.0), Point(40.0, 80.0))
+    for step, (x, y) in enumerate(samples[5:9, :2]):
+        expected = line.point_at_distance(Point(100.0, 0.0),
+                                          Point(40.0, 80.0),
+                                          step * 25.0)
+        assert abs(x - expected.x) < 1e-9
+        assert abs(y - expected.y) < 1e-9
+
+    assert densify_search_path(search_path[:1], 30.0).tolist() == [[0.0, 0.0, 5.0, 90.0]]
+
+
+def test_set_search_boundaries_latlon(monkeypatch):
+    """test_set_search_boundaries_latlon
+
+    Set the boundaries of the search space from lat, lon
+    corners.
+    """
+
+    from searchspace.searchspace import SearchSpace
+    from auv_bonus_xprize.settings import config
+
+    corners = {'northwest': '17.886975,-66.574447',
+               'northeast': '17.886975,-66.565',
+               'southeast': '17.877975,-66.565',
+               'southwest': '17.877975,-66.574447'}
+    for corner, latlon in corners.items():
+        monkeypatch.delitem(config['starting'], corner + '_utm', raising=False)
+        monkeypatch.setitem(config['starting'], corner + '_latlon', latlon)
+    monkeypatch.setitem(config['search'], 'boundary_buffer_meters', '0.0')
+
+    search_space = SearchSpace()
+    search_space.set_search_boundaries()
+
+    assert search_space._boundary_polygon._vertices == [[757001, 1979353],
+                                                        [758003, 1979366],
+                                                        [758016, 1978369],
+                                                        [757014, 1978356]]
+
+
+def test_planning_frame(monkeypatch):
+    """test_planning_frame
+
+    Plan the search path in a frame aligned with a tilted
+    search area, with the current, and in UTM.
+    """
+
+    import pytest
+    from searchspace.searchspace import SearchSpace
+    from searchspace.geometry import Point, Polygon, points_distance
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'auv_position_utm', '250.0,500.0')
+    monkeypatch.setitem(config['starting'], 'set', '270')
+    monkeypatch.setitem(config['starting'], 'drift', '0.0')
+    monkeypatch.setitem(config['search'], 'min_depth_meters', '30.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '35.0')
+    monkeypatch.setitem(config['search'], 'track_separation_meters', '5.0')
+
+    search_space = SearchSpace()
+    monkeypatch.setattr(search_space,
+                        '_boundary_polygon',
+                        Polygon([Point(0.0, 0.0), Point(-10.0, 1000.0),
+                                 Point(490.0, 1005.0), Point(500.0, 5.0)]))
+
+    monkeypatch.setitem(config['search'], 'planning_frame', 'utm')
+    utm_path = search_space.calculate_search_path()
+    assert [waypt[3] for waypt in utm_path] == [0, 180, None, 0]
+
+    monkeypatch.setitem(config['search'], 'planning_frame', 'current')
+    current_path = search_space.calculate_search_path()
+    for utm_waypt, current_waypt in zip(utm_path, current_path):
+        assert current_waypt[:3] == pytest.approx(utm_waypt[:3])
+
+    #
+    # Aligned with the tilted western and eastern edges, the tracks
+    # run parallel to them and end square on the other edges.
+    #
+    monkeypatch.setitem(config['search'], 'planning_frame', 'polygon')
+    polygon_path = search_space.calculate_search_path()
+    assert polygon_path[0][3] == pytest.approx(359.427, abs=0.001)
+    assert polygon_path[1][3] == pytest.approx(179.427, abs=0.001)
+    track_length = points_distance(Point(*polygon_path[0][:2]),
+                                   Point(*polygon_path[1][:2]))
+    assert track_length == pytest.approx(points_distance(Point(0.0, 0.0),
+                                                         Point(-10.0, 1000.0)))
+
+    monkeypatch.setitem(config['search'], 'planning_frame', 'sideways')
+    with pytest.raises(Exception):
+        search_space.calculate_search_path()
+
+
+def test_fit_search_path_to_seafloor(monkeypatch):
+    """test_fit_search_path_to_seafloor
+
+    Climb over a shoal crossing the search area and cut short the
+    deeper tracks over a shallow northern shelf.
+    """
+
+    import numpy as np
+    import pytest
+    from searchspace.searchspace import SearchSpace
+    from searchspace.geometry import Point, Polygon
+    from searchspace.bathymetry import Bathymetry
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'auv_position_utm', '500.0,500.0')
+    monkeypatch.setitem(config['starting'], 'set', '270')
+    monkeypatch.setitem(config['starting'], 'drift', '0.0')
+    monkeypatch.setitem(config['search'], 'min_depth_meters', '30.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '40.0')
+    monkeypatch.setitem(config['search'], 'track_separation_meters', '5.0')
+    monkeypatch.setitem(config['auv'], 'min_altitude_meters', '5.0')
+
+    search_space = SearchSpace()
+    monkeypatch.setattr(search_space,
+                        '_boundary_polygon',
+                        Polygon([Point(0.0, 0.0), Point(0.0, 1000.0),
+                                 Point(1000.0, 1000.0), Point(1000.0, 0.0)]))
+
+    depths = np.full((101, 101), 50.0)
+    depths[91:, :] = 38.0
+    depths[40:46, :] = 20.0
+    monkeypatch.setattr(search_space,
+                        '_bathymetry',
+                        Bathymetry(depths, 0.0, 0.0, 10.0))
+
+    monkeypatch.setitem(config['search'], 'follow_seafloor', 'true')
+    assert search_space.calculate_search_path() == [
+        (500.0, 1000.0, 30.0, 0),
+        (500.0, 470.0, 30.0, 180),
+        (500.0, 460.0, 15.0, 180),
+        (500.0, 390.0, 15.0, 180),
+        (500.0, 0.0, 30.0, 180),
+        (500.0, 0.0, 35.0, None),
+        (500.0, 380.0, 35.0, 0),
+        (500.0, 390.0, 15.0, 0),
+        (500.0, 460.0, 15.0, 0),
+        (500.0, 900.0, 35.0, 0),
+        (500.0, 900.0, 40.0, None),
+        (500.0, 470.0, 40.0, 180),
+        (500.0, 460.0, 15.0, 180),
+        (500.0, 390.0, 15.0, 180),
+        (500.0, 0.0, 40.0, 180)]
+
+    monkeypatch.setattr(search_space, '_bathymetry', None)
+    monkeypatch.delitem(config, 'bathymetry', raising=False)
+    with pytest.raises(Exception):
+        search_space.calculate_search_path()
+
+
+def test_estimated_current(monkeypatch):
+    """test_estimated_current
+
+    The estimated current replaces the configured one only
+    when enabled and confident enough.
+    """
+
+    from searchspace.searchspace import SearchSpace
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'set', '270')
+    monkeypatch.setitem(config['starting'], 'drift', '0.0')
+    monkeypatch.setitem(config['search'], 'min_current_confidence', '0.8')
+
+    search_space = SearchSpace()
+    search_space.set_estimated_current(185, 0.75, 0.9)
+
+    monkeypatch.setitem(config['search'], 'estimate_current', 'false')
+    search_space.set_current_velocity()
+    assert (search_space._current_set, search_space._current_drift) == (270, 0.0)
+
+    monkeypatch.setitem(config['search'], 'estimate_current', 'true')
+    search_space.set_current_velocity()
+    assert (search_space._current_set, search_space._current_drift) == (185, 0.75)
+
+    search_space.set_estimated_current(185, 0.75, 0.5)
+    search_space.set_current_velocity()
+    assert (search_space._current_set, search_space._current_drift) == (270, 0.0)
+
+
+def test_boustrophedon_search_pattern(monkeypatch):
+    """test_boustrophedon_search_pattern
+
+    The boustrophedon pattern sweeps the whole area across the
+    current at the minimum depth.
+    """
+
+    import pytest
+    from searchspace.searchspace import SearchSpace
+    from searchspace.geometry import Point, Polygon
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'auv_position_utm', '-20.0,-20.0')
+    monkeypatch.setitem(config['starting'], 'set', '270')
+    monkeypatch.setitem(config['starting'], 'drift', '0.0')
+    monkeypatch.setitem(config['search'], 'min_depth_meters', '30.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '40.0')
+    monkeypatch.setitem(config['search'], 'track_separation_meters', '20.0')
+    monkeypatch.setitem(config['search'], 'search_pattern', 'boustrophedon')
+
+    search_space = SearchSpace()
+    monkeypatch.setattr(search_space,
+                        '_boundary_polygon',
+                        Polygon([Point(0.0, 0.0), Point(0.0, 100.0),
+                                 Point(100.0, 100.0), Point(100.0, 0.0)]))
+
+    search_path = search_space.calculate_search_path()
+    assert len(search_path) == 10
+    assert search_path[0][:2] == pytest.approx((10.0, 0.0))
+    assert search_path[1][:2] == pytest.approx((10.0, 100.0))
+    assert [waypt[3] for waypt in search_path[1::2]] == [0.0, 180.0, 0.0, 180.0, 0.0]
+    assert all(waypt[2] == 30.0 for waypt in search_path)
+
+    monkeypatch.setitem(config['search'], 'search_pattern', 'spiral')
+    with pytest.raises(Exception):
+        search_space.calculate_search_path()
+
+
+def test_iter_search_path(monkeypatch):
+    """test_iter_search_path
+
+    The generated search path is the calculated one, and a new
+    depth band or starting position sent to the generator
+    replans from the next waypoint.
+    """
+
+    import pytest
+    from searchspace.searchspace import SearchSpace
+    from searchspace.geometry import Point, Polygon
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'auv_position_utm', '250.0,500.0')
+    monkeypatch.setitem(config['starting'], 'set', '270')
+    monkeypatch.setitem(config['starting'], 'drift', '0.5')
+    monkeypatch.setitem(config['search'], 'min_depth_meters', '30.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '40.0')
+    monkeypatch.setitem(config['search'], 'track_separation_meters', '5.0')
+    monkeypatch.setitem(config['auv'], 'max_speed', '1.5')
+
+    search_space = SearchSpace()
+    monkeypatch.setattr(search_space,
+                        '_boundary_polygon',
+                        Polygon([Point(0.0, 0.0), Point(-10.0, 1000.0),
+                                 Point(490.0, 1005.0), Point(500.0, 5.0)]))
+
+    for planning_frame in ['utm', 'polygon']:
+        for drift_compensation in ['false', 'true']:
+            monkeypatch.setitem(config['search'], 'planning_frame', planning_frame)
+            monkeypatch.setitem(config['search'], 'drift_compensation', drift_compensation)
+            search_path = search_space.calculate_search_path()
+            streamed_path = list(search_space.iter_search_path())
+            assert len(streamed_path) == len(search_path)
+            for streamed_waypt, waypt in zip(streamed_path, search_path):
+                assert streamed_waypt[:3] == pytest.approx(waypt[:3])
+                for streamed_heading, heading in zip(streamed_waypt[3:], waypt[3:]):
+                    assert streamed_heading == pytest.approx(heading)
+
+    monkeypatch.setitem(config['search'], 'planning_frame', 'utm')
+    monkeypatch.setitem(config['search'], 'drift_compensation', 'false')
+
+    generator = search_space.iter_search_path()
+    assert next(generator) == (250.0, pytest.approx(1002.6), 30.0, 0)
+    assert next(generator) == (250.0, pytest.approx(2.5), 30.0, 180)
+    assert generator.send({'min_depth': 45.0, 'max_depth': 50.0}) == (
+        250.0, pytest.approx(2.5), 45.0, None)
+    assert [waypt[2:] for waypt in generator] == [(45.0, 0), (50.0, None), (50.0, 180)]
+
+    generator = search_space.iter_search_path()
+    next(generator)
+    assert generator.send({'starting_waypt': Point(100.0, 500.0)}) == (
+        100.0, pytest.approx(1001.1), 30.0, 0)
+    assert next(generator) == (100.0, pytest.approx(1.0), 30.0, 180)
+
+    monkeypatch.setitem(config['search'], 'follow_seafloor', 'true')
+    with pytest.raises(Exception):
+        next(search_space.iter_search_path())
@@ -0,0 +1,74 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""Simulation
+
+Tests for simulating the AUV following a search path
+"""
+import pytest
+
+
+def test_drift_compensation(monkeypatch):
+    """test_drift_compensation
+
+    In a one knot current across the tracks, the AUV steering only
+    for the waypoints is carried off the tracks and takes longer
+    than when it crabs against the current.
+    """
+
+    from searchspace.searchspace import SearchSpace
+    from searchspace.geometry import Point, Polygon
+    from searchspace.navigation import KNOTS_TO_METERS_PER_SECOND
+    from searchspace.simulation import simulate_search_path
+    from auv_bonus_xprize.settings import config
+
+    monkeypatch.setitem(config['starting'], 'auv_position_utm', '500.0,500.0')
+    monkeypatch.setitem(config['starting'], 'set', '270')
+    monkeypatch.setitem(config['starting'], 'drift', '1.0')
+    monkeypatch.setitem(config['search'], 'min_depth_meters', '30.0')
+    monkeypatch.setitem(config['search'], 'max_depth_meters', '40.0')
+    monkeypatch.setitem(config['search'], 'track_separation_meters', '5.0')
+    monkeypatch.setitem(config['auv'], 'max_speed', '2.0')
+
+    search_space = SearchSpace()
+    monkeypatch.setattr(search_space,
+                        '_boundary_polygon',
+                        Polygon([Point(0.0, 0.0), Point(0.0, 1000.0),
+                                 Point(1000.0, 1000.0), Point(1000.0, 0.0)]))
+
+    monkeypatch.setitem(config['search'], 'drift_compensation', 'false')
+    search_path = search_space.calculate_search_path()
+
+    monkeypatch.setitem(config['search'], 'drift_compensation', 'true')
+    compensated_path = search_space.calculate_search_path()
+    assert [waypt[:4] for waypt in compensated_path] == search_path
+    assert [waypt[4] for waypt in compensated_path] == pytest.approx(
+        [14.905, 165.095, None, 14.905, None, 165.095], abs=0.001)
+
+    planned, achieved, off_track = simulate_search_path(search_path,
+                                                        Point(500.0, 500.0),
+                                                        2.0, 270, 1.0)
+    assert planned == pytest.approx(1750.0)
+    assert achieved > 1850.0
+    assert off_track > 90.0
+
+    planned, compensated, off_track = simulate_search_path(compensated_path,
+                                                           Point(500.0, 500.0),
+                                                           2.0, 270, 1.0)
+    #
+    # Each of the three tracks is done 4 meters short of its end.
+    #
+    ground_speed = (4.0 - KNOTS_TO_METERS_PER_SECOND ** 2) ** 0.5
+    assert compensated == pytest.approx((3500.0 - 3 * 4.0) / ground_speed, abs=2.0)
+    assert compensated < achieved
+    assert off_track == pytest.approx(0.0, abs=0.01)
@@ -0,0 +1,66 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""VoxelGrid
+
+Tests for the VoxelGrid class
+"""
+import pytest
+
+
+def test_voxel_statistics():
+    """test_voxel_statistics
+
+    Keep running statistics per cell and read them back by
+    layer, by track and as coverage.
+    """
+
+    import numpy as np
+    from searchspace.voxelgrid import VoxelGrid
+    from searchspace.geometry import Point, Polygon
+
+    triangle = Polygon([Point(0.0, 0.0), Point(0.0, 100.0), Point(100.0, 0.0)])
+    voxels = VoxelGrid.construct_from_polygon(triangle, 50.0, 10.0, 5.0)
+    assert voxels.shape == (10, 10, 10)
+    assert np.count_nonzero(voxels._inside) == 55
+
+    for value, timestamp in ((2.0, 1.0), (6.0, 2.0), (4.0, 3.0)):
+        assert voxels.record(15.0, 25.0, 32.0, value, timestamp)
+    assert not voxels.record(15.0, 25.0, 51.0, 1.0, 4.0)
+    assert not voxels.record(-1.0, 25.0, 32.0, 1.0, 4.0)
+
+    count, mean, maximum, last_time = voxels.layer_statistics(31.0)
+    assert count[2, 1] == 3
+    assert mean[2, 1] == pytest.approx(4.0)
+    assert maximum[2, 1] == 6.0
+    assert last_time[2, 1] == 3.0
+    assert count.sum() == 3
+
+    rows, columns = voxels.cells_along(Point(5.0, 5.0), Point(5.0, 45.0))
+    assert rows.tolist() == [0, 1, 2, 3, 4]
+    assert columns.tolist() == [0, 0, 0, 0, 0]
+    rows, columns = voxels.cells_along(Point(-20.0, 25.0), Point(35.0, 25.0))
+    assert rows.tolist() == [2, 2, 2, 2]
+    assert columns.tolist() == [0, 1, 2, 3]
+
+    count, mean, maximum, last_time = voxels.track_statistics(Point(-20.0, 25.0),
+                                                              Point(35.0, 25.0),
+                                                              30.0)
+    assert count.tolist() == [0, 3, 0, 0]
+
+    coverage = voxels.coverage()
+    assert coverage[6] == pytest.approx(1.0 / 55.0)
+    assert coverage.sum() == pytest.approx(1.0 / 55.0)
+
+    with pytest.raises(Exception):
+        voxels.layer_statistics(60.0)
@@ -89,7 +89,7 @@ def test_next_track_heading_and_waypt(monkeypatch):
 
     from searchspace.searchspace import SearchSpace
     from auv_bonus_xprize.settings import config
-    from searchspace.geometry import Point, Line, Polygon
+    from searchspace.geometry import Point, Polygon
 
     config['starting']['auv_position_utm'] = '80,150'
     config['starting']['northwest_utm'] = '10,300'
@@ -105,28 +105,6 @@ def test_next_track_heading_and_waypt(monkeypatch):
                                  Point(100, 100),
                                  Point(10, 100)]))
 
-    monkeypatch.setattr(s,
-                        '_northern_boundary',
-                        Line.construct_from_two_points(
-                            Point(10, 300),
-                            Point(100, 300)))
-
-    monkeypatch.setattr(s,
-                        '_eastern_boundary',
-                        Line.construct_from_two_points(
-                            Point(100, 300),
-                            Point(100, 100)))
-    monkeypatch.setattr(s,
-                        '_southern_boundary',
-                        Line.construct_from_two_points(
-                            Point(100, 100),
-                            Point(10, 100)))
-    monkeypatch.setattr(s,
-                        '_western_boundary',
-                        Line.construct_from_two_points(
-                            Point(10, 100),
-                            Point(10, 300)))
-
     monkeypatch.setattr(s, '_current_set', 90)
 
     heading, waypt = s._next_track_heading_and_waypt(Point(80, 150))
@@ -153,6 +131,51 @@ def test_next_track_heading_and_waypt(monkeypatch):
     assert waypt.x == 10 and waypt.y == 175
     assert heading == 315
 
+
+def test_next_track_irregular_area(monkeypatch):
+    """test_next_track_irregular_area
+
+    The track planner works with search areas which aren't
+    four-sided boxes.
+    """
+
+    from searchspace.searchspace import SearchSpace
+    from searchspace.geometry import Point, Polygon
+
+    s = SearchSpace()
+    #
+    # An L-shaped area, with the notch in the northeast.
+    #
+    monkeypatch.setattr(s,
+                        '_boundary_polygon',
+                        Polygon([Point(0, 0),
+                                 Point(0, 200),
+                                 Point(100, 200),
+                                 Point(100, 100),
+                                 Point(300, 100),
+                                 Point(300, 0)]))
+
+    monkeypatch.setattr(s, '_current_set', 0)
+    heading, waypt = s._next_track_heading_and_waypt(Point(30, 150))
+    assert heading == 90
+    assert waypt == Point(100, 150)
+
+    heading, waypt = s._next_track_heading_and_waypt(waypt)
+    assert heading == 270
+    assert waypt == Point(0, 150)
+
+    heading, waypt = s._next_track_heading_and_waypt(Point(50, 50))
+    assert heading == 90
+    assert waypt == Point(300, 50)
+
+    monkeypatch.setattr(s, '_current_set', 90)
+    heading, waypt = s._next_track_heading_and_waypt(Point(200, 20))
+    assert heading == 0
+    assert waypt == Point(200, 100)
+
+    with pytest.raises(Exception):
+        s._next_track_heading_and_waypt(Point(200, 150))
+
 def test_next_track_depth():
     """test_next_track_depth
 
@@ -0,0 +1,218 @@
+#
+# Designed and written by:
+# Bill Mania
+# bill@manialabs.us
+#
+# under contract to:
+# Valley Christian Schools
+# San Jose, CA
+#
+# to compete in the:
+# NOAA Bonus XPrize
+# January 2019
+#
+"""VoxelGrid
+
+Running statistics of the sensor samples taken by the AUV, in a
+fixed grid of cells over the search area and its depths.
+"""
+
+from math import ceil
+import numpy as np
+from searchspace.geometry import PointArray
+
+
+class VoxelGrid(object):
+    """VoxelGrid
+
+    A grid of layers, rows and columns of cells, cell_size meters
+    square and layer_thickness meters deep, starting at UTM min_x,
+    min_y and at the surface. Each cell keeps the count, mean and
+    maximum of the sensor values sampled in it, and the time and the
+    sensor gain of the last sample, so the memory used is fixed by
+    the size of the grid however long the mission. Samples outside
+    the grid are ignored.
+
+    The statistics are arrays indexed [layer, row, column], with
+    row 0 at the southern edge.
+    """
+
+    def __init__(self, min_x, min_y, max_x, max_y, max_depth,
+                 cell_size, layer_thickness):
+        """__init__()
+        """
+
+        if cell_size <= 0.0 or layer_thickness <= 0.0:
+            raise Exception('The cell size and layer thickness must be greater than zero')
+
+        self._min_x = float(min_x)
+        self._min_y = float(min_y)
+        self._cell_size = float(cell_size)
+        self._layer_thickness = float(layer_thickness)
+        self._columns = max(1, ceil((max_x - min_x) / cell_size))
+        self._rows = max(1, ceil((max_y - min_y) / cell_size))
+        self._layers = max(1, ceil(max_depth / layer_thickness))
+
+        shape = (self._layers, self._rows, self._columns)
+        self.count = np.zeros(shape, dtype=np.int32)
+        self.mean = np.zeros(shape, dtype=np.float32)
+        self.maximum = np.full(shape, -np.inf, dtype=np.float32)
+        self.last_time = np.full(shape, np.nan)
+        self.gain = np.full(shape, np.nan, dtype=np.float32)
+
+        self._inside = np.ones(shape[1:], dtype=bool)
+
+    @classmethod
+    def construct_from_polygon(cls, polygon, max_depth, cell_size, layer_thickness):
+        """construct_from_polygon()
+
+        Create the VoxelGrid covering the bounding box of the
+        polygon, down to max_depth, and note which columns of cells
+        have their centers inside the polygon.
+        """
+
+        vertices = np.array([vertex.as_tuple() for vertex in polygon.vertices])
+        min_x, min_y = vertices.min(axis=0).tolist()
+        max_x, max_y = vertices.max(axis=0).tolist()
+
+        voxels = cls(min_x, min_y, max_x, max_y, max_depth, cell_size, layer_thickness)
+
+        x, y = np.meshgrid(voxels._min_x + (np.arange(voxels._columns) + 0.5) * cell_size,
+                           voxels._min_y + (np.arange(voxels._rows) + 0.5) * cell_size)
+        centers = PointArray(np.column_stack((x.ravel(), y.ravel())))
+        voxels._inside = polygon.points_are_inside(centers).reshape(x.shape)
+
+        return voxels
+
+    @property
+    def shape(self):
+        """shape
+
+        The number of layers, rows and columns.
+        """
+
+        return self._layers, self._rows, self._columns
+
+    def index_of(self, x, y, depth):
+        """index_of()
+
+        Return the layer, row and column of the cell containing
+        UTM x, y at depth, or None if it's outside the grid.
+        """
+
+        layer = int(depth // self._layer_thickness)
+        row = int((y - self._min_y) // self._cell_size)
+        column = int((x - self._min_x) // self._cell_size)
+        if (0 <= layer < self._layers and
+                0 <= row < self._rows and
+                0 <= column < self._columns):
+            return layer, row, column
+
+        return None
+
+    def record(self, x, y, depth, value, timestamp, gain=np.nan):
+        """record()
+
+        Add the sensor value sampled at UTM x, y and depth at
+        timestamp, read at gain, to the statistics of its cell.
+        Return False if the sample is outside the grid.
+        """
+
+        cell = self.index_of(x, y, depth)
+        if cell is None:
+            return False
+
+        count = int(self.count[cell]) + 1
+        self.count[cell] = count
+        self.mean[cell] += (value - self.mean[cell]) / count
+        if value > self.maximum[cell]:
+            self.maximum[cell] = value
+        self.last_time[cell] = timestamp
+        self.gain[cell] = gain
+
+        return True
+
+    def layer_of(self, depth):
+        """layer_of()
+
+        Return the layer containing depth.
+        """
+
+        layer = int(depth // self._layer_thickness)
+        if not 0 <= layer < self._layers:
+            raise Exception('Depth {0} is outside the grid'.format(depth))
+
+        return layer
+
+    def layer_statistics(self, depth):
+        """layer_statistics()
+
+        Return the count, mean, maximum and last_time arrays,
+        indexed [row, column], of the layer containing depth. The
+        arrays are views of the grid.
+        """
+
+        layer = self.layer_of(depth)
+
+        return (self.count[layer],
+                self.mean[layer],
+                self.maximum[layer],
+                self.last_time[layer])
+
+    def cells_along(self, start, end):
+        """cells_along()
+
+        Return the rows and columns of the cells under the track
+        from the Point start to the Point end, sampled every half
+        cell, in order along the track and without repeats. Parts
+        of the track outside the grid are left out.
+        """
+
+        length = np.hypot(end.x - start.x, end.y - start.y)
+        samples = max(2, int(ceil(2.0 * length / self._cell_size)) + 1)
+        fractions = np.linspace(0.0, 1.0, samples)
+        rows = np.floor((start.y + fractions * (end.y - start.y) - self._min_y) /
+                        self._cell_size).astype(int)
+        columns = np.floor((start.x + fractions * (end.x - start.x) - self._min_x) /
+                           self._cell_size).astype(int)
+
+        in_grid = ((0 <= rows) & (rows < self._rows) &
+                   (0 <= columns) & (columns < self._columns))
+        rows = rows[in_grid]
+        columns = columns[in_grid]
+
+        changes = np.ones(len(rows), dtype=bool)
+        changes[1:] = (np.diff(rows) != 0) | (np.diff(columns) != 0)
+
+        return rows[changes], columns[changes]
+
+    def track_statistics(self, start, end, depth):
+        """track_statistics()
+
+        Return the count, mean, maximum and last_time arrays of
+        the cells along the track from start to end at depth, in
+        the order of cells_along().
+        """
+
+        layer = self.layer_of(depth)
+        rows, columns = self.cells_along(start, end)
+
+        return (self.count[layer, rows, columns],
+                self.mean[layer, rows, columns],
+                self.maximum[layer, rows, columns],
+                self.last_time[layer, rows, columns])
+
+    def coverage(self):
+        """coverage()
+
+        Return an array with, for each layer, the fraction of the
+        cells inside the polygon which have been sampled.
+        """
+
+        inside_cells = np.count_nonzero(self._inside)
+        if not inside_cells:
+            return np.zeros(self._layers)
+
+        sampled = np.count_nonzero((self.count > 0) & self._inside, axis=(1, 2))
+
+        return sampled / inside_cells
@@ -19,7 +19,7 @@ setup(
     author='Bill Mania',
     author_email='bill@manialabs.us',
     version='1',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
     include_package_data=False,
     zip_safe=False,
     install_requires=[